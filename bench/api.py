@@ -0,0 +1,58 @@
+"""
+Measure the cost of using the scheduler as a library.
+
+    - import time: how long a fresh interpreter takes to import Scheduler,
+      over and above starting up at all.
+    - call overhead: how long schedule() takes per call when thousands of
+      small simulations run inside one long-lived process.
+    - usage: python bench/api.py [number of calls]
+
+"""
+import os
+import subprocess
+import sys
+import timeit
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from PCB import PCB
+from Scheduler import schedule
+
+# the example workload from the README
+PROCESSES = [(2760, 0, 16, 1), (2750, 0, 9, 2), (2740, 2, 10, 3),
+             (2730, 3, 1, 1), (2720, 4, 2, 4), (2710, 5, 1, 4),
+             (2700, 5, 5, 2)]
+
+def startup(statement, repeat=20):
+    """ Return the best wall time of running `statement` in a new interpreter. """
+    command = [sys.executable, '-c', statement]
+    best = None
+    for _ in xrange(repeat):
+        start = timeit.default_timer()
+        subprocess.check_call(command, cwd=SRC)
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def call(algorithm):
+    """ Run one small simulation through the library API. """
+    return schedule([PCB(dict(pid=pid, arrival=arrival, burst=burst,
+                              priority=priority))
+                     for pid, arrival, burst, priority in PROCESSES],
+                    algorithm)
+
+if __name__ == '__main__':
+
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    bare = startup('pass')
+    imported = startup('import Scheduler')
+    print 'Interpreter startup:   %8.2f ms' % (bare * 1e3)
+    print 'Import Scheduler:      %8.2f ms' % ((imported - bare) * 1e3)
+
+    for algorithm in ('sjf', 'npp'):
+        elapsed = min(timeit.repeat(lambda: call(algorithm),
+                                    repeat=3, number=calls))
+        print 'schedule(%r):      %8.2f us/call (%d processes)' % \
+              (algorithm, elapsed / calls * 1e6, len(PROCESSES))
@@ -0,0 +1,338 @@
+"""
+Benchmark the scheduler engine, Checkpoint, List, Loader, Output and PCB
+hot paths.
+
+    - every case runs in a forked child, so its peak memory is measured
+      in isolation from the cases before it.
+    - each case is repeated and the fastest run kept, to keep timer
+      noise on the small cases out of the comparison.
+    - results can be saved as a JSON baseline and later runs compared
+      against it; cases whose throughput drops by more than the
+      tolerance are reported as regressions.
+    - usage:
+        python bench/benchmark.py [--max-size N] [--repeat N]
+                                  [--save FILE] [--compare FILE]
+                                  [--tolerance T] [--filter TEXT]
+
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from Checkpoint import Checkpoint
+from List import List
+from Loader import read_processes, read_table
+from Output import SINKS, TableSink
+from PCB import PCB, PCBTable
+from Scheduler import ALGORITHMS
+from traces import DISTRIBUTIONS, generate, write
+
+# import NumPy up front, when available, so that the first case to need it
+# is not charged for the import
+try:
+    import numpy
+except ImportError:
+    pass
+
+# process counts benchmarked, up to --max-size
+SIZES = (100, 1000, 10000, 100000, 1000000)
+
+# the full table holds and renders every row, so it is only benchmarked
+# up to this size; the other sinks go all the way
+TABLE_LIMIT = 100000
+
+# time scales used to show the engine's cost does not grow with time span
+SCALES = (1, 1000, 1000000)
+
+# number of branches restored from each checkpoint
+FORKS = 10
+
+# the per-line loop process files were once read with, kept to benchmark
+# the bulk loader against
+LEGACY_REGEX = re.compile('[\d]+,[\d]+,[\d]+,[\d]+')
+
+def legacy_read(f):
+    """ Read a process file one regex match and PCB at a time. """
+    processes = []
+    for line in f:
+        if LEGACY_REGEX.match(line):
+            info = line.strip().split(',')
+            processes.append(PCB(dict(pid=info[0], arrival=info[1],
+                                      burst=info[2], priority=info[3])))
+    return processes
+
+def current_rss():
+    """ Return the current resident set size of this process in bytes. """
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+def peak_rss():
+    """ Return the peak resident set size of this process in bytes. """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def isolated(case, *args):
+    """
+    Run a benchmark case in a forked child and return its results.
+
+        - the case returns a dict of per-phase timings in seconds and
+          the number of items it processed; the peak memory it used on
+          top of what the child started with is added as `peak_bytes`.
+
+    """
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        start = current_rss()
+        result = case(*args)
+        result['peak_bytes'] = max(peak_rss() - start, 0)
+        with os.fdopen(write, 'w') as f:
+            json.dump(result, f)
+        os._exit(0)
+
+    os.close(write)
+    with os.fdopen(read) as f:
+        data = f.read()
+    os.waitpid(pid, 0)
+    return json.loads(data)
+
+def timed(phases, name, func, *args):
+    """ Call func, record its wall time under `name` and return its value. """
+    start = timeit.default_timer()
+    value = func(*args)
+    phases[name] = timeit.default_timer() - start
+    return value
+
+def engine_case(algorithm, distribution, count, scale=1):
+    """ Generate a trace, then schedule it and evaluate the results. """
+    phases = {}
+    table = timed(phases, 'generate', generate, count, distribution, 0,
+                  10, 0.9, scale)
+    sched = timed(phases, 'build', ALGORITHMS[algorithm], table)
+    timed(phases, 'run', sched.run)
+    timed(phases, 'evaluate', sched.evaluate)
+    return {'phases': phases, 'items': count, 'measure': 'run'}
+
+def checkpoint_case(algorithm, count):
+    """ Run a trace half way, then checkpoint, fork and save the state. """
+    phases = {}
+    table = generate(count)
+    sched = ALGORITHMS[algorithm](table)
+    arrivals = sorted(table.column('arrival'))
+    timed(phases, 'prefix', sched.advance_to, arrivals[count // 2])
+    checkpoint = timed(phases, 'capture', Checkpoint.capture, sched)
+    timed(phases, 'restore', lambda: [checkpoint.restore()
+                                      for _ in xrange(FORKS)])
+    with open(os.devnull, 'wb') as f:
+        timed(phases, 'write', checkpoint.write, f)
+    return {'phases': phases, 'items': count, 'measure': 'restore'}
+
+def list_case(operation, count):
+    """ Time one List operation over `count` items. """
+    phases = {}
+    values = range(count, 0, -1)
+    lst = List()
+    nodes = []
+
+    def push_back():
+        for value in values:
+            nodes.append(lst.push_back(value))
+
+    def at():
+        for loc in xrange(count):
+            lst.at(loc)
+
+    def insert():
+        for value in values:
+            lst.insert(value, lst.size // 2)
+
+    def remove():
+        for node in nodes[::2]:
+            lst.remove(node)
+
+    def remove_at():
+        for node in nodes[::2]:
+            lst.remove(node)
+            lst.at(lst.size // 2)
+
+    timed(phases, 'push_back', push_back)
+    if operation == 'sort':
+        timed(phases, 'sort', lst.sort, lambda x: x.value)
+    elif operation == 'at':
+        timed(phases, 'at', at)
+    elif operation == 'insert':
+        timed(phases, 'insert', insert)
+    elif operation == 'remove':
+        timed(phases, 'remove', remove)
+    elif operation == 'remove_at':
+        lst.at(0)
+        timed(phases, 'remove_at', remove_at)
+    return {'phases': phases, 'items': count, 'measure': operation}
+
+def loader_case(reader, count):
+    """ Time reading a process file of `count` lines. """
+    phases = {}
+    readers = {'legacy': legacy_read, 'read_processes':
+               lambda f: list(read_processes(f)), 'read_table': read_table}
+
+    with tempfile.NamedTemporaryFile() as f:
+        timed(phases, 'write', write, generate(count), f)
+        f.flush()
+        with open(f.name) as trace:
+            timed(phases, 'read', readers[reader], trace)
+    return {'phases': phases, 'items': count, 'measure': 'read'}
+
+def output_case(sink, count):
+    """ Time writing `count` completed processes through an output sink. """
+    phases = {}
+    table = generate(count)
+
+    with open(os.devnull, 'w') as f:
+        if sink == 'top':
+            out = TableSink(f, key=lambda x: x.waiting, limit=10,
+                            reverse=True)
+        else:
+            out = SINKS[sink](f)
+
+        def write():
+            for process in table:
+                out.write(process)
+            out.close()
+
+        timed(phases, 'write', write)
+    return {'phases': phases, 'items': count, 'measure': 'write'}
+
+def pcb_case(kind, count):
+    """ Time constructing `count` processes as PCBs or PCBTable rows. """
+    phases = {}
+
+    def build_pcbs():
+        return [PCB(dict(pid=i, arrival=i, burst=10, priority=1))
+                for i in xrange(count)]
+
+    def build_table():
+        table = PCBTable()
+        for i in xrange(count):
+            table.append(i, i, 10, 1)
+        return table
+
+    timed(phases, 'build', build_pcbs if kind == 'PCB' else build_table)
+    return {'phases': phases, 'items': count, 'measure': 'build'}
+
+def cases(max_size):
+    """ Yield (name, case, args) for every benchmark up to `max_size`. """
+    sizes = [size for size in SIZES if size <= max_size]
+
+    for algorithm in sorted(ALGORITHMS):
+        for distribution in DISTRIBUTIONS:
+            for size in sizes:
+                yield ('engine/%s/%s/%d' % (algorithm, distribution, size),
+                       engine_case, (algorithm, distribution, size))
+
+    span = min(10000, max_size)
+    for scale in SCALES:
+        yield ('span/sjf/uniform/%d/x%d' % (span, scale),
+               engine_case, ('sjf', 'uniform', span, scale))
+
+    for algorithm in ('npp', 'sjf'):
+        for size in sizes:
+            yield ('checkpoint/%s/%d' % (algorithm, size), checkpoint_case,
+                   (algorithm, size))
+
+    for size in sizes:
+        yield 'list/push_back/%d' % size, list_case, ('push_back', size)
+        yield 'list/sort/%d' % size, list_case, ('sort', size)
+        yield 'list/at/%d' % size, list_case, ('at', size)
+        yield 'list/remove/%d' % size, list_case, ('remove', size)
+        yield 'list/remove_at/%d' % size, list_case, ('remove_at', size)
+        yield 'list/insert/%d' % size, list_case, ('insert', size)
+
+    for size in sizes:
+        for reader in ('legacy', 'read_processes', 'read_table'):
+            yield ('loader/%s/%d' % (reader, size), loader_case,
+                   (reader, size))
+
+    for size in sizes:
+        for sink in ('binary', 'csv', 'jsonl', 'top', 'table'):
+            if sink != 'table' or size <= TABLE_LIMIT:
+                yield ('output/%s/%d' % (sink, size), output_case,
+                       (sink, size))
+
+    for size in sizes:
+        yield 'pcb/PCB/%d' % size, pcb_case, ('PCB', size)
+        yield 'pcb/PCBTable/%d' % size, pcb_case, ('PCBTable', size)
+
+def compare(results, baseline, tolerance):
+    """ Return the cases whose throughput fell by more than `tolerance`. """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        old = baseline[name]['throughput']
+        new = result['throughput']
+        if old > 0 and new < old * (1 - tolerance):
+            regressions.append((name, old, new))
+    return regressions
+
+if __name__ == '__main__':
+
+    from tabulate import tabulate
+
+    __parser__ = argparse.ArgumentParser('Benchmark the scheduler engine, List and PCB hot paths.')
+    __parser__.add_argument('--max-size', type=int, default=100000,
+                            help='largest number of processes benchmarked')
+    __parser__.add_argument('--repeat', type=int, default=3,
+                            help='number of runs of each case, best kept')
+    __parser__.add_argument('--save', metavar='FILE',
+                            help='save the results as a JSON baseline')
+    __parser__.add_argument('--compare', metavar='FILE',
+                            help='compare the results to a JSON baseline')
+    __parser__.add_argument('--tolerance', type=float, default=0.2,
+                            help='allowed fractional drop in throughput')
+    __parser__.add_argument('--filter', default='',
+                            help='only run cases whose name contains this')
+    __args__ = __parser__.parse_args()
+
+    results = {}
+    rows = []
+    for name, case, args in cases(__args__.max_size):
+        if __args__.filter not in name:
+            continue
+
+        result = min((isolated(case, *args)
+                      for _ in xrange(max(__args__.repeat, 1))),
+                     key=lambda x: x['phases'][x['measure']])
+        phases = result['phases']
+        measured = phases[result['measure']]
+        result['throughput'] = result['items'] / measured if measured else 0.0
+        results[name] = result
+
+        rows.append([name, result['items'], '%.0f' % result['throughput'],
+                     '%.1f' % (result['peak_bytes'] / 1048576.0),
+                     ' '.join('%s=%.4f' % item
+                              for item in sorted(phases.items()))])
+        print >> sys.stderr, name
+
+    print tabulate(rows, headers=['Case', 'Items', 'Items/sec',
+                                  'Peak MB', 'Phases (sec)'],
+                   tablefmt='orgtbl')
+
+    if __args__.save:
+        with open(__args__.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if __args__.compare:
+        with open(__args__.compare) as f:
+            regressions = compare(results, json.load(f), __args__.tolerance)
+        for name, old, new in regressions:
+            print 'REGRESSION %s: %.0f -> %.0f items/sec' % (name, old, new)
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,39 @@
+"""
+Report the memory cost of a process as a PCB object and as a PCBTable row.
+
+    - usage: python bench/memory.py [number of processes]
+
+"""
+import os
+import resource
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from PCB import PCB, PCBTable
+
+def peak_rss():
+    """ Return the peak resident set size of this process in bytes. """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+if __name__ == '__main__':
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    before = peak_rss()
+    table = PCBTable()
+    for i in xrange(count):
+        table.append(i, i, i % 97 + 1, i % 5)
+    table_rss = peak_rss() - before
+
+    before = peak_rss()
+    processes = [PCB(dict(pid=i, arrival=i, burst=i % 97 + 1,
+                          priority=i % 5)) for i in xrange(count)]
+    pcb_rss = peak_rss() - before
+
+    print 'Processes:            ', count
+    print 'PCB bytes/process:    ', sys.getsizeof(processes[-1]), \
+          '(object),', pcb_rss / count, '(peak RSS)'
+    print 'PCBTable bytes/process:', table.nbytes / count, \
+          '(columns),', table_rss / count, '(peak RSS)'
@@ -0,0 +1,86 @@
+"""
+Synthetic process traces for the benchmarks.
+
+    - every generator returns a PCBTable sorted by arrival time, with
+      arrivals spaced so the CPU is busy about `load` of the time.
+    - usage: python bench/traces.py (uniform|bursty|heavy) COUNT > FILE
+
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from PCB import PCBTable
+
+# names of the available burst distributions
+DISTRIBUTIONS = ('uniform', 'bursty', 'heavy')
+
+def generate(count, distribution='uniform', seed=0, mean_burst=10,
+             load=0.9, scale=1):
+    """
+    Return a PCBTable of synthetic processes.
+
+    Parameters
+    ----------
+    count : int
+        - number of processes
+    distribution : str
+        - 'uniform': bursts uniform in [1, 2 * mean_burst - 1] and
+          exponential inter-arrival times
+        - 'bursty': same bursts, but processes arrive in clumps that
+          share an arrival time, followed by long quiet periods
+        - 'heavy': Pareto-distributed (alpha = 1.5) bursts, so a few
+          processes are orders of magnitude longer than the rest
+    seed : int
+        - seed for the random number generator
+    mean_burst : int
+        - mean burst time before scaling
+    load : float
+        - target fraction of time the CPU is busy
+    scale : int
+        - multiplies every time value, stretching the simulated time
+          span without changing the order of events
+
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError('unknown distribution: %s' % distribution)
+
+    rand = random.Random(seed)
+    table = PCBTable()
+    gap = mean_burst / float(load)
+    clock = 0.0
+    clump = 0
+
+    for pid in xrange(count):
+        if distribution == 'bursty':
+            if clump == 0:
+                clump = int(rand.expovariate(1 / 50.0)) + 1
+                clock += rand.expovariate(1 / (gap * clump))
+            clump -= 1
+        else:
+            clock += rand.expovariate(1 / gap)
+
+        if distribution == 'heavy':
+            burst = int(mean_burst / 3.0 * rand.paretovariate(1.5)) + 1
+        else:
+            burst = rand.randint(1, 2 * mean_burst - 1)
+
+        table.append(pid, int(clock) * scale, burst * scale,
+                     rand.randint(1, 5))
+    return table
+
+def write(table, f):
+    """ Write a PCBTable to a file in the syntax described in the README. """
+    f.write('# process_id,arrival_time,burst_time,priority\n')
+    for process in table:
+        f.write('%d,%d,%d,%d\n' % (process.pid, process.arrival,
+                                   process.burst, process.priority))
+
+if __name__ == '__main__':
+
+    if len(sys.argv) != 3 or sys.argv[1] not in DISTRIBUTIONS:
+        sys.exit(__doc__)
+    write(generate(int(sys.argv[2]), sys.argv[1]), sys.stdout)
@@ -0,0 +1,96 @@
+from array import array
+from PCB import COLUMN_TYPE
+
+# NumPy is imported by _numpy() the first time a schedule is long enough
+# to need it, since importing it costs more than the rest of the package;
+# None once it is known not to be installed
+numpy = False
+
+# schedules shorter than this are evaluated in a plain loop, where NumPy's
+# fixed per-call overhead would outweigh the vectorized pass
+VECTOR_THRESHOLD = 64
+
+def evaluate(arrival, burst):
+    """
+    Compute timing information for processes dispatched in a given order.
+
+        - `arrival` and `burst` list the processes in the order they were
+          dispatched; once that order is known, a non-preemptive schedule
+          is fully determined:
+              start[i]      = max(arrival[i], completion[i-1])
+              completion[i] = start[i] + burst[i]
+        - with NumPy, the recurrence is unrolled into prefix sums:
+              completion[i] = end[i] + max(arrival[j] - end[j] + burst[j]
+                                           for j <= i)
+          where `end` is the running sum of `burst`, so every column is
+          computed in one vectorized pass.
+        - without NumPy, or for fewer than VECTOR_THRESHOLD processes,
+          the recurrence is evaluated in a plain loop.
+        - ex. :
+            completion, turn_around, waiting = evaluate([0, 0], [16, 9])
+
+    Parameters
+    ----------
+    arrival : (list|array)
+        - arrival times, in dispatch order
+    burst : (list|array)
+        - burst times, in dispatch order
+
+    Returns
+    -------
+    tuple
+        - (completion, turn_around, waiting) columns, in dispatch order
+
+    """
+    numpy = _numpy() if len(arrival) >= VECTOR_THRESHOLD else None
+    if numpy is None:
+        return _evaluate_scalar(arrival, burst)
+
+    arrival = numpy.asarray(arrival, dtype=numpy.int64)
+    burst = numpy.asarray(burst, dtype=numpy.int64)
+
+    end = numpy.cumsum(burst)
+    completion = end + numpy.maximum.accumulate(arrival - end + burst)
+    turn_around = completion - arrival
+    waiting = turn_around - burst
+    return completion, turn_around, waiting
+
+def averages(arrival, burst):
+    """ Return the average turn around and waiting times of a schedule. """
+    count = len(arrival)
+    if count == 0:
+        return 0.0, 0.0
+
+    _, turn_around, waiting = evaluate(arrival, burst)
+    return _total(turn_around) / (count * 1.0), _total(waiting) / (count * 1.0)
+
+def _numpy():
+    """ Return the numpy module, importing it on first use, or None. """
+    global numpy
+    if numpy is False:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    return numpy
+
+def _total(column):
+    """ Return the exact integer sum of a column. """
+    return int(column.sum()) if hasattr(column, 'sum') else sum(column)
+
+def _evaluate_scalar(arrival, burst):
+    """ Evaluate the schedule recurrence one process at a time. """
+    completion = array(COLUMN_TYPE)
+    turn_around = array(COLUMN_TYPE)
+    waiting = array(COLUMN_TYPE)
+
+    previous = None
+    for arr, bur in zip(arrival, burst):
+        start = arr if previous is None or arr > previous else previous
+        previous = start + bur
+
+        completion.append(previous)
+        turn_around.append(previous - arr)
+        waiting.append(start - arr)
+    return completion, turn_around, waiting
@@ -0,0 +1,258 @@
+import hashlib
+import os
+import struct
+import tempfile
+from PCB import _int64_bytes, _int64_column
+from Scheduler import ALGORITHMS, SMP, VERSION as SCHEDULER_VERSION
+
+# directory results are cached in unless told otherwise
+DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'cse5343')
+
+# number of bytes of results kept before the least recently used go
+MAX_BYTES = 1 << 30
+
+# suffix of every cached result
+SUFFIX = '.result'
+
+# file recording the scheduler version the cached results were made by
+VERSION_FILE = 'VERSION'
+
+# first bytes of a cached result, followed by the scheduler version and the
+# number of processes, then the completion, turn around and waiting columns
+# as little-endian signed 64-bit integers
+MAGIC = 'PCBCACHE'
+HEADER = struct.Struct('<8sIxxxxq')
+
+# input columns a result depends on, in the order they are hashed
+COLUMNS = ('pid', 'arrival', 'burst', 'priority')
+
+# result columns, in the order they are stored and returned
+RESULTS = ('completion', 'turn_around', 'waiting')
+
+class Cache(object):
+    """ Class implementing an on-disk cache of scheduling results. """
+
+    def __init__(self, directory=DIRECTORY, max_bytes=MAX_BYTES):
+        """
+        Constructor
+
+            - creates new Cache object.
+            - results are keyed by the digest() of a table's input
+              columns, the algorithm and its options, and
+              Scheduler.VERSION, so the same processes give a hit
+              whatever file they were read from, and any change to them
+              gives a miss.
+            - when the directory was last used by another scheduler
+              version, every result in it is removed on the spot.
+            - reading a result marks it as used; once the results take
+              more than `max_bytes`, the least recently used are removed.
+            - results are written to a temporary name and renamed into
+              place, so several processes can share a directory.
+            - ex. :
+                cache = Cache()
+                completion, turn_around, waiting = cache.run(table, 'sjf')
+                print cache.hits, cache.misses
+
+        Parameters
+        ----------
+        directory : str
+            - directory the results are kept in, created if missing
+        max_bytes : int
+            - number of bytes of results kept at most
+
+        """
+        super(Cache, self).__init__()
+        self.directory = directory
+        self.evictions = 0
+        self.hits = 0
+        self.max_bytes = max_bytes
+        self.misses = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._check_version()
+
+    def clear(self):
+        """ Remove every cached result. """
+        for name in os.listdir(self.directory):
+            if name.endswith(SUFFIX):
+                self._remove(os.path.join(self.directory, name))
+
+    def get(self, key):
+        """
+        Return the result columns cached under a key, or None on a miss.
+
+            - the columns are (completion, turn_around, waiting), in row
+              order of the table the key was made from.
+
+        """
+        columns = self._read(self._path(key))
+        if columns is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return columns
+
+    def key(self, digest, algorithm, **options):
+        """ Return the key of a run, given the digest of its processes. """
+        return hashlib.sha1('%d\0%s\0%r\0%s' %
+                            (SCHEDULER_VERSION, algorithm,
+                             sorted(options.items()), digest)).hexdigest()
+
+    def put(self, key, columns):
+        """ Cache the result columns of a run, then evict down to size. """
+        fd, temp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, SCHEDULER_VERSION, len(columns[0])))
+                for column in columns:
+                    f.write(_int64_bytes(column))
+            os.rename(temp, self._path(key))
+        except:
+            os.remove(temp)
+            raise
+        self._evict()
+
+    def run(self, table, algorithm, **options):
+        """
+        Return the result columns of a run, scheduling only on a miss.
+
+            - on a miss, the processes of `table` are scheduled with the
+              algorithm, as schedule() would, and the results cached.
+            - options must be plain values, as they are part of the key.
+
+        Parameters
+        ----------
+        table : PCBTable
+            - processes to be scheduled, not yet run
+        algorithm : str
+            - one of the keys of Scheduler.ALGORITHMS
+        **options : dict
+            - options taken by the chosen scheduler
+
+        Returns
+        -------
+        tuple
+            - (completion, turn_around, waiting) columns, in row order of
+              `table`
+
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError('Invalid scheduling algorithm. Must be one of: %s.' %
+                             ', '.join(sorted(ALGORITHMS)))
+
+        key = self.key(digest(table), algorithm, **options)
+        columns = self.get(key)
+        if columns is not None:
+            return columns
+
+        if 'cpus' in options:
+            sched = SMP(processes=table, algorithm=ALGORITHMS[algorithm],
+                        **options)
+        else:
+            sched = ALGORITHMS[algorithm](processes=table, **options)
+        sched.run()
+
+        columns = tuple(table.column(name) for name in RESULTS)
+        self.put(key, columns)
+        return columns
+
+    @property
+    def size(self):
+        """ Return the number of bytes of cached results. """
+        return sum(size for _, size, _ in self._entries())
+
+    def _check_version(self):
+        """ Clear the cache if it was made by another scheduler version. """
+        path = os.path.join(self.directory, VERSION_FILE)
+        try:
+            with open(path, 'r') as f:
+                version = f.read().strip()
+        except IOError:
+            version = None
+
+        if version != str(SCHEDULER_VERSION):
+            self.clear()
+            with open(path, 'w') as f:
+                f.write('%d\n' % SCHEDULER_VERSION)
+
+    def _entries(self):
+        """ Return (last used, size, path) of every cached result. """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """ Remove the least recently used results until under `max_bytes`. """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            self.evictions += 1
+            total -= size
+
+    def _path(self, key):
+        """ Return the path of the result with a given key. """
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def _read(self, path):
+        """ Read a cached result, or return None if it is missing or bad. """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            return None
+
+        if len(data) < HEADER.size:
+            return None
+        magic, version, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != SCHEDULER_VERSION or \
+           len(data) != HEADER.size + len(RESULTS) * count * 8:
+            return None
+
+        # a hit makes the result the most recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        columns = []
+        for index in xrange(len(RESULTS)):
+            start = HEADER.size + index * count * 8
+            columns.append(_int64_column(data[start:start + count * 8]))
+        return tuple(columns)
+
+    def _remove(self, path):
+        """ Remove a cached result, unless another process already has. """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def __repr__(self):
+        """ Return representation of Cache. """
+        return '<Cache directory=%r hits=%r misses=%r>' % \
+               (self.directory, self.hits, self.misses)
+
+def digest(table):
+    """
+    Return a hash of the input columns of a PCBTable, as a hex string.
+
+        - two tables with the same processes in the same row order have
+          the same digest, whatever they were loaded from.
+
+    """
+    digest = hashlib.sha1(str(len(table)))
+    for name in COLUMNS:
+        digest.update(_int64_bytes(table.column(name)))
+    return digest.hexdigest()
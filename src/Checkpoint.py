@@ -0,0 +1,334 @@
+import struct
+from array import array
+from itertools import chain, izip
+from PCB import (COLUMN_TYPE, PCB, PCBTable, PCBView, RowStream,
+                 _int64_bytes, _int64_column)
+from Scheduler import ALGORITHMS, Preemptive, SMP, VERSION as SCHEDULER_VERSION
+
+# columns kept for the active process, and for every ready one along with
+# the number it was pushed onto the ready queue under
+ACTIVE = ('pid', 'arrival', 'burst', 'priority', 'remaining', 'start')
+READY = ACTIVE + ('sequence',)
+
+# columns kept for every process yet to arrive, in order of arrival
+WAITING = ('pid', 'arrival', 'burst', 'priority')
+
+# columns kept for every completed process, in order of completion
+COMPLETED = ('pid', 'arrival', 'burst', 'priority', 'start', 'completion',
+             'turn_around', 'waiting')
+
+# first bytes of a checkpoint file, followed by the file version, the
+# scheduler version, the algorithm, then the clock, the next ready queue
+# number, the aging interval (0 for none) and the number of active, ready,
+# waiting and completed processes; the active row and the READY, WAITING
+# and COMPLETED columns follow as little-endian signed 64-bit integers
+MAGIC = 'PCBCHKPT'
+VERSION = 1
+HEADER = struct.Struct('<8sII8sqqqqqqq')
+
+class Checkpoint(object):
+    """ Class holding the state of a scheduler at a point in time. """
+
+    def __init__(self, algorithm, system_time, sequence=0, aging=None,
+                 active=None, ready=None, waiting=None, completed=None):
+        """
+        Constructor
+
+            - creates new Checkpoint object.
+            - not usually built directly, but by capture() or read().
+            - the whole state is kept in typed `array` columns, so it costs
+              a few machine words per process and is written and read as
+              blocks.
+            - restore() builds a new scheduler from it, as many times as
+              needed; every scheduler it builds shares the columns of the
+              completed processes and of those yet to arrive, and only
+              the processes in flight are copied, so hundreds of what-if
+              branches can carry on from one shared prefix.
+            - ex. :
+                checkpoint = sched.checkpoint()
+                branch = checkpoint.restore()
+                branch.submit(PCB(dict(arrival=checkpoint.system_time,
+                                       burst=16, pid=2760, priority=1)))
+                branch.run()
+
+        Parameters
+        ----------
+        algorithm : str
+            - one of the keys of Scheduler.ALGORITHMS
+        system_time : int
+            - clock of the scheduler
+        sequence : int
+            - number the next process pushed onto the ready queue gets
+        aging : int
+            - aging interval of an NPP scheduler, or None
+        active : tuple
+            - ACTIVE row of the process on the CPU, or None if idle
+        ready : tuple
+            - READY columns of the ready queue, in heap order
+        waiting : tuple
+            - WAITING columns of the processes yet to arrive
+        completed : tuple
+            - COMPLETED columns of the processes kept for output
+
+        """
+        super(Checkpoint, self).__init__()
+        self._history = None
+        self.active = active
+        self.aging = aging
+        self.algorithm = algorithm
+        self.completed = completed if completed is not None else \
+            _columns(len(COMPLETED))
+        self.ready = ready if ready is not None else _columns(len(READY))
+        self.sequence = sequence
+        self.system_time = system_time
+        self.waiting = waiting if waiting is not None else \
+            _columns(len(WAITING))
+
+    @classmethod
+    def capture(cls, sched):
+        """
+        Return a Checkpoint of a scheduler, which is left as it was.
+
+            - only the non-preemptive single-CPU schedulers are supported,
+              as their whole state is the clock, the ready queue, the
+              active process and the processes waiting and completed.
+            - the rows a scheduler has yet to read from a PCBTable, or
+              from the columns of its own Checkpoint, are copied into the
+              Checkpoint as blocks, without a process being made of any.
+            - any other stream can only be read once, so the rest of it
+              is read straight into columns, which the scheduler then goes
+              on reading new PCBs from.
+            - completed processes handed to `on_complete` are gone, and
+              are not part of the checkpoint.
+            - processes with I/O bursts are not supported, as the columns
+              hold a single CPU burst per process.
+
+        """
+        algorithm = _algorithm(sched)
+        # a scheduler stops being batch once a process blocks on I/O
+        if sched._io or not sched.batch:
+            raise ValueError('Processes with I/O bursts cannot be checkpointed.')
+
+        waiting = _columns(len(WAITING))
+        for node in sched._waiting:
+            _append(waiting, WAITING, _single_burst(node.value))
+        if sched._source is not None:
+            for column, rest in izip(waiting, _unread(sched)):
+                column.extend(rest)
+
+        ready = _columns(len(READY))
+        entries, sequence = sched._ready.snapshot()
+        for number, process in entries:
+            _append(ready, ACTIVE, _single_burst(process))
+            ready[-1].append(number)
+
+        active = None
+        if sched._active is not None:
+            active = tuple(getattr(_single_burst(sched._active), name)
+                           for name in ACTIVE)
+
+        # the completed processes of a restored scheduler start with those
+        # of its own checkpoint, which are copied as blocks
+        if sched._history is not None:
+            completed = tuple(sched._history.column(name)[:]
+                              for name in COMPLETED)
+        else:
+            completed = _columns(len(COMPLETED))
+        for node in sched._complete:
+            _append(completed, COMPLETED, node.value)
+
+        return cls(algorithm, sched.system_time, sequence,
+                   getattr(sched, 'aging', None), active, ready, waiting,
+                   completed)
+
+    @property
+    def nbytes(self):
+        """ Return the number of bytes held by all columns. """
+        return sum(len(buffer(column)) for column in
+                   self.ready + self.waiting + self.completed)
+
+    @classmethod
+    def read(cls, f):
+        """ Read a Checkpoint back from a checkpoint file. """
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or not header.startswith(MAGIC):
+            raise RuntimeError('Not a checkpoint file.')
+        (_, version, scheduler_version, algorithm, system_time, sequence,
+         aging, active, ready, waiting, completed) = HEADER.unpack(header)
+        if version != VERSION:
+            raise RuntimeError('Unsupported checkpoint file version %d.' %
+                               version)
+        if scheduler_version != SCHEDULER_VERSION:
+            raise RuntimeError('Checkpoint made by scheduler version %d.' %
+                               scheduler_version)
+
+        algorithm = algorithm.rstrip('\0')
+        if algorithm not in ALGORITHMS:
+            raise RuntimeError('Unknown algorithm %r in checkpoint file.' %
+                               algorithm)
+
+        if active:
+            active = tuple(_read_column(f, len(ACTIVE)))
+        else:
+            active = None
+        ready = tuple(_read_column(f, ready) for _ in READY)
+        waiting = tuple(_read_column(f, waiting) for _ in WAITING)
+        completed = tuple(_read_column(f, completed) for _ in COMPLETED)
+        return cls(algorithm, system_time, sequence, aging or None, active,
+                   ready, waiting, completed)
+
+    def restore(self, **kwargs):
+        """
+        Return a new scheduler carrying on from the Checkpoint.
+
+            - each call returns an independent scheduler, which may be
+              given more processes with submit() and run on its own.
+            - the completed processes are kept in a PCBTable over the
+              columns of the Checkpoint, and those yet to arrive are read
+              from its columns as a stream, each becoming a PCB only when
+              the scheduler gets to it; the columns are never written, so
+              the cost of a restore grows with the processes in flight
+              and not with the length of the trace.
+            - the processes in flight are PCBViews of a PCBTable of their
+              own, copied from the columns of the Checkpoint as blocks.
+            - any dispatch order kept for averages() is copied, as the new
+              scheduler appends to it; with `on_complete`, its running sums
+              start from those of the completed processes.
+            - `on_complete`, `instrument`, `stats` and `timeline` start
+              afresh, and only see what happens after the Checkpoint.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            - options taken by Scheduler, other than `processes` and
+              `stream`
+
+        """
+        if self.aging is not None:
+            kwargs['aging'] = self.aging
+        sched = ALGORITHMS[self.algorithm](**kwargs)
+        sched.system_time = self.system_time
+        sched._busy = sum(self.completed[2])
+
+        if len(self.completed[0]):
+            sched._history = self._history_table()
+        if sched._on_complete is None:
+            sched._order_arrival = self.completed[1][:]
+            sched._order_burst = self.completed[2][:]
+        else:
+            sched._count = len(self.completed[0])
+            sched._total_turn_around = sum(self.completed[-2])
+            sched._total_waiting = sum(self.completed[-1])
+
+        table = self._in_flight_table()
+        if self.active is not None:
+            sched._active = PCBView(table, len(table) - 1)
+            sched._dispatched = sched._active.start
+            if sched._on_complete is None:
+                sched._order_arrival.append(sched._active.arrival)
+                sched._order_burst.append(sched._active.burst)
+
+        sched._ready.restore([(number, PCBView(table, index))
+                              for index, number in enumerate(self.ready[-1])],
+                             self.sequence)
+
+        if len(self.waiting[0]):
+            sched._source = _arrivals(self.waiting)
+        return sched
+
+    def write(self, f):
+        """ Write the Checkpoint to a checkpoint file. """
+        f.write(HEADER.pack(MAGIC, VERSION, SCHEDULER_VERSION, self.algorithm,
+                            self.system_time, self.sequence, self.aging or 0,
+                            int(self.active is not None), len(self.ready[0]),
+                            len(self.waiting[0]), len(self.completed[0])))
+        if self.active is not None:
+            f.write(_int64_bytes(array(COLUMN_TYPE, self.active)))
+        for column in self.ready + self.waiting + self.completed:
+            f.write(_int64_bytes(column))
+
+    def _history_table(self):
+        """ Return a PCBTable over the columns of the completed processes. """
+        # built once and shared by every restore, as nothing writes to it
+        if self._history is None:
+            columns = dict(zip(COMPLETED, self.completed))
+            columns['remaining'] = array(COLUMN_TYPE, [0]) * \
+                                   len(self.completed[0])
+            self._history = PCBTable.wrap(columns, array('B', [100]) *
+                                          len(self.completed[0]))
+        return self._history
+
+    def _in_flight_table(self):
+        """ Return a new PCBTable of the ready processes, then the active one. """
+        columns = dict((name, column[:])
+                       for name, column in izip(ACTIVE, self.ready))
+        if self.active is not None:
+            for name, value in izip(ACTIVE, self.active):
+                columns[name].append(value)
+
+        count = len(columns['pid'])
+        zeros = array(COLUMN_TYPE, [0]) * count
+        columns['completion'] = zeros[:]
+        columns['turn_around'] = zeros[:]
+        columns['waiting'] = zeros
+        return PCBTable.wrap(columns, array('B', [001]) * count)
+
+    def __repr__(self):
+        """ Return representation of Checkpoint. """
+        return '<Checkpoint algorithm=%r system_time=%r ready=%r waiting=%r completed=%r>' % \
+               (self.algorithm, self.system_time, len(self.ready[0]),
+                len(self.waiting[0]), len(self.completed[0]))
+
+def _algorithm(sched):
+    """ Return the name a scheduler goes by in ALGORITHMS. """
+    if not isinstance(sched, (Preemptive, SMP)):
+        for name, cls in ALGORITHMS.iteritems():
+            if type(sched) is cls:
+                return name
+    raise ValueError('Only non-preemptive single-CPU schedulers can be checkpointed.')
+
+def _append(columns, names, process):
+    """ Append the given fields of a process to their columns. """
+    for column, name in izip(columns, names):
+        column.append(getattr(process, name))
+
+def _arrivals(waiting):
+    """ Return a RowStream of a new PCB of each row of WAITING columns. """
+    pid, arrival, burst, priority = waiting
+    return RowStream(waiting, lambda index: PCB(dict(
+        pid=pid[index], arrival=arrival[index], burst=burst[index],
+        priority=priority[index])))
+
+def _columns(count):
+    """ Return a tuple of empty integer columns. """
+    return tuple(array(COLUMN_TYPE) for _ in xrange(count))
+
+def _read_column(f, count):
+    """ Read a column of `count` little-endian signed 64-bit integers. """
+    data = f.read(count * 8)
+    if len(data) < count * 8:
+        raise RuntimeError('Truncated checkpoint file.')
+    return _int64_column(data)
+
+def _unread(sched):
+    """ Return the WAITING columns of the rest of a scheduler's stream. """
+    if isinstance(sched._source, RowStream):
+        return sched._source.remaining()
+
+    # the processes read are not kept, and the scheduler reads new ones
+    # from the columns instead; one with I/O bursts is put back, with
+    # those read before it, for the scheduler to carry on with
+    rest = _columns(len(WAITING))
+    for process in sched._source:
+        if process.io:
+            sched._source = chain(_arrivals(rest), [process], sched._source)
+            raise ValueError('Processes with I/O bursts cannot be checkpointed.')
+        _append(rest, WAITING, process)
+    sched._source = _arrivals(rest)
+    return rest
+
+def _single_burst(process):
+    """ Return a process, unless it has I/O bursts. """
+    if process.io:
+        raise ValueError('Processes with I/O bursts cannot be checkpointed.')
+    return process
@@ -0,0 +1,222 @@
+from array import array
+from collections import defaultdict
+from math import frexp
+from timeit import default_timer
+
+# events reported by an attached scheduler
+EVENTS = ('admit', 'push', 'dispatch', 'block', 'complete')
+
+# bucket for durations too short for the timer to measure, below that of
+# any positive float
+ZERO_BUCKET = -1075
+
+class Histogram(object):
+    """ Class implementing a power-of-two histogram of durations. """
+
+    def __init__(self):
+        """
+        Constructor
+
+            - creates new Histogram object.
+            - a duration of d seconds is counted in bucket e, where
+              2**(e-1) <= d < 2**e, so the histogram stays a few dozen
+              buckets in size however many durations are added.
+            - ex. :
+                obj = Histogram()
+                obj.add(0.000012)
+
+        """
+        self._buckets = defaultdict(int)
+        self._count = 0
+        self._max = 0.0
+        self._total = 0.0
+
+    def add(self, duration):
+        """ Count a duration, in seconds. """
+        self._buckets[frexp(duration)[1] if duration > 0
+                      else ZERO_BUCKET] += 1
+        self._count += 1
+        self._total += duration
+        if duration > self._max:
+            self._max = duration
+
+    @property
+    def count(self):
+        """ Return the number of durations added. """
+        return self._count
+
+    @property
+    def max(self):
+        """ Return the longest duration added. """
+        return self._max
+
+    @property
+    def mean(self):
+        """ Return the mean duration added. """
+        return self._total / self._count if self._count else 0.0
+
+    def quantile(self, q):
+        """ Return the upper bound of the bucket holding quantile `q`. """
+        rank = q * self._count
+        seen = 0
+        for exponent in sorted(self._buckets):
+            seen += self._buckets[exponent]
+            if seen >= rank:
+                return min(2.0 ** exponent, self._max) \
+                       if exponent != ZERO_BUCKET else 0.0
+        return self._max
+
+    @property
+    def total(self):
+        """ Return the sum of all durations added. """
+        return self._total
+
+    def __repr__(self):
+        """ Return representation of Histogram. """
+        return '<Histogram count=%r mean=%r max=%r>' % (self._count,
+                                                       self.mean, self._max)
+
+class Instrument(object):
+    """ Class collecting event counts, timings and queue depths. """
+
+    def __init__(self, sample_every=1):
+        """
+        Constructor
+
+            - creates new Instrument object.
+            - passed to a scheduler as `instrument`, it wraps the
+              scheduler's admission, ready queue and completion steps when
+              the scheduler is created; a scheduler created without one
+              runs its original, unwrapped methods and pays nothing.
+            - for every event in EVENTS it keeps a count, a Histogram of
+              how long the step took, and any callbacks registered with
+              on().
+            - the ready queue depth is sampled once per `sample_every`
+              admission steps, i.e. once per simulated event.
+            - ex. :
+                instrument = Instrument()
+                instrument.on('dispatch', lambda t, p: trace(t, p))
+                SJF(processes=processes, instrument=instrument).run()
+                print instrument.report()
+
+        Parameters
+        ----------
+        sample_every : int
+            - number of simulated events between queue depth samples
+
+        """
+        self._callbacks = defaultdict(list)
+        self._sample_every = sample_every
+        self._steps = 0
+        self.counts = dict((event, 0) for event in EVENTS)
+        self.depths = array('l')
+        self.system_time = 0
+        self.timings = dict((event, Histogram()) for event in EVENTS)
+
+    def attach(self, sched):
+        """
+        Wrap the hot-path steps of a scheduler so they report here.
+
+            - called by the scheduler itself when given an Instrument.
+            - the wrappers are set on the instances, shadowing the
+              methods of the scheduler and its ready queue.
+
+        """
+        admit = sched._admit
+        finish = sched._finish
+        ready = sched._ready
+        push = ready.push
+        pop = ready.pop
+
+        callbacks = self._callbacks
+        counts = self.counts
+        timings = self.timings
+
+        def _admit(system_time):
+            self.system_time = system_time
+            before = ready.size
+            start = default_timer()
+            admit(system_time)
+            timings['admit'].add(default_timer() - start)
+
+            admitted = ready.size - before
+            counts['admit'] += admitted
+            for callback in callbacks['admit']:
+                callback(system_time, admitted)
+
+            self._steps += 1
+            if self._steps % self._sample_every == 0:
+                self.depths.append(ready.size)
+
+        def _finish(process, system_time):
+            start = default_timer()
+            finish(process, system_time)
+
+            # the end of a CPU burst only completes a process with no
+            # I/O burst left to block on
+            event = 'block' if process.state == 'waiting' else 'complete'
+            timings[event].add(default_timer() - start)
+
+            counts[event] += 1
+            for callback in callbacks[event]:
+                callback(system_time, process)
+
+        def _push(process, *args):
+            start = default_timer()
+            push(process, *args)
+            timings['push'].add(default_timer() - start)
+
+            counts['push'] += 1
+            for callback in callbacks['push']:
+                callback(self.system_time, process)
+
+        def _pop(*args):
+            start = default_timer()
+            process = pop(*args)
+            timings['dispatch'].add(default_timer() - start)
+
+            counts['dispatch'] += 1
+            for callback in callbacks['dispatch']:
+                callback(self.system_time, process)
+            return process
+
+        sched._admit = _admit
+        sched._finish = _finish
+        ready.push = _push
+        ready.pop = _pop
+
+    def on(self, event, callback):
+        """
+        Register a callback for an event.
+
+            - callbacks are called as callback(system_time, value), where
+              value is the number of processes admitted for 'admit' and
+              the PCB involved for every other event.
+
+        """
+        if event not in EVENTS:
+            raise ValueError('unknown event: %s' % event)
+        self._callbacks[event].append(callback)
+
+    def report(self):
+        """ Return a plain text summary of everything recorded. """
+        lines = ['%-10s %10s %12s %10s %10s %10s' % ('Event', 'Count',
+                                                     'Total (s)', 'Mean (us)',
+                                                     'p99 (us)', 'Max (us)')]
+        for event in EVENTS:
+            timing = self.timings[event]
+            lines.append('%-10s %10d %12.6f %10.2f %10.2f %10.2f' %
+                         (event, self.counts[event], timing.total,
+                          timing.mean * 1e6, timing.quantile(0.99) * 1e6,
+                          timing.max * 1e6))
+
+        if self.depths:
+            lines.append('Ready queue depth: mean %.2f, max %d over %d '
+                         'samples' % (sum(self.depths) /
+                                      (len(self.depths) * 1.0),
+                                      max(self.depths), len(self.depths)))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        """ Return representation of Instrument. """
+        return '<Instrument counts=%r>' % self.counts
@@ -1,7 +1,16 @@
+import heapq
+from itertools import compress, count, imap, repeat
+from math import sqrt
+from operator import is_
+
+# fewest Nodes a block of the position index is sized for
+MIN_BLOCK = 16
 
 class NodeBase(object):
     """ Class representing the basic idea of a node in the list. """
 
+    __slots__ = ('next', 'prev')
+
     def __init__(self, next=None, prev=None):
         """
         Constructor
@@ -9,9 +18,8 @@ class NodeBase(object):
             - creates a new NodeBase object.
             - the only objects in the List that are solely NodeBase objects
               are the head and tail of the List.
-            - in actual use, `next` and `prev` are usually not
-              passed to the object on creation, but rather they're set
-              using the respective setter methods
+            - `next` and `prev` are plain slots rather than properties,
+              since the List follows them on every operation.
             - ex. :
                 obj = NodeBase()
 
@@ -23,28 +31,8 @@ class NodeBase(object):
             - points to the previous item in the List
 
         """
-        self._next = next
-        self._prev = prev
-
-    @property
-    def next(self):
-        """ Return next NodeBase in List. """
-        return self._next
-
-    @property
-    def prev(self):
-        """ Return previous NodeBase in List. """
-        return self._prev
-
-    @next.setter
-    def next(self, val):
-        """ Set next NodeBase in List. """
-        self._next = val
-
-    @prev.setter
-    def prev(self, val):
-        """ Set previous NodeBase in List. """
-        self._prev = val
+        self.next = next
+        self.prev = prev
 
     def __repr__(self):
         """ Return representation of NodeBase. """
@@ -53,6 +41,8 @@ class NodeBase(object):
 class Node(NodeBase):
     """ Class representing a true node in the list. """
 
+    __slots__ = ('_block', '_list', 'value')
+
     def __init__(self, value=None, next=None, prev=None):
         """
         Constructor
@@ -60,6 +50,9 @@ class Node(NodeBase):
             - creates new Node object.
             - differs from NodeBase object in that it actually encapsulates
               data.
+            - the Node returned by an insertion into a List is a handle:
+              it can be given back to List.remove() or List.insert_before()
+              at any time, without looking it up.
             - ex. where itr is a "pointer" to a Node found in the list:
                 obj = Node(value=val, next=itr, prev=itr.prev)
 
@@ -77,28 +70,22 @@ class Node(NodeBase):
               points to NodeBase when in contact with head or tail of List
 
         """
-        super(Node, self).__init__(next=next, prev=prev)
-        self._value = value
-
-    @property
-    def value(self):
-        """ Return value encapsulated in Node. """
-        return self._value
-
-    @value.setter
-    def value(self, val):
-        """ Set value to be encapsulated by Node. """
-        self._value = val
+        # set directly rather than through NodeBase.__init__, since a Node
+        # is created for every value pushed
+        self._list = None
+        self.next = next
+        self.prev = prev
+        self.value = value
 
     def __repr__(self):
         """ Return representation of Node. """
-        return '<Node object: %r>' % self._value 
+        return '<Node object: %r>' % self.value
 
     def __eq__(self, comp):
         """ Compare equality of two Nodes. """
-        return self._next == comp.next and \
-               self._prev == comp.prev and \
-               self._value == comp.value
+        return self.next == comp.next and \
+               self.prev == comp.prev and \
+               self.value == comp.value
 
     def __ge__(self, comp):
         """ Check greater than or equal to. """
@@ -106,7 +93,7 @@ class Node(NodeBase):
 
     def __gt__(self, comp):
         """ Check greater than. """
-        return self._value > comp.value
+        return self.value > comp.value
 
     def __le__(self, comp):
         """ Check less than or equal to. """
@@ -114,7 +101,7 @@ class Node(NodeBase):
 
     def __lt__(self, comp):
         """ Check less than. """
-        return self._value < comp.value
+        return self.value < comp.value
 
     def __ne__(self, comp):
         """ Compare inequality of two Nodes. """
@@ -129,44 +116,79 @@ class List(object):
 
             - creates new List object.
             - Lists are doubly-linked lists.
+            - every insertion returns the new Node as a handle, which
+              remove() unlinks in O(1) while the List has no index.
+            - iterating gives out a new iterator each time, so iterations
+              can be nested, interleaved or abandoned part way; the Node
+              an iteration is on may even be removed.
+            - positions are looked up in an index of the Nodes, built by
+              the first call to at() or insert(loc): a list of blocks of
+              about sqrt(n) Nodes each, every Node knowing its block, and
+              a Fenwick tree of the block sizes, so at() is O(log n) and
+              insert(loc) O(sqrt(n)) in a single list shift.
+            - while the index is kept, every change to the List keeps it
+              up to date, remove() and insert_before() in O(sqrt(n)), the
+              Node being searched for in its block by identity, in C;
+              pushes and pops at the back are O(log n), and at the front
+              O(sqrt(n)), in the shift of the first block.
+            - blocks are split once twice their size and merged with the
+              next once under half, the tree being rebuilt in O(sqrt(n))
+              each time, and the whole index is rebuilt in O(n) once the
+              List has grown or shrunk by a factor of 4, so the bounds
+              hold amortized over any mix of operations; a List whose
+              positions are never asked for has no index, and pays
+              nothing for it.
             - ex. :
                 obj = List()
 
         """
-        self._curr = None
-        self._head = NodeBase() 
-        self._itr = 0
+        self._block_size = MIN_BLOCK
+        self._head = NodeBase()
+        self._index = None
         self._size = 0
         self._tail = NodeBase()
+        self._tree = None
 
         self._head.next = self._tail
         self._tail.prev = self._head
 
     def __iter__(self):
-        return self
+        """ Yield every Node from first to last. """
+        node = self._head.next
+        tail = self._tail
+        while node is not tail:
+            yield node
+            node = node.next
+
+    def __reversed__(self):
+        """ Yield every Node from last to first. """
+        node = self._tail.prev
+        head = self._head
+        while node is not head:
+            yield node
+            node = node.prev
 
     def at(self, loc=0):
-        """ Return the Node at a given position in the List. """
-        count = 0 
-        itr = self.first
-        while count < loc and itr.next is not None:
-            count += 1
-            itr = itr._next
-
-        return itr if isinstance(itr, Node) else None
+        """ Return the Node at a given position, or None if out of range. """
+        if not 0 <= loc < self._size:
+            return None
+        position, offset = self._locate(loc)
+        return self._index[position][offset]
 
     def clear(self):
         """ Clear all items in the List. """
-        while self.size > 0:
-            self.pop_back()
+        for node in self:
+            node._list = None
+        self._head.next = self._tail
+        self._tail.prev = self._head
+        self._index = None
+        self._size = 0
 
     def delete(self, val):
         """ Delete the first instance of a given value. """
         itr = self.find(val)
-        if itr is not None: 
-            itr.next.prev = itr.prev
-            itr.prev.next = itr.next
-            self._size -=  1
+        if itr is not None:
+            self.remove(itr)
 
     @property
     def empty(self):
@@ -184,101 +206,83 @@ class List(object):
     def first(self):
         """ Return the first Node in the List. """
         first = self._head.next
-        last = self._tail
-        return first if first is not last else None
+        return first if first is not self._tail else None
 
     def insert(self, val, loc=-1):
         """ Insert a value into a given location in the List. """
-        if self._size == 0 or loc == -1:
-            self.push_back(val)
-        elif self._size > 0:
-            if loc >= self._size:
-                self.push_back(val)
-            elif loc < self._size and loc >= 0:
-                itr = self.at(loc)
-                new_node = Node(value=val, next=itr, prev=itr.prev)
-                itr.prev.next = new_node
-                itr.prev = new_node
-                self._size += 1
+        if loc == -1 or loc >= self._size:
+            return self.push_back(val)
+        if loc < 0:
+            return None
+
+        position, offset = self._locate(loc)
+        itr = self._index[position][offset]
+        node = self._link(val, itr.prev, itr)
+        self._index_insert(position, offset, node)
+        return node
+
+    def insert_before(self, node, val):
+        """ Insert a value ahead of a Node of the List and return its Node. """
+        if node._list is not self:
+            raise ValueError('Node is not in this List.')
+        new = self._link(val, node.prev, node)
+        if self._index is not None:
+            block = node._block
+            self._index_insert(block.position, _position(block, node), new)
+        return new
 
     @property
     def last(self):
         """ Return the last Node in the List. """
         last = self._tail.prev
-        first = self._head
-        return last if last is not first else None
-
-    def next(self):
-        """ Return the next item for built-in iterable. """
-        if self._curr is None:
-            self._curr = self.first
-
-        if self._itr < self._size:
-            itr = self._curr
-            self._curr = itr.next
-            self._itr += 1
-            return itr
-        else:
-            self._curr = None
-            self._itr = 0
-            raise StopIteration()
+        return last if last is not self._head else None
 
     def pop_back(self):
         """ Pop the last item from the List. """
         if self._size > 0:
-            last = self.last
-            new_last = last.prev
-
-            new_last.next = self._tail
-            self._tail.prev = new_last
-
-            self._size -= 1
+            node = self._tail.prev
+            self._unlink(node)
+            if self._index is not None:
+                self._index_remove(len(self._index) - 1,
+                                   len(node._block) - 1)
 
     def pop_front(self):
         """ Pop the first item from the List. """
         if self._size > 0:
-
-            first = self.first
-            new_first = first.next
-
-            new_first.prev = self._head
-            self._head.next = new_first
-
-            self._size -= 1
+            node = self._head.next
+            self._unlink(node)
+            if self._index is not None:
+                self._index_remove(0, 0)
 
     def push_back(self, value):
-        """ Insert value at the tail of the List. """
-        if self._size == 0:
-            first = Node(value=value, next=self._tail, prev=self._head)
-            self._head.next = first
-            self._tail.prev = first
-
-            self._size += 1
-        elif self._size > 0:
-            
-            last = self.last
-            new_node = Node(value=value, next=self._tail, prev=last)
-            last.next = new_node 
-            self._tail.prev = new_node
-
-            self._size += 1
+        """ Insert value at the tail of the List and return its Node. """
+        node = self._link(value, self._tail.prev, self._tail)
+        if self._index is not None:
+            if self._index:
+                self._index_insert(len(self._index) - 1,
+                                   len(self._index[-1]), node)
+            else:
+                self._build_index()
+        return node
 
     def push_front(self, value):
-        """ Insert value at the head of the List. """
-        if self._size == 0:
-            first = Node(value=value, next=self._tail, prev=self._head)
-            self._head.next = first
-            self._tail.prev = first
-
-            self._size += 1
-        elif self._size > 0:
-
-            first = self.first
-            new_node = Node(value=value, next=first, prev=first.prev)
-            first.prev = new_node
-            self._head.next = new_node
-            
-            self._size += 1
+        """ Insert value at the head of the List and return its Node. """
+        node = self._link(value, self._head, self._head.next)
+        if self._index is not None:
+            if self._index:
+                self._index_insert(0, 0, node)
+            else:
+                self._build_index()
+        return node
+
+    def remove(self, node):
+        """ Unlink a Node of the List, in O(1) unless the index is kept. """
+        if node._list is not self:
+            raise ValueError('Node is not in this List.')
+        self._unlink(node)
+        if self._index is not None:
+            block = node._block
+            self._index_remove(block.position, _position(block, node))
 
     def sort(self, key=lambda x: x):
         """ Sort the List. """
@@ -293,23 +297,279 @@ class List(object):
     def size(self):
         """ Return the size of the List. """
         return self._size
- 
+
+    def _build_index(self):
+        """ Build the position index, in blocks of about sqrt(n) Nodes. """
+        size = max(MIN_BLOCK, int(sqrt(self._size)))
+        nodes = list(self)
+        self._block_size = size
+        self._index = [_Block(nodes[start:start + size])
+                       for start in xrange(0, len(nodes), size)]
+        self._number(0)
+        for block in self._index:
+            for node in block:
+                node._block = block
+
+    def _grow(self, position, delta):
+        """ Add to the size of an index block in the tree, if one is kept. """
+        tree = self._tree
+        if tree is not None:
+            position += 1
+            while position < len(tree):
+                tree[position] += delta
+                position += position & -position
+
+    def _index_insert(self, position, offset, node):
+        """ Put a Node in the index at a position of a block. """
+        block = self._index[position]
+        block.insert(offset, node)
+        node._block = block
+        if len(block) <= 2 * self._block_size:
+            self._grow(position, 1)
+        elif self._size > 4 * self._block_size ** 2:
+            self._build_index()
+        else:
+            self._split(position)
+
+    def _index_remove(self, position, offset):
+        """ Take the Node at a position of a block out of the index. """
+        index = self._index
+        block = index[position]
+        del block[offset]
+        if 4 * self._size < self._block_size ** 2 and \
+           self._block_size > MIN_BLOCK:
+            self._build_index()
+        elif 2 * len(block) < self._block_size and position + 1 < len(index):
+            # the next block is merged into this one
+            after = index.pop(position + 1)
+            for node in after:
+                node._block = block
+            block.extend(after)
+            if len(block) > 2 * self._block_size:
+                self._split(position)
+            else:
+                self._number(position + 1)
+        elif not block:
+            del index[position]
+            self._number(position)
+        else:
+            self._grow(position, -1)
+
+    def _link(self, value, prev, next):
+        """ Link a new Node for a value between two others and return it. """
+        node = Node(value, next, prev)
+        node._list = self
+        prev.next = node
+        next.prev = node
+        self._size += 1
+        return node
+
+    def _locate(self, loc):
+        """ Return the index block holding a position, and the offset in it. """
+        if self._index is None:
+            self._build_index()
+        tree = self._tree
+        if tree is None:
+            # every entry sums the sizes of the blocks its low bit spans
+            self._tree = tree = [0] + map(len, self._index)
+            for position in xrange(1, len(tree)):
+                parent = position + (position & -position)
+                if parent < len(tree):
+                    tree[parent] += tree[position]
+
+        position = 0
+        step = 1 << (len(tree) - 1).bit_length() - 1
+        while step:
+            if position + step < len(tree) and \
+               tree[position + step] <= loc:
+                position += step
+                loc -= tree[position]
+            step >>= 1
+        return position, loc
+
+    def _number(self, start):
+        """ Number the index blocks from a position on, and drop the tree. """
+        index = self._index
+        for position in xrange(start, len(index)):
+            index[position].position = position
+        self._tree = None
+
+    def _split(self, position):
+        """ Move the back half of an index block to a block of its own. """
+        block = self._index[position]
+        half = _Block(block[len(block) // 2:])
+        del block[len(block) // 2:]
+        for node in half:
+            node._block = half
+        self._index.insert(position + 1, half)
+        self._number(position + 1)
+
+    def _unlink(self, node):
+        """ Unlink a Node, leaving its own links for iterations on it. """
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node._list = None
+        self._size -= 1
+
     def __repr__(self): 
         """ Return representation of List. """
-        if not self.size > 0:
-            return ''
+        return ' <-> '.join(str(item.value) for item in self)
 
-        count = 0
-        rep = ''
-        for item in self:
-            if count == 0:
-                rep += str(item.value)
-            elif count == self.size - 1:
-                rep += ' <-> ' + str(item.value)
-            else:
-                rep += ' <-> ' + str(item.value)
+class _Block(list):
+    """ Class representing a block of Nodes in the index of a List. """
+
+    __slots__ = ('position',)
+
+def _position(items, item):
+    """ Return the position of an object in a list, found by identity. """
+    # Nodes compare by value, so list.index could match the wrong one
+    return next(compress(count(), imap(is_, items, repeat(item))))
+
+class CircularQueue(object):
+    """ Class implementing a first-in first-out ring buffer. """
+
+    def __init__(self, capacity=16):
+        """
+        Constructor
+
+            - creates new CircularQueue object.
+            - values live in a fixed-size Python list used as a ring, so
+              push and pop are O(1) and allocate nothing until the ring
+              has to double in size.
+            - ex. :
+                obj = CircularQueue()
+
+        Parameters
+        ----------
+        capacity : int
+            - number of values the ring holds before it first grows
+
+        """
+        self._head = 0
+        self._ring = [None] * max(capacity, 1)
+        self._size = 0
 
-            count += 1
+    @property
+    def empty(self):
+        """ Return whether the CircularQueue is empty. """
+        return self._size == 0
 
-        return rep
+    @property
+    def first(self):
+        """ Return the value that would be popped next. """
+        return self._ring[self._head] if self._size > 0 else None
+
+    def pop(self):
+        """ Remove and return the oldest value. """
+        if self._size == 0:
+            return None
+
+        value = self._ring[self._head]
+        self._ring[self._head] = None
+        self._head = (self._head + 1) % len(self._ring)
+        self._size -= 1
+        return value
+
+    def push(self, value):
+        """ Insert value at the back of the CircularQueue. """
+        ring = self._ring
+        if self._size == len(ring):
+            # unroll the ring into a list twice its size
+            ring = ring[self._head:] + ring[:self._head] + [None] * len(ring)
+            self._ring = ring
+            self._head = 0
+
+        ring[(self._head + self._size) % len(ring)] = value
+        self._size += 1
+
+    @property
+    def size(self):
+        """ Return the size of the CircularQueue. """
+        return self._size
 
+    def __repr__(self):
+        """ Return representation of CircularQueue. """
+        ring = self._ring
+        return ' <-> '.join(str(ring[(self._head + i) % len(ring)])
+                            for i in xrange(self._size))
+
+class PriorityQueue(object):
+    """ Class implementing a binary-heap priority queue. """
+
+    def __init__(self, key=lambda x: x):
+        """
+        Constructor
+
+            - creates new PriorityQueue object.
+            - values are ordered by `key`; values with equal keys come out
+              in the order they were pushed, the same order a stable sort
+              of a List would give.
+            - push and pop are O(log n), unlike re-sorting a List.
+            - a different tie-break (e.g. PID) can be had by returning a
+              tuple from `key`.
+            - ex. :
+                obj = PriorityQueue(key=lambda x: x.burst)
+
+        Parameters
+        ----------
+        key : function
+            - maps a pushed value to the value it is ordered by
+
+        """
+        self._count = count()
+        self._heap = []
+        self._key = key
+
+    @property
+    def empty(self):
+        """ Return whether the PriorityQueue is empty. """
+        return len(self._heap) == 0
+
+    @property
+    def first(self):
+        """ Return the value that would be popped next. """
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self):
+        """ Remove and return the value with the smallest key. """
+        if self._heap:
+            return heapq.heappop(self._heap)[2]
+        return None
+
+    def push(self, value):
+        """ Insert value into the PriorityQueue. """
+        heapq.heappush(self._heap,
+                       (self._key(value), next(self._count), value))
+
+    def restore(self, entries, sequence):
+        """
+        Refill the PriorityQueue from the result of snapshot().
+
+            - values are re-keyed but left in the given order, which is a
+              valid heap as long as `key` gives the same keys as before.
+
+        """
+        key = self._key
+        self._heap = [(key(value), number, value) for number, value in entries]
+        self._count = count(sequence)
+
+    def snapshot(self):
+        """
+        Return the queued values in heap order, and the next push number.
+
+            - each value comes with the number it was pushed under, which
+              breaks ties between equal keys.
+
+        """
+        sequence = next(self._count)
+        self._count = count(sequence)
+        return [(entry[1], entry[2]) for entry in self._heap], sequence
+
+    @property
+    def size(self):
+        """ Return the size of the PriorityQueue. """
+        return len(self._heap)
+
+    def __repr__(self):
+        """ Return representation of PriorityQueue. """
+        return ' <-> '.join(str(item[2]) for item in sorted(self._heap))
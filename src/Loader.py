@@ -0,0 +1,268 @@
+from array import array
+from Batch import VECTOR_THRESHOLD, _numpy
+from PCB import COLUMN_TYPE, PCB, PCBTable
+
+# number of bytes of lines read from a process file at a time
+CHUNK_SIZE = 1 << 20
+
+# number of malformed lines quoted in the message of a ParseError
+MAX_REPORTED = 10
+
+# largest value a column can hold; a larger one is malformed
+COLUMN_MAX = (1 << (8 * array(COLUMN_TYPE).itemsize - 1)) - 1
+
+class ParseError(RuntimeError):
+    """ Exception raised for malformed lines in a process file. """
+
+    # message, around the lines in error
+    template = 'Malformed process data on %s'
+
+    def __init__(self, errors):
+        """
+        Constructor
+
+            - creates new ParseError object.
+            - ex. :
+                raise ParseError([(3, '2760,0,sixteen,1')])
+
+        Parameters
+        ----------
+        errors : list
+            - (line number, line) pairs, numbered from 1
+
+        """
+        self.errors = errors
+        message = '; '.join('line %d: %r' % error
+                            for error in errors[:MAX_REPORTED])
+        if len(errors) > MAX_REPORTED:
+            message += '; and %d more' % (len(errors) - MAX_REPORTED)
+        super(ParseError, self).__init__(self.template % message)
+
+class BurstsError(ParseError):
+    """ Exception raised for I/O bursts where only one CPU burst fits. """
+
+    template = 'I/O bursts are not supported by binary traces, PCBTables, ' \
+               'sweeps or the result cache (%s)'
+
+def read_columns(f, chunk_size=CHUNK_SIZE):
+    """
+    Yield the processes of a process file a chunk at a time, as columns.
+
+        - each chunk of lines is parsed in bulk: the data lines are joined
+          and converted to integers in one call, so no Python code runs
+          per value, and yielded as (pid, arrival, burst, priority)
+          arrays.
+        - the conversion is done by NumPy's text parser when NumPy is
+          installed and the chunk holds only digits, separators and
+          spaces, and by map(int, ...) otherwise.
+        - comment lines (starting with '#') and blank lines are skipped;
+          whitespace around values is allowed.
+        - any other line without exactly four non-negative integers of
+          at most COLUMN_MAX is malformed, and a ParseError naming every
+          malformed line of the chunk is raised when the chunk is
+          reached, whichever parser is used.
+        - a line that is only out of place for going on with I/O
+          bursts, which read_processes accepts, raises a BurstsError
+          naming every such line instead.
+        - ex. :
+            with open('res/processes.txt') as f:
+                for pid, arrival, burst, priority in read_columns(f):
+                    print len(pid)
+
+    Parameters
+    ----------
+    f : file
+        - open process file, in the syntax described in the README
+    chunk_size : int
+        - approximate number of bytes read per chunk
+
+    """
+    first_line = 1
+    while True:
+        lines = f.readlines(chunk_size)
+        if not lines:
+            break
+
+        columns = _parse_chunk(lines)
+        if columns is None:
+            raise _chunk_error(lines, first_line)
+        yield columns
+
+        first_line += len(lines)
+
+def read_processes(f, chunk_size=CHUNK_SIZE):
+    """
+    Yield PCBs from a process file as they are read.
+
+        - the file is read `chunk_size` bytes' worth of lines at a time,
+          so only one chunk is held in memory no matter how large the
+          file is.
+        - same syntax and errors as read_columns, except that a line may
+          go on with pairs of I/O and CPU burst times after the priority,
+          for a process that does I/O (see PCB).
+        - a chunk of plain four-value lines is parsed in bulk as by
+          read_columns; one holding I/O bursts is parsed a line at a
+          time.
+        - ex. :
+            with open('res/processes.txt') as f:
+                for process in read_processes(f):
+                    print process.pid
+
+    Parameters
+    ----------
+    f : file
+        - open process file, in the syntax described in the README
+    chunk_size : int
+        - approximate number of bytes read per chunk
+
+    """
+    first_line = 1
+    while True:
+        lines = f.readlines(chunk_size)
+        if not lines:
+            break
+
+        columns = _parse_chunk(lines)
+        if columns is not None:
+            for pid, arrival, burst, priority in zip(*columns):
+                yield PCB(dict(pid=pid, arrival=arrival,
+                               burst=burst, priority=priority))
+        else:
+            rows = _parse_rows(lines)
+            if rows is None:
+                raise ParseError(_malformed(lines, first_line, bursts=True))
+            for row in rows:
+                yield PCB(dict(pid=row[0], arrival=row[1],
+                               bursts=row[2:3] + row[4:], priority=row[3]))
+
+        first_line += len(lines)
+
+def read_table(f, chunk_size=CHUNK_SIZE):
+    """
+    Read a whole process file into a PCBTable.
+
+        - same syntax, chunked reading and errors as read_columns; each
+          chunk's columns are appended to the table's columns whole,
+          without creating a PCB or a row at a time.
+
+    Parameters
+    ----------
+    f : file
+        - open process file, in the syntax described in the README
+    chunk_size : int
+        - approximate number of bytes read per chunk
+
+    """
+    table = PCBTable()
+    for columns in read_columns(f, chunk_size):
+        table.extend(*columns)
+    return table
+
+def write_process(f, process):
+    """ Write the timing information of a finished process as a CSV line. """
+    f.write('%d,%d,%d,%d,%d,%d,%d\n' % (process.pid, process.burst,
+                                        process.arrival, process.priority,
+                                        process.completion,
+                                        process.turn_around,
+                                        process.waiting))
+
+def _chunk_error(lines, first_line):
+    """ Return the error for a chunk of lines that did not parse as columns. """
+    errors = _malformed(lines, first_line, bursts=True)
+    if errors:
+        return ParseError(errors)
+
+    # every line is well formed once I/O bursts are allowed, so the lines
+    # that are not without them are exactly those with I/O bursts
+    return BurstsError(_malformed(lines, first_line))
+
+def _is_plain(text):
+    """ Return whether joined lines hold only non-empty runs of digits. """
+    text = text.translate(None, ' \t\r')
+    return not text.translate(None, '0123456789,\n') and \
+        ',,' not in text and ',\n' not in text and \
+        not text.startswith(',') and not text.endswith(',')
+
+def _malformed(lines, first_line, bursts=False):
+    """
+    Return (line number, line) for every malformed line of a chunk.
+
+        - with `bursts`, a line may hold pairs of I/O and CPU burst times
+          after the first four values.
+
+    """
+    errors = []
+    for number, line in enumerate(lines, first_line):
+        if line.startswith('#') or not line.strip():
+            continue
+        if _parse_row(line, bursts) is None:
+            errors.append((number, line.rstrip('\r\n')))
+    return errors
+
+def _parse_chunk(lines):
+    """ Parse a chunk of lines into columns, or return None if any is malformed. """
+    rows = [line for line in lines
+            if not line.startswith('#') and not line.isspace()]
+    if not rows:
+        return tuple(array(COLUMN_TYPE) for _ in xrange(4))
+
+    # every row but the last in the file ends in a newline, and only its
+    # fourth value can hold it; a row with too few or too many values
+    # shifts a newline into one of the first three
+    text = ','.join(rows)
+    fields = text.split(',')
+    if len(fields) != 4 * len(rows) or \
+       '\n' in ''.join(fields[0::4]) or \
+       '\n' in ''.join(fields[1::4]) or \
+       '\n' in ''.join(fields[2::4]):
+        return None
+
+    # NumPy's parser also reads exponents, fractions, hexadecimal and
+    # blank values, which int() rejects, so it is only given a chunk of
+    # plain digits; any other chunk is parsed exactly below
+    numpy = _numpy() if len(rows) >= VECTOR_THRESHOLD else None
+    if numpy is not None and _is_plain(text):
+        # the parser stops at the first value it cannot read, so a short
+        # result means a malformed value
+        values = numpy.fromstring(text.replace('\n', ' '), dtype=COLUMN_TYPE,
+                                  sep=',')
+        if len(values) != len(fields) or values.min() < 0:
+            return None
+
+        # the parser saturates a value out of range to COLUMN_MAX, so a
+        # chunk reaching it is parsed again below, where it is exact
+        if values.max() < COLUMN_MAX:
+            return tuple(array(COLUMN_TYPE, values[index::4].tostring())
+                         for index in xrange(4))
+
+    try:
+        values = map(int, fields)
+    except ValueError:
+        return None
+    if min(values) < 0 or max(values) > COLUMN_MAX:
+        return None
+
+    return tuple(array(COLUMN_TYPE, values[index::4]) for index in xrange(4))
+
+def _parse_row(line, bursts=False):
+    """ Parse a line into a tuple of values, or return None if malformed. """
+    try:
+        values = tuple(int(value) for value in line.split(','))
+    except ValueError:
+        return None
+    if len(values) < 4 or min(values) < 0 or max(values) > COLUMN_MAX or \
+       (len(values) != 4 and not (bursts and len(values) % 2 == 0)):
+        return None
+    return values
+
+def _parse_rows(lines):
+    """ Parse a chunk of lines that may hold I/O bursts, or return None. """
+    rows = []
+    for line in lines:
+        if line.startswith('#') or not line.strip():
+            continue
+        row = _parse_row(line, bursts=True)
+        if row is None:
+            return None
+        rows.append(row)
+    return rows
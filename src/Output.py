@@ -0,0 +1,292 @@
+import struct
+from array import array
+from heapq import nsmallest
+from PCB import COLUMN_TYPE, _int64_bytes
+
+# fields written for every completed process, in order
+FIELDS = ('pid', 'burst', 'arrival', 'priority', 'completion',
+          'turn_around', 'waiting')
+
+# headers of the human-readable table, one per field
+HEADERS = ['PID', 'Burst Time', 'Arrival Time', 'Priority', 'Completion Time',
+           'Turn Around Time', 'Waiting Time']
+
+# number of processes buffered by a sink between writes
+BUFFER_SIZE = 8192
+
+# first bytes of a binary results file, followed by the version and the
+# number of fields per record, each record being that many little-endian
+# signed 64-bit integers
+MAGIC = 'PCBRSULT'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+
+class Sink(object):
+    """ Class implementing the shared core of the output sinks. """
+
+    def __init__(self, f, buffer_size=BUFFER_SIZE, header=None):
+        """
+        Constructor
+
+            - creates new Sink object.
+            - not used directly; subclasses provide `_flush`, which writes
+              a batch of buffered records in one call.
+            - nothing is written until the first flush, so the caller can
+              still write lines of its own ahead of the records.
+            - a sink is callable, so it can be passed to a scheduler as
+              `on_complete` and receive each process as it completes.
+            - ex. :
+                sink = CSVSink(sys.stdout)
+                SJF(processes=processes, on_complete=sink).run()
+                sink.close()
+
+        Parameters
+        ----------
+        f : file
+            - file the records are written to
+        buffer_size : int
+            - number of processes buffered between writes
+        header : str
+            - written once, ahead of the first records
+
+        """
+        super(Sink, self).__init__()
+        self._buffer = []
+        self._buffer_size = buffer_size
+        self._file = f
+        self._header = header
+        self.count = 0
+        self.total_turn_around = 0
+        self.total_waiting = 0
+
+    def averages(self):
+        """ Return the average turn around and waiting times written. """
+        if self.count == 0:
+            return 0.0, 0.0
+        return (self.total_turn_around / (self.count * 1.0),
+                self.total_waiting / (self.count * 1.0))
+
+    def close(self):
+        """ Write out everything still buffered. """
+        self.flush()
+        self._file.flush()
+
+    def flush(self):
+        """ Write out the buffered records. """
+        if self._header is not None:
+            self._file.write(self._header)
+            self._header = None
+        if self._buffer:
+            self._flush(self._buffer)
+            self._buffer = []
+
+    def write(self, process):
+        """ Buffer the timing information of a completed process. """
+        self._buffer.append(self._record(process))
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    __call__ = write
+
+    def _flush(self, records):
+        """ Write a batch of records. """
+        raise NotImplementedError()
+
+    def _record(self, process):
+        """ Return the record of a completed process and count it. """
+        record = _fields(process)
+        self.count += 1
+        self.total_turn_around += record[5]
+        self.total_waiting += record[6]
+        return record
+
+    def __repr__(self):
+        """ Return representation of Sink. """
+        return '<%s count=%r>' % (type(self).__name__, self.count)
+
+class CSVSink(Sink):
+    """ Class writing completed processes as CSV lines. """
+
+    # format of a single record
+    line = '%d,%d,%d,%d,%d,%d,%d\n'
+
+    def __init__(self, f, buffer_size=BUFFER_SIZE, header=True):
+        """
+        Constructor
+
+            - creates new CSVSink object.
+            - writes the same lines as Loader.write_process, a batch at a
+              time, after a comment line naming the fields.
+
+        """
+        super(CSVSink, self).__init__(f, buffer_size, '# %s\n' %
+                                      ','.join(FIELDS) if header else None)
+
+    def _flush(self, records):
+        """ Write a batch of records. """
+        line = self.line
+        self._file.write(''.join([line % record for record in records]))
+
+class JSONLSink(CSVSink):
+    """ Class writing completed processes as JSON Lines. """
+
+    # every field is an integer, so a record can be formatted directly
+    # rather than through the json module
+    line = '{%s}\n' % ', '.join('"%s": %%d' % field for field in FIELDS)
+
+    def __init__(self, f, buffer_size=BUFFER_SIZE):
+        """
+        Constructor
+
+            - creates new JSONLSink object.
+            - writes one JSON object per process, keyed by FIELDS.
+
+        """
+        super(JSONLSink, self).__init__(f, buffer_size, header=False)
+
+class BinarySink(Sink):
+    """ Class writing completed processes as packed binary records. """
+
+    def __init__(self, f, buffer_size=BUFFER_SIZE):
+        """
+        Constructor
+
+            - creates new BinarySink object.
+            - writes HEADER, then one record of len(FIELDS) little-endian
+              signed 64-bit integers per process, so the number of
+              records follows from the size of the file.
+
+        """
+        super(BinarySink, self).__init__(f, buffer_size,
+                                         HEADER.pack(MAGIC, VERSION,
+                                                     len(FIELDS)))
+
+    def _flush(self, records):
+        """ Write a batch of records. """
+        values = array(COLUMN_TYPE)
+        for record in records:
+            values.extend(record)
+        self._file.write(_int64_bytes(values))
+
+class TableSink(Sink):
+    """ Class writing completed processes as a human-readable table. """
+
+    def __init__(self, f, key=None, limit=None, reverse=False, title=None,
+                 averages=None):
+        """
+        Constructor
+
+            - creates new TableSink object.
+            - the table can only be rendered once every process is in,
+              so rows are held until close(); with a `limit`, only the
+              first `limit` rows in order of `key` are held, trimmed as
+              they come in, so memory stays bounded for any run.
+            - the averages printed under the table cover every process,
+              not just those shown; when they are already known, e.g. a
+              scheduler's own averages() after a run, they can be passed
+              in as `averages` and are not summed again row by row.
+            - ex. :
+                sink = TableSink(sys.stdout, key=lambda x: x.waiting,
+                                 limit=10, reverse=True)
+
+        Parameters
+        ----------
+        f : file
+            - file the table is written to
+        key : function
+            - returns the value rows are ordered by, defaulting to pid
+        limit : int
+            - number of rows shown, defaulting to all of them
+        reverse : bool
+            - show the rows with the largest keys first
+        title : str
+            - line printed above the table
+        averages : tuple
+            - average turn around and waiting times printed under the
+              table, instead of those of the rows written
+
+        """
+        super(TableSink, self).__init__(f)
+        self._averages = averages
+        self._key = key if key is not None else lambda x: x.pid
+        self._limit = limit
+        self._reverse = reverse
+        self._rows = []
+        self._title = title
+
+    def averages(self):
+        """ Return the average turn around and waiting times of the table. """
+        if self._averages is not None:
+            return self._averages
+        return super(TableSink, self).averages()
+
+    def close(self):
+        """ Render the table and the averages. """
+        from tabulate import tabulate
+
+        rows = sorted(self._rows, key=lambda x: x[0], reverse=self._reverse)
+        if self._limit is not None:
+            rows = rows[:self._limit]
+
+        avg_turn_around, avg_wait = self.averages()
+        if self._title is not None:
+            self._file.write('%s\n' % self._title)
+        if self._limit is not None and self.count > len(rows):
+            self._file.write('%d of %d processes shown\n' % (len(rows),
+                                                             self.count))
+        self._file.write('%s\n' % tabulate([row[1] for row in rows],
+                                           headers=HEADERS,
+                                           tablefmt='orgtbl'))
+        self._file.write('Avg. Turn Around Time:  %s\n' % avg_turn_around)
+        self._file.write('Avg. Waiting Time:  %s\n' % avg_wait)
+        self._file.flush()
+
+    def write(self, process):
+        """ Hold the row of a completed process for the table. """
+        if self._averages is None:
+            record = self._record(process)
+        else:
+            record = _fields(process)
+            self.count += 1
+        self._rows.append((self._key(process), record))
+
+        # trim back to the limit once twice as many rows are held, so the
+        # cost of trimming is spread over the rows since the last time
+        if self._limit is not None and len(self._rows) >= 2 * self._limit:
+            self._rows = self._trim(self._rows)
+
+    __call__ = write
+
+    def _trim(self, rows):
+        """ Return the `limit` rows that would be shown first. """
+        if self._reverse:
+            return nsmallest(self._limit, rows,
+                             key=lambda x: _Reversed(x[0]))
+        return nsmallest(self._limit, rows, key=lambda x: x[0])
+
+def _fields(process):
+    """ Return the FIELDS of a completed process, in order. """
+    return (process.pid, process.burst, process.arrival, process.priority,
+            process.completion, process.turn_around, process.waiting)
+
+class _Reversed(object):
+    """ Class wrapping a key so that it sorts in reverse. """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        """
+        Constructor
+
+            - creates new _Reversed object.
+
+        """
+        self.value = value
+
+    def __lt__(self, comp):
+        """ Return whether the wrapped key is greater than another. """
+        return comp.value < self.value
+
+# sinks by the name used to select them on the command line
+SINKS = {'binary': BinarySink, 'csv': CSVSink, 'jsonl': JSONLSink,
+         'table': TableSink}
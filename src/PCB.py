@@ -1,15 +1,51 @@
+import struct
+import sys
+from array import array
+from functools import partial
+from itertools import islice, izip
+
+# typecode of the integer columns in a PCBTable; files hold them as
+# little-endian signed 64-bit integers, see _int64_bytes and _int64_column
+COLUMN_TYPE = 'l'
+
+# number of rows compared at a time when checking the order of a column
+SORT_CHUNK = 1 << 20
+
+# dictionary of all possible states
+STATES = {000: 'new',
+          001: 'ready',
+          010: 'running',
+          011: 'waiting',
+          100: 'terminated'}
 
 class PCB(object):
     """ Class representing a process control block (PCB). """
 
+    __slots__ = ('_arrival', '_burst', '_bursts', '_completion', '_io',
+                 '_next', '_pid', '_priority', '_ready_since', '_remaining',
+                 '_start', '_state', '_turn_around', '_waiting')
+
+    # set of all acceptable options
+    __accepted = frozenset(['arrival', 'burst', 'bursts', 'pid', 'priority',
+                            'state'])
+
+    # dictionary of all possible states
+    __states = STATES
+
     def __init__(self, iterable=(), state=000, **kwargs): 
         """
         Constructor
         
             - creates new PCB object.
+            - a process that does I/O is given `bursts` instead of
+              `burst`: its CPU and I/O bursts in turn, starting and ending
+              with a CPU burst. `burst` is then its total CPU time, and
+              `io` its total I/O time.
             - ex. :
                 obj = PCB(dict(arrival=1, burst=16, pid=2760,
                                priority=1, state=000))
+                obj = PCB(dict(arrival=1, bursts=(6, 20, 10), pid=2760,
+                               priority=1))
 
         Parameters
         ----------
@@ -21,23 +57,16 @@ class PCB(object):
               included for proper function
             - options:
                 * arrival
-                * burst
+                * burst, or bursts
                 * pid
                 * priority
                 * (optional) state
 
         """
 
-        # set of all acceptable options
-        self.__accepted = set(['arrival', 'burst', 'pid',
-                               'priority', 'state'])
-
-        # dictionary of all possible states
-        self.__states = {000: 'new',
-                         001: 'ready',
-                         010: 'running',
-                         011: 'waiting',
-                         100: 'terminated'}
+        self._bursts = None
+        self._io = 0
+        self._next = 0
         self._state = state
 
         # set class attributes, with proper exception handling 
@@ -47,21 +76,31 @@ class PCB(object):
                     raise KeyError('given state invalid')
             if k not in self.__accepted:
                 raise ValueError('given variable not acceptable')
+            if k == 'bursts':
+                continue
             try:
                 setattr(self, '_'+k, int(v))
             except ValueError:
                 raise RuntimeError('PCBs must be initialized with integers only.')
 
+        if 'bursts' in iterable:
+            if hasattr(self, '_burst'):
+                raise ValueError('given both burst and bursts')
+            self._set_bursts(iterable['bursts'])
+
         # make sure that all options have been passed,
         # else, raise an exception
         for item in self.__accepted:
-            if item == 'state':
+            if item in ('bursts', 'state'):
                 continue
-            if '_'+item not in self.__dict__.keys():
+            if not hasattr(self, '_'+item):
                 raise RuntimeError('incomplete PCB values')
 
         # keep track of timing information
         self._completion = 0
+        self._ready_since = self._arrival
+        self._remaining = self._burst if self._bursts is None \
+                          else self._bursts[0]
         self._start = 0
         self._turn_around = 0
         self._waiting = 0
@@ -73,9 +112,14 @@ class PCB(object):
 
     @property
     def burst(self):
-        """ Return process burst time. """
+        """ Return process burst time, over all of its CPU bursts. """
         return self._burst
 
+    @property
+    def bursts(self):
+        """ Return process CPU and I/O bursts, in turn. """
+        return self._bursts if self._bursts is not None else (self._burst,)
+
     @property
     def completion(self):
         """ Return process completion time. """
@@ -85,6 +129,24 @@ class PCB(object):
     def completion(self, new_comp):
         self._completion = int(new_comp)
 
+    @property
+    def cpu_burst(self):
+        """ Return the length of the current CPU burst. """
+        return self._burst if self._bursts is None \
+               else self._bursts[self._next]
+
+    @property
+    def fresh(self):
+        """ Return whether the process has yet to run. """
+        if self._bursts is None:
+            return self._remaining == self._burst
+        return self._next == 0 and self._remaining == self._bursts[0]
+
+    @property
+    def io(self):
+        """ Return process I/O time, over all of its I/O bursts. """
+        return self._io
+
     @property
     def pid(self):
         """ Return process id (PID). """
@@ -95,6 +157,26 @@ class PCB(object):
         """ Return process priority. """
         return self._priority
 
+    @property
+    def ready_since(self):
+        """ Return the time the process last entered the ready queue. """
+        return self._ready_since
+
+    @ready_since.setter
+    def ready_since(self, new_time):
+        """ Set the time the process last entered the ready queue. """
+        self._ready_since = new_time
+
+    @property
+    def remaining(self):
+        """ Return process remaining burst time. """
+        return self._remaining
+
+    @remaining.setter
+    def remaining(self, new_rem):
+        """ Set new remaining burst time for process. """
+        self._remaining = int(new_rem)
+
     @property
     def start(self):
         """ Return process start time. """
@@ -136,6 +218,43 @@ class PCB(object):
         """ Set new waiting time for process. """
         self._waiting = int(new_wait)
 
+    def next_burst(self):
+        """
+        Move on to the next CPU burst once the current one is done.
+
+            - returns the length of the I/O burst in between, or None if
+              the current CPU burst was the last one.
+
+        """
+        bursts = self._bursts
+        if bursts is None or self._next + 1 == len(bursts):
+            return None
+        self._next += 2
+        self._remaining = bursts[self._next]
+        return bursts[self._next - 1]
+
+    def rewind(self):
+        """ Go back to the start of the first CPU burst. """
+        self._next = 0
+        self._ready_since = self._arrival
+        self._remaining = self._burst if self._bursts is None \
+                          else self._bursts[0]
+
+    def _set_bursts(self, bursts):
+        """ Set the CPU and I/O bursts, and the totals they add up to. """
+        try:
+            bursts = tuple(int(burst) for burst in bursts)
+        except (TypeError, ValueError):
+            raise RuntimeError('PCBs must be initialized with integers only.')
+        if len(bursts) % 2 == 0 or min(bursts) < 0:
+            raise ValueError('bursts must alternate CPU and I/O times, '
+                             'starting and ending with a CPU burst')
+
+        self._burst = sum(bursts[0::2])
+        if len(bursts) > 1:
+            self._bursts = bursts
+            self._io = sum(bursts[1::2])
+
     def __eq__(self, comp):
         """ Compare equality of two PCBs. """
         return self._pid == comp.pid
@@ -168,3 +287,524 @@ class PCB(object):
         """ Return string representation of PCB. """
         return str(self._pid)
 
+
+class PCBTable(object):
+    """ Class implementing a columnar store of many processes. """
+
+    # integer columns, in the order they are laid out
+    columns = ('pid', 'arrival', 'burst', 'priority', 'remaining',
+               'start', 'completion', 'waiting', 'turn_around')
+
+    # columns written as processes are scheduled, along with the state
+    timings = ('remaining', 'start', 'completion', 'waiting', 'turn_around')
+
+    def __init__(self):
+        """
+        Constructor
+
+            - creates new PCBTable object.
+            - each field is kept in its own typed `array`, so a process
+              costs a few machine words instead of a full PCB object.
+            - rows are handed out as PCBView objects, which have the same
+              properties as a PCB and can be scheduled in its place.
+            - `sorted_by_arrival` is True once the arrival column is known
+              to be non-decreasing, False once it is known not to be, and
+              None until then.
+            - ex. :
+                obj = PCBTable()
+                obj.append(pid=2760, arrival=0, burst=16, priority=1)
+
+        """
+        for name in self.columns:
+            setattr(self, '_' + name, array(COLUMN_TYPE))
+        self._state = array('B')
+        self.sorted_by_arrival = None
+
+    @classmethod
+    def from_columns(cls, pid, arrival, burst, priority,
+                     sorted_by_arrival=None):
+        """
+        Build a PCBTable around existing input columns.
+
+            - the columns are used as given, not copied, so they can live
+              in shared or memory-mapped storage; any equal-length
+              sequences of integers that support indexing will do.
+            - the timing columns and the state are only allocated once
+              a row is scheduled, so building the table costs nothing per
+              row; use pcbs_by_arrival() to schedule the rows without
+              them. The table cannot be appended to.
+            - `sorted_by_arrival` may be given when the order of the
+              arrival column is already known, e.g. from a trace header.
+
+        """
+        table = cls()
+        table.sorted_by_arrival = sorted_by_arrival
+        table._pid = pid
+        table._arrival = arrival
+        table._burst = burst
+        table._priority = priority
+        for name in cls.timings + ('state',):
+            delattr(table, '_' + name)
+        return table
+
+    @classmethod
+    def from_processes(cls, processes):
+        """ Build a PCBTable from an iterable of PCBs. """
+        table = cls()
+        for process in processes:
+            table.append(process.pid, process.arrival,
+                         process.burst, process.priority)
+        return table
+
+    @classmethod
+    def wrap(cls, columns, state):
+        """
+        Build a PCBTable around a full set of existing columns.
+
+            - `columns` maps every name in `columns` to its column, and
+              `state` is the state column; none of them are copied, so
+              several tables can share them as long as none is written.
+
+        """
+        table = cls()
+        for name in cls.columns:
+            setattr(table, '_' + name, columns[name])
+        table._state = state
+        return table
+
+    def append(self, pid, arrival, burst, priority):
+        """ Add a new process to the table and return a view of it. """
+        self._pid.append(int(pid))
+        self._arrival.append(int(arrival))
+        self._burst.append(int(burst))
+        self._priority.append(int(priority))
+        self._remaining.append(int(burst))
+        self._start.append(0)
+        self._completion.append(0)
+        self._waiting.append(0)
+        self._turn_around.append(0)
+        self._state.append(000)
+        self.sorted_by_arrival = None
+        return PCBView(self, len(self._pid) - 1)
+
+    def extend(self, pid, arrival, burst, priority):
+        """ Add the processes held in equal-length input columns. """
+        zeros = array(COLUMN_TYPE, [0]) * len(pid)
+        self._pid.extend(pid)
+        self._arrival.extend(arrival)
+        self._burst.extend(burst)
+        self._priority.extend(priority)
+        self._remaining.extend(burst)
+        self._start.extend(zeros)
+        self._completion.extend(zeros)
+        self._waiting.extend(zeros)
+        self._turn_around.extend(zeros)
+        self._state.extend(array('B', [000]) * len(pid))
+        self.sorted_by_arrival = None
+
+    def by_arrival(self):
+        """
+        Return a RowStream of a view of every process in order of arrival.
+
+            - rows already in order, as in any trace made from a file
+              that can be streamed, are yielded as they are, without
+              building an index; whether they are is checked once, in
+              chunks, and remembered.
+            - otherwise the rows are argsorted into an `array` of indices,
+              8 bytes per row, keeping rows that arrive together in table
+              order.
+
+        """
+        if self.sorted_by_arrival is None:
+            self.sorted_by_arrival = _is_sorted(self._arrival)
+
+        order = None if self.sorted_by_arrival else _argsort(self._arrival)
+        return RowStream((self._pid, self._arrival, self._burst,
+                          self._priority), partial(PCBView, self), order)
+
+    def column(self, name):
+        """ Return the underlying array of a column. """
+        return getattr(self, '_' + name)
+
+    def pcbs_by_arrival(self):
+        """
+        Yield a new PCB of every process in order of arrival time.
+
+            - each PCB holds its own timing information, so the timing
+              columns of the table are never written and, for a table
+              built with from_columns, never allocated; a PCB scheduled
+              with `on_complete` is dropped once written out, keeping
+              memory bounded however long the table is.
+
+        """
+        for view in self.by_arrival():
+            yield PCB(dict(pid=view.pid, arrival=view.arrival,
+                           burst=view.burst, priority=view.priority))
+
+    @property
+    def nbytes(self):
+        """ Return the number of bytes held by the columns allocated. """
+        return sum(len(buffer(self.__dict__['_' + name]))
+                   for name in self.columns + ('state',)
+                   if '_' + name in self.__dict__)
+
+    @property
+    def size(self):
+        """ Return the number of processes in the table. """
+        return len(self._pid)
+
+    def __getattr__(self, name):
+        """ Allocate the timing columns and the state once one is used. """
+        if name[1:] not in self.timings + ('state',) or \
+           '_pid' not in self.__dict__:
+            raise AttributeError(name)
+
+        zeros = array(COLUMN_TYPE, [0]) * len(self._pid)
+        self._remaining = _copy_column(self._burst)
+        self._start = zeros[:]
+        self._completion = zeros[:]
+        self._waiting = zeros[:]
+        self._turn_around = zeros
+        self._state = array('B', [000]) * len(self._pid)
+        return getattr(self, name)
+
+    def __getitem__(self, index):
+        """ Return a view of the process at a given row. """
+        if not -self.size <= index < self.size:
+            raise IndexError('PCBTable index out of range')
+        return PCBView(self, index % self.size)
+
+    def __iter__(self):
+        """ Yield a view of every process in row order. """
+        for index in xrange(len(self._pid)):
+            yield PCBView(self, index)
+
+    def __len__(self):
+        """ Return the number of processes in the table. """
+        return len(self._pid)
+
+    def __repr__(self):
+        """ Return representation of PCBTable. """
+        return '<PCBTable size=%r>' % self.size
+
+def _argsort(column):
+    """ Return the indices that stably sort a column, as an array. """
+    # imported here, as Batch itself depends on this module
+    from Batch import VECTOR_THRESHOLD, _numpy
+
+    numpy = _numpy() if len(column) >= VECTOR_THRESHOLD else None
+    if numpy is None:
+        return array(COLUMN_TYPE, sorted(xrange(len(column)),
+                                         key=column.__getitem__))
+
+    indices = numpy.argsort(_int64_view(numpy, column), kind='mergesort')
+    order = array(COLUMN_TYPE)
+    if indices.itemsize == order.itemsize:
+        order.fromstring(buffer(indices))
+    else:
+        order.extend(indices.tolist())
+    return order
+
+def _copy_column(values, start=0):
+    """ Return a copy of an integer column, from row `start`, as an array. """
+    column = array(COLUMN_TYPE)
+
+    # a column laid out like the array itself, e.g. a ctypes array over a
+    # memory-mapped trace, is copied as a block rather than item by item
+    try:
+        data = buffer(values)
+    except TypeError:
+        data = None
+    if data is not None and len(data) == len(values) * column.itemsize and \
+       sys.byteorder == 'little':
+        column.fromstring(buffer(data, start * column.itemsize))
+    else:
+        column.extend(islice(values, start, None))
+    return column
+
+class PCBView(object):
+    """ Class representing one row of a PCBTable as a PCB. """
+
+    __slots__ = ('_index', '_table')
+
+    def __init__(self, table, index):
+        """
+        Constructor
+
+            - creates new PCBView object.
+            - holds nothing but its table and row, so views are cheap to
+              create and can be thrown away once scheduled.
+            - ex. :
+                obj = PCBView(table, 0)
+
+        Parameters
+        ----------
+        table : PCBTable
+            - table holding the process
+        index : int
+            - row of the process in the table
+
+        """
+        self._index = index
+        self._table = table
+
+    @property
+    def arrival(self):
+        """ Return process arrival time. """
+        return self._table._arrival[self._index]
+
+    @property
+    def burst(self):
+        """ Return process burst time. """
+        return self._table._burst[self._index]
+
+    @property
+    def bursts(self):
+        """ Return process CPU and I/O bursts, in turn. """
+        # a table holds a single CPU burst per process
+        return (self._table._burst[self._index],)
+
+    @property
+    def completion(self):
+        """ Return process completion time. """
+        return self._table._completion[self._index]
+
+    @completion.setter
+    def completion(self, new_comp):
+        self._table._completion[self._index] = int(new_comp)
+
+    @property
+    def cpu_burst(self):
+        """ Return the length of the current CPU burst. """
+        return self._table._burst[self._index]
+
+    @property
+    def fresh(self):
+        """ Return whether the process has yet to run. """
+        return self._table._remaining[self._index] == \
+               self._table._burst[self._index]
+
+    @property
+    def io(self):
+        """ Return process I/O time, over all of its I/O bursts. """
+        return 0
+
+    @property
+    def pid(self):
+        """ Return process id (PID). """
+        return self._table._pid[self._index]
+
+    @property
+    def priority(self):
+        """ Return process priority. """
+        return self._table._priority[self._index]
+
+    @property
+    def ready_since(self):
+        """ Return the time the process entered the ready queue. """
+        # a single CPU burst is only ever queued from its arrival
+        return self._table._arrival[self._index]
+
+    @property
+    def remaining(self):
+        """ Return process remaining burst time. """
+        return self._table._remaining[self._index]
+
+    @remaining.setter
+    def remaining(self, new_rem):
+        """ Set new remaining burst time for process. """
+        self._table._remaining[self._index] = int(new_rem)
+
+    @property
+    def start(self):
+        """ Return process start time. """
+        return self._table._start[self._index]
+
+    @start.setter
+    def start(self, new_st):
+        """ Set new start time for process. """
+        self._table._start[self._index] = int(new_st)
+
+    @property
+    def state(self):
+        """ Return current process state. """
+        return STATES[self._table._state[self._index]]
+
+    @state.setter
+    def state(self, new_st):
+        """ Set new state for a process. """
+        if new_st in STATES:
+            self._table._state[self._index] = new_st
+
+    @property
+    def turn_around(self):
+        """ Return process turn around time. """
+        return self._table._turn_around[self._index]
+
+    @turn_around.setter
+    def turn_around(self, new_ta):
+        """ Set new turn around time for process. """
+        self._table._turn_around[self._index] = int(new_ta)
+
+    @property
+    def waiting(self):
+        """ Return process waiting time. """
+        return self._table._waiting[self._index]
+
+    @waiting.setter
+    def waiting(self, new_wait):
+        """ Set new waiting time for process. """
+        self._table._waiting[self._index] = int(new_wait)
+
+    def next_burst(self):
+        """ Return None, as a table holds a single CPU burst per process. """
+        return None
+
+    def rewind(self):
+        """ Go back to the start of the CPU burst. """
+        self._table._remaining[self._index] = self._table._burst[self._index]
+
+    def __eq__(self, comp):
+        """ Compare equality of two PCBs. """
+        return self.pid == comp.pid
+
+    def __ge__(self, comp):
+        """ Check greater than or equal to. """
+        return not self.__lt__(comp)
+
+    def __gt__(self, comp):
+        """ Check greater than. """
+        return self.pid > comp.pid
+
+    def __le__(self, comp):
+        """ Check less than or equal to. """
+        return not self.__gt__(comp)
+
+    def __lt__(self, comp):
+        """ Check less than. """
+        return self.pid < comp.pid
+
+    def __ne__(self, comp):
+        """ Compare inequality of two PCBs. """
+        return not self.__eq__(comp)
+
+    def __repr__(self):
+        """ Return representation of PCBView. """
+        return '<PCBView PID=%r state=%r>' % (self.pid, self.state)
+
+    def __str__(self):
+        """ Return string representation of PCBView. """
+        return str(self.pid)
+
+class RowStream(object):
+    """ Class yielding the processes held in input columns, in order. """
+
+    __slots__ = ('_columns', '_count', '_make', '_order', 'position')
+
+    def __init__(self, columns, make, order=None):
+        """
+        Constructor
+
+            - creates new RowStream object.
+            - an iterator yielding make(index) for every row in `order`,
+              which keeps count of the rows it has yielded, so those it
+              has yet to yield can be copied out of the columns without
+              a process being made of each, see remaining().
+            - ex. :
+                obj = RowStream((pid, arrival, burst, priority),
+                                partial(PCBView, table))
+
+        Parameters
+        ----------
+        columns : tuple
+            - pid, arrival, burst and priority columns, left unchanged
+        make : function
+            - returns the process at a given row
+        order : array
+            - rows to yield, in order, or None for every row in row order
+
+        """
+        self._columns = columns
+        self._count = len(columns[0]) if order is None else len(order)
+        self._make = make
+        self._order = order
+        self.position = 0
+
+    def remaining(self):
+        """ Return the columns of the rows yet to be yielded, as arrays. """
+        if self._order is None:
+            return tuple(_copy_column(column, self.position)
+                         for column in self._columns)
+
+        rest = []
+        for values in self._columns:
+            column = array(COLUMN_TYPE)
+            column.extend(values[index] for index in
+                          islice(self._order, self.position, None))
+            rest.append(column)
+        return tuple(rest)
+
+    def next(self):
+        """ Return the process at the next row. """
+        if self.position == self._count:
+            raise StopIteration
+        index = self.position if self._order is None \
+                else self._order[self.position]
+        self.position += 1
+        return self._make(index)
+
+    def __iter__(self):
+        """ Return the RowStream itself, as it is its own iterator. """
+        return self
+
+def _int64_bytes(column):
+    """ Return an integer column as little-endian signed 64-bit integers. """
+    # arrays and ctypes columns are already laid out that way on common
+    # hosts; an array is copied as a block, while any other column, e.g.
+    # over a memory-mapped trace, is returned as a buffer over it
+    try:
+        data = buffer(column)
+    except TypeError:
+        data = None
+    if data is not None and len(data) == len(column) * 8 and \
+       sys.byteorder == 'little':
+        return column.tostring() if isinstance(column, array) else data
+    return struct.pack('<%dq' % len(column), *column)
+
+def _int64_column(data):
+    """ Return an array of the little-endian signed 64-bit integers given. """
+    column = array(COLUMN_TYPE)
+    if column.itemsize == 8 and sys.byteorder == 'little':
+        column.fromstring(data)
+    else:
+        column.extend(struct.unpack('<%dq' % (len(data) // 8), data))
+    return column
+
+def _int64_view(numpy, column):
+    """ Return a NumPy view of an integer column, or a copy if it has none. """
+    # only a column of 8-byte items can be viewed as is; an `array` of a
+    # 4-byte C long, for one, is copied instead
+    try:
+        data = buffer(column)
+    except TypeError:
+        data = None
+    if data is not None and len(data) == len(column) * 8:
+        return numpy.frombuffer(data, dtype=numpy.int64)
+    return numpy.asarray(column, dtype=numpy.int64)
+
+def _is_sorted(column):
+    """ Return whether a column is non-decreasing. """
+    from Batch import VECTOR_THRESHOLD, _numpy
+
+    numpy = _numpy() if len(column) >= VECTOR_THRESHOLD else None
+    if numpy is None:
+        return all(a <= b for a, b in izip(column, islice(column, 1, None)))
+
+    # compared a chunk at a time, each overlapping the next by one row,
+    # so the temporaries stay small however long the column is
+    values = _int64_view(numpy, column)
+    for start in xrange(0, len(values) - 1, SORT_CHUNK):
+        chunk = values[start:start + SORT_CHUNK + 1]
+        if (chunk[1:] < chunk[:-1]).any():
+            return False
+    return True
@@ -1,207 +1,1561 @@
-import argparse
-import re
-from List import List
-from PCB import PCB
-from tabulate import tabulate
-
-__parser__ = argparse.ArgumentParser('Simulate a CPU scheduler using either Shortest Job First (SJF) or Non-preemptive Priority Scheduling.')
-__parser__.add_argument('-f', '--file',
-                        type=argparse.FileType('r'))
-__parser__.add_argument('-p', '--processes',
-                        nargs=1)
-__parser__.add_argument('-a', '--algorithm',
-                        nargs=1, metavar='(sjf|npp)')
-__args__ = __parser__.parse_args()
-
-if __args__.file and __args__.processes:
-    __parser__.error('Must provide either file with process data or number of processes to be entered manually.')
-if not __args__.file and not __args__.processes:
-    __parser__.error('Must provide either file with process data or number of processes to be entered manually.')
-if not __args__.algorithm:
-    __parser__.error('Must provide type of scheduling algorithm to be used.')
-if vars(__args__)['algorithm'][0] != 'sjf' and \
-   vars(__args__)['algorithm'][0] != 'npp':
-    __parser__.error('Invalid scheduling algorithm. Must be one of: sjf or npp.')
-
-class NPP(object):
-
-    def __init__(self, processes=[]):
-        super(NPP, self).__init__()
+import sys
+from array import array
+from collections import namedtuple
+from heapq import heappop, heappush
+from itertools import count, islice
+from Batch import averages, evaluate
+from Instrument import Instrument
+from List import CircularQueue, List, PriorityQueue
+from Loader import BurstsError, read_processes
+from Output import SINKS, TableSink
+from PCB import COLUMN_TYPE, PCB, PCBTable
+from Stats import Stats
+from Timeline import Timeline
+
+# modules only some uses need (argparse, tabulate, Checkpoint, and Trace
+# with mmap, ctypes and hashlib) are imported by the functions that use
+# them, here and in the modules above, so importing the library stays cheap
+# (see bench/api.py)
+
+# version of the scheduling results, bumped whenever a change to a scheduler
+# alters them, so results cached by an older version are not reused
+VERSION = 1
+
+class Scheduler(object):
+    """ Class implementing the shared discrete-event scheduling core. """
+
+    # name printed above the output table
+    name = None
+
+    # number of streamed processes pulled into `_waiting` at a time
+    chunk_size = 4096
+
+    # whether a run is determined by its dispatch order alone, so that
+    # Batch can evaluate it instead of reading back every PCB
+    batch = True
+
+    def __init__(self, processes=[], stream=False, on_complete=None,
+                 instrument=None, stats=None, timeline=None):
+        """
+        Constructor
+
+            - creates new Scheduler object.
+            - not used directly; subclasses provide `name` and `key`,
+              the latter deciding which ready process is dispatched next.
+            - the ready queue is a heap ordered by `key`, with ties going
+              to the process that became ready first.
+            - a process with I/O bursts (see PCB) waits out each one in a
+              heap of I/O completion times, and goes back to the ready
+              queue when it is reached, so a blocked process costs
+              nothing until its I/O completes.
+            - ex. :
+                obj = SJF(processes=[PCB(dict(arrival=1, burst=16,
+                                              pid=2760, priority=1))])
+
+        Parameters
+        ----------
+        processes : (list|iterable|PCBTable)
+            - PCBs to be scheduled, in any order
+            - may be left empty and the processes given to submit() as
+              they arrive instead
+            - a PCBTable is always consumed lazily, in arrival order, so
+              only the processes in flight are materialized as PCBViews
+            - when `stream` is set, any iterable of PCBs sorted by arrival
+              time, e.g. a Loader.read_processes generator
+        stream : bool
+            - consume `processes` lazily, `chunk_size` PCBs at a time,
+              instead of sorting them all up front
+        on_complete : function
+            - called with each PCB as it completes
+            - when given, completed PCBs are handed off rather than kept
+              for output(), so memory does not grow with the trace
+            - averages() is then worked out from running sums, and
+              evaluate(), which needs every PCB, raises ValueError
+        instrument : Instrument
+            - collects event counts, timings and queue depths from run()
+            - when not given, run() carries no instrumentation at all
+        stats : Stats
+            - given every process as it completes, to keep percentiles of
+              waiting and turn around times
+        timeline : Timeline
+            - given every stretch of time a process runs for, to record
+              an execution timeline
+
+        """
+        super(Scheduler, self).__init__()
+        self._active = None
+        self._busy = 0
         self._complete = List()
+        self._count = 0
+        self._dispatched = 0
+        self._history = None
+        self._io = []
+        self._io_count = count()
+        self._last_arrival = None
+        self._on_complete = on_complete
+        self._order_arrival = array(COLUMN_TYPE)
+        self._order_burst = array(COLUMN_TYPE)
         self._processes = processes
-        self._ready = List()
+        self._ready = self._ready_queue()
+        self._source = None
+        self._stats = stats
+        self._timeline = timeline
+        self._total_turn_around = 0
+        self._total_waiting = 0
         self._waiting = List()
+        self.system_time = 0
+
+        if instrument is not None:
+            instrument.attach(self)
+
+        if isinstance(processes, PCBTable):
+            processes = processes.by_arrival()
+            stream = True
+
+        if stream:
+            self._processes = []
+            self._source = iter(processes)
+            return
 
         self._processes = sorted(self._processes, key=lambda x: x.arrival)
         for process in self._processes:
             process.state = 011
             self._waiting.push_back(process)
 
+    def averages(self):
+        """ Return the average turn around and waiting times of the run. """
+        # PCBs handed to `on_complete` are gone, and only their sums kept
+        if self._on_complete is not None:
+            if self._count == 0:
+                return 0.0, 0.0
+            return (self._total_turn_around / (self._count * 1.0),
+                    self._total_waiting / (self._count * 1.0))
+
+        if self.batch:
+            return averages(self._order_arrival, self._order_burst)
+
+        completion, turn_around, waiting = self.evaluate()
+        count = len(completion)
+        if count == 0:
+            return 0.0, 0.0
+
+        return (sum(turn_around) / (count * 1.0),
+                sum(waiting) / (count * 1.0))
+
+    def evaluate(self):
+        """
+        Return timing information for every process.
+
+            - when `batch` is set, computed by Batch.evaluate from the
+              dispatch order recorded by run(), rather than read back one
+              PCB at a time, and returned in dispatch order.
+            - otherwise read back from the PCBs, in completion order.
+            - not available when PCBs are handed to `on_complete`, as
+              neither is kept then.
+            - returns (completion, turn_around, waiting) columns.
+
+        """
+        if self._on_complete is not None:
+            raise ValueError('Timing columns are not kept for processes handed to on_complete.')
+        if self.batch:
+            return evaluate(self._order_arrival, self._order_burst)
+
+        completion = array(COLUMN_TYPE)
+        turn_around = array(COLUMN_TYPE)
+        waiting = array(COLUMN_TYPE)
+        for process in self._completed():
+            completion.append(process.completion)
+            turn_around.append(process.turn_around)
+            waiting.append(process.waiting)
+        return completion, turn_around, waiting
+
+    def checkpoint(self):
+        """ Return a Checkpoint of the scheduler, see Checkpoint.capture. """
+        # Checkpoint imports this module in turn
+        from Checkpoint import Checkpoint
+        return Checkpoint.capture(self)
+
+    def fork(self, **kwargs):
+        """
+        Return a copy of the scheduler that carries on independently.
+
+            - the same as self.checkpoint().restore(**kwargs); to fork many
+              branches from one point, capture the checkpoint once and
+              restore it for each branch, so they share its columns.
+
+        """
+        return self.checkpoint().restore(**kwargs)
+
+    @staticmethod
+    def key(process):
+        """ Return the value the ready queue is ordered by. """
+        raise NotImplementedError()
+
     def output(self):
         """ Output information gathered from running scheduler. """
-        self._complete.sort(key=lambda x: (x.value.priority, x.value.pid))
-
-        headers = ['PID', 'Burst Time', 'Arrival Time',
-                   'Priority', 'Completion Time', 'Turn Around Time',
-                   'Waiting Time']
-
-        
-        avg_turn_around = sum(c.value.turn_around for c in self._complete) / \
-                          (self._complete.size * 1.0)
-        avg_wait = sum(c.value.waiting for c in self._complete) / \
-                   (self._complete.size * 1.0)
-        
-        data = [[x.value.pid, x.value.burst, x.value.arrival, \
-                 x.value.priority, x.value.completion, x.value.turn_around, \
-                 x.value.waiting] for x in self._complete] 
-       
-        print 'Non-Preemptive Priority (NPP)'
-        print tabulate(data, headers=headers, tablefmt='orgtbl') 
-        print 'Avg. Turn Around Time: ', avg_turn_around
-        print 'Avg. Waiting Time: ', avg_wait
-
-    def run(self): 
-        """ Run the scheduling algorithm. """
-        active_process = None
-        system_time = 0
-        total_time = sum(c.burst for c in self._processes)
-        while system_time <= total_time:
-            
-            for proc in self._waiting:
-                if proc.value.arrival == system_time:
-                    if proc.value.state != 001:
-                        proc.value.state = 001
-                        self._ready.push_back(proc.value)
-
-            # this is the essence of NPP: sorting by priority
-            # change to sort by burst-time for SJF
-            self._ready.sort(key=lambda x: x.value.priority)
+        # the averages come from averages(), which evaluates the dispatch
+        # order in one vectorized pass where it can, not from the rows
+        sink = TableSink(sys.stdout, key=lambda x: (self.sort_key(x), x.pid),
+                         title=self.name, averages=self.averages())
+        for process in self._completed():
+            sink.write(process)
+        sink.close()
+        print 'CPU Utilization:  %.2f%%' % (100.0 * self.utilization())
 
-            if active_process is None:
-                if self._ready.size > 0:
-                    active_process = self._ready.first.value
+    def sort_key(self, process):
+        """ Return the value the output table is ordered by. """
+        return self.key(process)
+
+    def advance_to(self, system_time):
+        """
+        Run the scheduling algorithm up to a given time and stop there.
+
+            - every event up to and including `system_time` is handled,
+              then the clock is left at `system_time`; the ready queue and
+              the active process are kept on the scheduler, so the next
+              call carries on from there rather than starting over.
+            - a process submitted later with an arrival time equal to the
+              clock is admitted on the next call, after the decisions
+              already made at that time.
+            - ex. :
+                sched = SJF()
+                sched.submit(PCB(dict(arrival=0, burst=16, pid=2760,
+                                      priority=1)))
+                for process in sched.advance_to(20):
+                    print process.pid, process.completion
+
+        Returns
+        -------
+        list
+            - the processes completed by this call, in order of
+              completion, unless they are handed to `on_complete`
+
+        """
+        if system_time < self.system_time:
+            raise ValueError('Cannot advance to a time before the current time.')
+
+        before = self._complete.size
+        self._advance(system_time)
+
+        # the new completions are the last ones in `_complete`
+        completed = []
+        node = self._complete.last
+        for _ in xrange(self._complete.size - before):
+            completed.append(node.value)
+            node = node.prev
+        completed.reverse()
+        return completed
+
+    def coroutine(self):
+        """
+        Return a generator driving the scheduler, for use in event loops.
+
+            - after priming it with next(), each send((system_time,
+              processes)) submits the processes, advances the clock to
+              `system_time` and returns the processes completed, so a
+              caller in an event loop never blocks for longer than the
+              events in between take.
+            - ex. :
+                online = sched.coroutine()
+                next(online)
+                completed = online.send((5, [process]))
+
+        """
+        completed = []
+        while True:
+            system_time, processes = yield completed
+            for process in processes:
+                self.submit(process)
+            completed = self.advance_to(system_time)
+
+    def run(self):
+        """ Run the scheduling algorithm until every process completes. """
+        self._advance(None)
+
+    def submit(self, process):
+        """
+        Add a process to a scheduler that may already be running.
+
+            - the process must not arrive before the current time.
+            - submitting in order of arrival is O(1); a process arriving
+              before the last one submitted is inserted in order, walking
+              in from whichever end of the waiting processes is nearer in
+              arrival time.
+            - on a streamed trace, the stream is first read up to the
+              arrival time of the process, which then goes after any
+              streamed process arriving at the same time.
+
+        """
+        if process.arrival < self.system_time:
+            raise ValueError('Cannot submit a process arriving before the current time.')
+
+        # every process still in the stream must arrive after this one,
+        # so that `_fill` only ever needs to pull once `_waiting` is empty
+        while self._source is not None and \
+              (self._last_arrival is None or
+               self._last_arrival <= process.arrival):
+            self._pull()
+
+        process.state = 011
+        last = self._waiting.last
+        if last is None or last.value.arrival <= process.arrival:
+            self._waiting.push_back(process)
+            return
+
+        # `_waiting` is sorted, so this one goes ahead of the first process
+        # arriving after it, found from the front when it arrives nearer
+        # the head, as processes submitted at the current time do
+        first = self._waiting.first
+        if process.arrival - first.value.arrival < \
+           last.value.arrival - process.arrival:
+            for node in self._waiting:
+                if node.value.arrival > process.arrival:
+                    self._waiting.insert_before(node, process)
+                    return
+
+        after = last
+        for node in reversed(self._waiting):
+            if node.value.arrival <= process.arrival:
+                break
+            after = node
+        self._waiting.insert_before(after, process)
+
+    def utilization(self):
+        """ Return the fraction of the run the CPU spent busy. """
+        if self.system_time == 0:
+            return 0.0
+        return self._busy / (self.system_time * 1.0)
+
+    def _advance(self, until):
+        """
+        Handle every event up to `until`, or until none are left if None.
+
+            - rather than stepping `system_time` one unit at a time, the
+              clock jumps straight to the next event: an arrival, the
+              completion of an I/O burst, or the end of the CPU burst of
+              the active process.
+            - the loop body runs once per event, so the cost depends on
+              the number of bursts and not on the simulated time span.
+
+        """
+        active_process = self._active
+        dispatched = self._dispatched
+        system_time = self.system_time
+        timeline = self._timeline
+        while True:
+
+            self._admit(system_time)
+
+            # a process is not preempted, so `remaining` is the whole of
+            # the CPU burst it was dispatched for
+            if active_process is not None and \
+               dispatched + active_process.remaining == system_time:
+                if timeline is not None:
+                    timeline.record(dispatched, system_time,
+                                    active_process.pid)
+                self._finish(active_process, system_time)
+                active_process = None
+
+            # a zero-length burst completes the moment it is dispatched,
+            # so keep dispatching until something actually occupies the CPU
+            while active_process is None and self._ready.size > 0:
+                active_process = self._ready.pop()
+                dispatched = system_time
+                if active_process.fresh:
                     active_process.start = system_time
-                    self._ready.pop_front()
-                else:
-                    total_time += 1
+
+                # the dispatch order is all Batch.evaluate needs to
+                # reproduce every process's timing information, for as
+                # long as no process has blocked
+                if self._on_complete is None and self.batch:
+                    self._order_arrival.append(active_process.arrival)
+                    self._order_burst.append(active_process.burst)
+
+                if active_process.remaining == 0:
+                    self._finish(active_process, system_time)
+                    active_process = None
+
+            next_arrival = self._next_arrival()
+            if active_process is None:
+                if next_arrival is None:
+                    break
+                next_time = next_arrival
+            elif next_arrival is None:
+                next_time = dispatched + active_process.remaining
             else:
-                if active_process.start + active_process.burst == system_time:
-                    # update ending process's timing info
-                    active_process.completion = system_time
-                    active_process.turn_around = system_time - active_process.arrival
-                    active_process.waiting = active_process.start - active_process.arrival
+                next_time = min(next_arrival,
+                                dispatched + active_process.remaining)
 
-                    # end the process by changing state and pushing
-                    # process into 'complete' queue
-                    active_process.state = 100
-                    self._complete.push_back(active_process)
+            if until is not None and next_time > until:
+                break
+            system_time = next_time
 
-                    # set new active process
-                    if self._ready.size > 0:
-                        active_process = self._ready.first.value
-                        active_process.start = system_time
-                        self._ready.pop_front()
+        self._active = active_process
+        self._dispatched = dispatched
+        self.system_time = system_time if until is None else until
 
-            # print out an "execution trace"
-            # make sure that self.output() is not called simultaneously
-#            print system_time, repr(active_process)
+    def _admit(self, system_time):
+        """
+        Move processes that have arrived by `system_time` to ready.
 
-            system_time += 1
+            - processes whose I/O has completed by then go first.
 
-class SJF(object):
+        """
+        io = self._io
+        while io and io[0][0] <= system_time:
+            wake_time, _, process = heappop(io)
+            self._wake(process, wake_time)
 
-    def __init__(self, processes=[]):
-        super(SJF, self).__init__()
-        self._complete = List()
-        self._processes = processes
-        self._ready = List()
-        self._waiting = List()
+        # `_waiting` is sorted by arrival, so only its head ever needs to
+        # be looked at; admitted processes leave it for good
+        self._fill()
+        while self._waiting.size > 0 and \
+              self._waiting.first.value.arrival <= system_time:
+            process = self._waiting.first.value
+            self._waiting.pop_front()
+
+            process.rewind()
+            process.state = 001
+            self._ready.push(process)
+            self._fill()
+
+    def _block(self, process, wake_time):
+        """ Hold a process in the waiting state until its I/O completes. """
+        # once a process has blocked, the dispatch order alone no longer
+        # determines the run, so it is no longer kept
+        self.batch = False
+        self._order_arrival = self._order_burst = None
+        process.state = 011
+        heappush(self._io, (wake_time, next(self._io_count), process))
+
+    def _completed(self):
+        """ Yield every completed process kept for output, in order. """
+        # a restored scheduler keeps the processes completed before its
+        # checkpoint in a PCBTable shared with the checkpoint
+        if self._history is not None:
+            for process in self._history:
+                yield process
+        for c in self._complete:
+            yield c.value
+
+    def _fill(self):
+        """ Pull the next chunk of a streamed trace if `_waiting` is empty. """
+        if self._source is not None and self._waiting.size == 0:
+            self._pull()
+
+    def _pull(self):
+        """ Pull the next chunk of a streamed trace into `_waiting`. """
+        pulled = 0
+        for process in islice(self._source, self.chunk_size):
+            if self._last_arrival is not None and \
+               process.arrival < self._last_arrival:
+                raise RuntimeError('Streamed processes must be sorted by arrival time.')
+            self._last_arrival = process.arrival
 
-        self._processes = sorted(self._processes, key=lambda x: x.arrival)
-        for process in self._processes:
             process.state = 011
             self._waiting.push_back(process)
+            pulled += 1
 
-    def output(self):
-        """ Output information gathered from running scheduler. """
-        self._complete.sort(key=lambda x: (x.value.burst, x.value.pid))
-
-        headers = ['PID', 'Burst Time', 'Arrival Time',
-                   'Priority', 'Completion Time', 'Turn Around Time',
-                   'Waiting Time']
-
-        
-        avg_turn_around = sum(c.value.turn_around for c in self._complete) / \
-                          (self._complete.size * 1.0)
-        avg_wait = sum(c.value.waiting for c in self._complete) / \
-                   (self._complete.size * 1.0)
-        
-        data = [[x.value.pid, x.value.burst, x.value.arrival, \
-                 x.value.priority, x.value.completion, x.value.turn_around, \
-                 x.value.waiting] for x in self._complete] 
-       
-        print 'Shortest Job First (SJF)'
-        print tabulate(data, headers=headers, tablefmt='orgtbl') 
-        print 'Avg. Turn Around Time: ', avg_turn_around
-        print 'Avg. Waiting Time: ', avg_wait
-
-    def run(self): 
-        """ Run the scheduling algorithm. """
-        active_process = None
-        system_time = 0
-        total_time = sum(c.burst for c in self._processes)
-        while system_time <= total_time:
-            
-            for proc in self._waiting:
-                if proc.value.arrival == system_time:
-                    if proc.value.state != 001:
-                        proc.value.state = 001
-                        self._ready.push_back(proc.value)
-
-            # this is the essence of SJF: sorting by burst-time
-            # change to sort by priority for NPP
-            self._ready.sort(key=lambda x: x.value.burst)
+        if pulled == 0:
+            self._source = None
+
+    def _finish(self, process, system_time):
+        """
+        Record the end of a CPU burst at `system_time`.
+
+            - a process with another CPU burst to go blocks for the I/O
+              burst in between; otherwise it has completed, and its
+              timing information is filled in.
+
+        """
+        self._busy += process.cpu_burst
+        io = process.next_burst()
+        if io is not None:
+            self._block(process, system_time + io)
+            return
+
+        # update ending process's timing info; time spent blocked on I/O
+        # is not time spent waiting
+        process.completion = system_time
+        process.turn_around = system_time - process.arrival
+        process.waiting = process.turn_around - process.burst - process.io
+
+        # end the process by changing state and pushing
+        # process into 'complete' queue
+        process.state = 100
+        if self._stats is not None:
+            self._stats.add(process)
+        if self._on_complete is not None:
+            self._count += 1
+            self._total_turn_around += process.turn_around
+            self._total_waiting += process.waiting
+            self._on_complete(process)
+        else:
+            self._complete.push_back(process)
+
+    def _next_arrival(self):
+        """ Return the time of the next arrival or I/O completion, if any. """
+        self._fill()
+        first = self._waiting.first
+        arrival = first.value.arrival if first is not None else None
+
+        io = self._io
+        if io and (arrival is None or io[0][0] < arrival):
+            return io[0][0]
+        return arrival
+
+    def _ready_queue(self):
+        """ Return a new, empty ready queue. """
+        return PriorityQueue(key=self.key)
+
+    def _wake(self, process, wake_time):
+        """ Return a process whose I/O has completed to the ready queue. """
+        process.ready_since = wake_time
+        process.state = 001
+        self._ready.push(process)
+
+class Preemptive(Scheduler):
+    """ Class implementing the shared core of the preemptive schedulers. """
+
+    # a preemptive schedule is not determined by its dispatch order alone
+    batch = False
+
+    def _advance(self, until):
+        """
+        Handle every event up to `until`, or until none are left if None.
+
+            - the clock jumps from event to event as in Scheduler.
+            - a running process can only lose the CPU to a new arrival,
+              so the active process is compared against the head of the
+              ready queue once per event, never per time unit.
+            - a preempted process is charged for the time it ran and
+              pushed back into the ready queue, which re-keys it on its
+              new remaining burst without touching any other entry.
 
+        """
+        active_process = self._active
+        dispatched = self._dispatched
+        system_time = self.system_time
+        timeline = self._timeline
+        while True:
+
+            # charge the active process for the time since its dispatch;
+            # the timeline joins the stretches charged back to back
+            if active_process is not None:
+                active_process.remaining -= system_time - dispatched
+                if timeline is not None:
+                    timeline.record(dispatched, system_time,
+                                    active_process.pid)
+                dispatched = system_time
+
+                if active_process.remaining == 0:
+                    self._finish(active_process, system_time)
+                    active_process = None
+
+            self._admit(system_time)
+
+            # preempt only for a strictly better process, so equal keys
+            # never cause a context switch
+            if active_process is not None and self._ready.size > 0 and \
+               self.key(self._ready.first) < self.key(active_process):
+                self._ready.push(active_process)
+                active_process = None
+
+            while active_process is None and self._ready.size > 0:
+                active_process = self._ready.pop()
+                dispatched = system_time
+
+                if active_process.fresh:
+                    active_process.start = system_time
+
+                if active_process.remaining == 0:
+                    self._finish(active_process, system_time)
+                    active_process = None
+
+            next_arrival = self._next_arrival()
             if active_process is None:
-                if self._ready.size > 0:
-                    active_process = self._ready.first.value
+                if next_arrival is None:
+                    break
+                next_time = next_arrival
+            elif next_arrival is None:
+                next_time = dispatched + active_process.remaining
+            else:
+                next_time = min(next_arrival,
+                                dispatched + active_process.remaining)
+
+            if until is not None and next_time > until:
+                break
+            system_time = next_time
+
+        self._active = active_process
+        self._dispatched = dispatched
+        self.system_time = system_time if until is None else until
+
+class NPP(Scheduler):
+    """ Class implementing Non-preemptive Priority (NPP) scheduling. """
+
+    name = 'Non-Preemptive Priority (NPP)'
+
+    def __init__(self, processes=[], aging=None, **kwargs):
+        """
+        Constructor
+
+            - creates new NPP object.
+            - with `aging`, a waiting process gains one priority level for
+              every `aging` time units it has waited, so no process waits
+              forever behind a stream of higher priority ones.
+            - the effective priority of a process at time t is
+                  priority - (t - ready_since) / aging
+              where `ready_since` is the time it last entered the ready
+              queue, its arrival or the end of its last I/O burst; every
+              process loses the same t / aging, so the ready queue is
+              ordered by the time-invariant
+                  priority * aging + ready_since
+              instead; no entry is ever re-keyed and dispatch stays
+              O(log n).
+            - ex. :
+                obj = NPP(processes=processes, aging=50)
+
+        Parameters
+        ----------
+        processes : (list|iterable|PCBTable)
+            - PCBs to be scheduled, as for Scheduler
+        aging : int
+            - time units of waiting worth one priority level, or None for
+              no aging
+        **kwargs : dict
+            - any other options taken by Scheduler
+
+        """
+        if aging is not None:
+            self.key = _aging_key(aging)
+            self.name = '%s aged every %s' % (self.name, aging)
+        self.aging = aging
+        super(NPP, self).__init__(processes=processes, **kwargs)
+
+    @staticmethod
+    def key(process):
+        """ Return the value the ready queue is ordered by. """
+        # this is the essence of NPP: sorting by priority
+        return process.priority
+
+    def sort_key(self, process):
+        """ Return the value the output table is ordered by. """
+        return process.priority
+
+class RR(Preemptive):
+    """ Class implementing Round-Robin (RR) scheduling. """
+
+    name = 'Round-Robin (RR)'
+
+    def __init__(self, processes=[], quantum=2, **kwargs):
+        """
+        Constructor
+
+            - creates new RR object.
+            - the ready queue is a CircularQueue, so every queue operation
+              is O(1) and nothing is ever searched for.
+            - ex. :
+                obj = RR(processes=processes, quantum=2)
+
+        Parameters
+        ----------
+        processes : (list|iterable|PCBTable)
+            - PCBs to be scheduled, as for Scheduler
+        quantum : int
+            - length of the time slice each process gets in turn
+        **kwargs : dict
+            - any other options taken by Scheduler
+
+        """
+        if quantum < 1:
+            raise ValueError('Quantum must be a positive integer.')
+        self._charged = 0
+        self.quantum = quantum
+        super(RR, self).__init__(processes=processes, **kwargs)
+
+    def _advance(self, until):
+        """
+        Handle every event up to `until`, or until none are left if None.
+
+            - the clock jumps from event to event as in Scheduler.
+            - the end of a quantum is only an event while another process
+              is waiting; a process running alone is left running across
+              as many quanta as it takes until it completes or something
+              arrives, so a long burst costs one step and not one per
+              quantum.
+            - a process whose quantum ends goes to the back of the ready
+              queue, behind any process arriving at the same moment.
+
+        """
+        active_process = self._active
+        charged = self._charged
+        dispatched = self._dispatched
+        quantum = self.quantum
+        system_time = self.system_time
+        timeline = self._timeline
+        while True:
+
+            # charge the active process for the time since it was last
+            # charged
+            if active_process is not None:
+                active_process.remaining -= system_time - charged
+                if timeline is not None:
+                    timeline.record(charged, system_time, active_process.pid)
+                charged = system_time
+
+                if active_process.remaining == 0:
+                    self._finish(active_process, system_time)
+                    active_process = None
+
+            self._admit(system_time)
+
+            # quanta are counted from the dispatch, so with nothing else
+            # ready, running on past a boundary is the same as being
+            # dispatched again there
+            if active_process is not None and self._ready.size > 0 and \
+               system_time > dispatched and \
+               (system_time - dispatched) % quantum == 0:
+                self._ready.push(active_process)
+                active_process = None
+
+            while active_process is None and self._ready.size > 0:
+                active_process = self._ready.pop()
+                charged = dispatched = system_time
+
+                if active_process.fresh:
                     active_process.start = system_time
-                    self._ready.pop_front()
+
+                if active_process.remaining == 0:
+                    self._finish(active_process, system_time)
+                    active_process = None
+
+            next_arrival = self._next_arrival()
+            if active_process is None:
+                if next_arrival is None:
+                    break
+                next_time = next_arrival
+            else:
+                next_time = charged + active_process.remaining
+                if self._ready.size > 0:
+                    next_time = min(next_time, dispatched + quantum *
+                                    ((system_time - dispatched) // quantum +
+                                     1))
+                if next_arrival is not None:
+                    next_time = min(next_time, next_arrival)
+
+            if until is not None and next_time > until:
+                break
+            system_time = next_time
+
+        self._active = active_process
+        self._charged = charged
+        self._dispatched = dispatched
+        self.system_time = system_time if until is None else until
+
+    def sort_key(self, process):
+        """ Return the value the output table is ordered by. """
+        return process.arrival
+
+    def _ready_queue(self):
+        """ Return a new, empty ready queue. """
+        return CircularQueue()
+
+class SJF(Scheduler):
+    """ Class implementing Shortest Job First (SJF) scheduling. """
+
+    name = 'Shortest Job First (SJF)'
+
+    @staticmethod
+    def key(process):
+        """ Return the value the ready queue is ordered by. """
+        # this is the essence of SJF: sorting by burst-time; a ready
+        # process has the whole of its next CPU burst remaining
+        return process.remaining
+
+    def sort_key(self, process):
+        """ Return the value the output table is ordered by. """
+        return process.burst
+
+class PP(Preemptive):
+    """ Class implementing Preemptive Priority (PP) scheduling. """
+
+    name = 'Preemptive Priority (PP)'
+
+    @staticmethod
+    def key(process):
+        """ Return the value the ready queue is ordered by. """
+        return process.priority
+
+class SRTF(Preemptive):
+    """ Class implementing Shortest Remaining Time First (SRTF) scheduling. """
+
+    name = 'Shortest Remaining Time First (SRTF)'
+
+    @staticmethod
+    def key(process):
+        """ Return the value the ready queue is ordered by. """
+        # the preemptive counterpart of SJF: a process is keyed by what is
+        # left of its burst whenever it enters the ready queue
+        return process.remaining
+
+    def sort_key(self, process):
+        """ Return the value the output table is ordered by. """
+        return process.burst
+
+class FeedbackQueues(object):
+    """ Class implementing the ready queues of an MLFQ scheduler. """
+
+    def __init__(self, levels):
+        """
+        Constructor
+
+            - creates new FeedbackQueues object.
+            - every level has its own CircularQueue, level 0 being the
+              highest; an int bitmap has bit i set while level i holds
+              a process, so the highest non-empty level is its lowest set
+              bit, found in O(1) whatever the number of levels.
+            - each queued process keeps its level, the time it has used
+              of that level's quantum, and the boost epoch these were
+              set in.
+            - a boost moves every process to level 0 by splicing the
+              queue of each level, whole, behind those already at level
+              0, so it costs O(levels) and not O(processes); the stale
+              levels and used times left behind are recognized by their
+              epoch and reset when the process is next dispatched.
+            - a process blocked on I/O is parked with its level and used
+              time, and requeued with them when its I/O completes, or at
+              level 0 if a boost came in between.
+            - ex. :
+                obj = FeedbackQueues(3)
+
+        Parameters
+        ----------
+        levels : int
+            - number of levels
+
+        """
+        super(FeedbackQueues, self).__init__()
+        self._allotments = {}
+        self._bitmap = 0
+        self._queues = [CircularQueue() for _ in xrange(levels)]
+        self._segments = CircularQueue()
+        self._size = 0
+        self._sizes = [0] * levels
+        self.epoch = 0
+
+    def allotment(self, process):
+        """ Return (level, used) of a dispatched process, forgetting them. """
+        level, used, epoch = self._allotments.pop(id(process))
+        if epoch != self.epoch:
+            return 0, 0
+        return level, used
+
+    def boost(self, epoch):
+        """ Move every queued process to level 0 and start a new epoch. """
+        # level 0 keeps its order and is followed by each lower level in
+        # turn; new arrivals at level 0 queue up behind all of them
+        queues = self._queues
+        sizes = self._sizes
+        for level in xrange(len(queues)):
+            if queues[level].size > 0:
+                self._segments.push(queues[level])
+                queues[level] = CircularQueue()
+            if level > 0:
+                sizes[0] += sizes[level]
+                sizes[level] = 0
+
+        self._bitmap = 1 if sizes[0] else 0
+        self.epoch = epoch
+
+    @property
+    def first_level(self):
+        """ Return the highest level holding a process, or None. """
+        bitmap = self._bitmap
+        return (bitmap & -bitmap).bit_length() - 1 if bitmap else None
+
+    def park(self, process, level, used):
+        """ Keep the level and used time of a process leaving the queues. """
+        self._allotments[id(process)] = (level, used, self.epoch)
+
+    def pop(self):
+        """ Remove and return the next process of the highest level, if any. """
+        bitmap = self._bitmap
+        if not bitmap:
+            return None
+
+        level = (bitmap & -bitmap).bit_length() - 1
+        segments = self._segments
+        if level == 0 and segments.size > 0:
+            segment = segments.first
+            process = segment.pop()
+            if segment.empty:
+                segments.pop()
+        else:
+            process = self._queues[level].pop()
+
+        self._size -= 1
+        self._sizes[level] -= 1
+        if self._sizes[level] == 0:
+            self._bitmap = bitmap & ~(1 << level)
+        return process
+
+    def push(self, process, level=None, used=0):
+        """
+        Place a process at the back of a level.
+
+            - a newly admitted process starts at the level given by its
+              priority, or at the lowest level if its priority is lower.
+
+        """
+        if level is None:
+            level = min(process.priority, len(self._queues) - 1)
+        self._allotments[id(process)] = (level, used, self.epoch)
+        self._queues[level].push(process)
+        self._bitmap |= 1 << level
+        self._size += 1
+        self._sizes[level] += 1
+
+    def requeue(self, process):
+        """ Place a parked process at the back of the level it left. """
+        level, used = self.allotment(process)
+        self.push(process, level, used)
+
+    @property
+    def size(self):
+        """ Return the number of ready processes over all levels. """
+        return self._size
+
+    def __repr__(self):
+        """ Return representation of FeedbackQueues. """
+        return '<FeedbackQueues %r>' % self._sizes
+
+class MLFQ(Preemptive):
+    """ Class implementing Multilevel Feedback Queue (MLFQ) scheduling. """
+
+    name = 'Multilevel Feedback Queue (MLFQ)'
+
+    def __init__(self, processes=[], levels=3, quantum=2, quanta=None,
+                 boost=100, **kwargs):
+        """
+        Constructor
+
+            - creates new MLFQ object.
+            - a process starts at the level given by its priority and
+              runs before any process at a lower level, which it preempts
+              on arrival; processes at the same level take turns.
+            - a process that uses up the quantum of its level, over one or
+              more turns, moves down a level; at the lowest level it goes
+              to the back of the queue instead.
+            - every `boost` time units, every process moves back up to
+              level 0 with a fresh quantum.
+            - a process blocking on I/O keeps its level and the part of
+              its quantum it has used, so giving up the CPU early does not
+              keep it at a high level.
+            - ex. :
+                obj = MLFQ(processes=processes, levels=3, quanta=[2, 4, 8])
+
+        Parameters
+        ----------
+        processes : (list|iterable|PCBTable)
+            - PCBs to be scheduled, as for Scheduler
+        levels : int
+            - number of levels
+        quantum : int
+            - quantum of level 0, doubling at each level below
+        quanta : list
+            - quantum of each level, overriding `quantum`
+        boost : int
+            - time between boosts, or None for no boosts
+        **kwargs : dict
+            - any other options taken by Scheduler
+
+        """
+        if levels < 1:
+            raise ValueError('Number of levels must be a positive integer.')
+        if quanta is None:
+            quanta = [quantum << level for level in xrange(levels)]
+        if len(quanta) != levels or min(quanta) < 1:
+            raise ValueError('Every level must have a positive quantum.')
+        if boost is not None and boost < 1:
+            raise ValueError('Boost interval must be a positive integer.')
+
+        self._charged = 0
+        self._epoch = 0
+        self._level = 0
+        self._used = 0
+        self.boost = boost
+        self.levels = levels
+        self.quanta = list(quanta)
+        super(MLFQ, self).__init__(processes=processes, **kwargs)
+
+    @staticmethod
+    def key(process):
+        """ Return the value the ready queue is ordered by. """
+        # the level a process starts at
+        return process.priority
+
+    def sort_key(self, process):
+        """ Return the value the output table is ordered by. """
+        return process.arrival
+
+    def _advance(self, until):
+        """
+        Handle every event up to `until`, or until none are left if None.
+
+            - the clock jumps from event to event as in Scheduler.
+            - the end of a quantum and a boost are only events while
+              another process is waiting; a process running alone is
+              left running, and the levels it would have moved through
+              are worked out from its running time at the next event.
+
+        """
+        active_process = self._active
+        boost = self.boost
+        charged = self._charged
+        epoch = self._epoch
+        level = self._level
+        lowest = self.levels - 1
+        quanta = self.quanta
+        ready = self._ready
+        system_time = self.system_time
+        timeline = self._timeline
+        used = self._used
+        while True:
+
+            # every boost since the last event is applied at once
+            if boost is not None and system_time // boost > ready.epoch:
+                ready.boost(system_time // boost)
+
+            expired = False
+            if active_process is not None and system_time > charged:
+                active_process.remaining -= system_time - charged
+                if timeline is not None:
+                    timeline.record(charged, system_time, active_process.pid)
+
+                # a boost while it ran put it back at level 0 at the time
+                # of the boost, with a fresh quantum
+                boosted = epoch != ready.epoch
+                if boosted:
+                    epoch = ready.epoch
+                    level = 0
+                    used = system_time - epoch * boost
                 else:
-                    total_time += 1
+                    used += system_time - charged
+                charged = system_time
+
+                # quanta that ended with nothing else waiting were not
+                # events, so several may have ended since the last one
+                while level < lowest and used >= quanta[level]:
+                    used -= quanta[level]
+                    level += 1
+                if level == lowest:
+                    used %= quanta[level]
+
+                if active_process.remaining == 0:
+                    # read back by _block should it go on to I/O
+                    self._level, self._used = level, used
+                    self._finish(active_process, system_time)
+                    active_process = None
+                else:
+                    # only a quantum ending right now can cost it the CPU,
+                    # not one starting now with a boost
+                    expired = used == 0 and \
+                              not (boosted and system_time == epoch * boost)
+
+            self._admit(system_time)
+
+            # a process that has used up its quantum goes to the back of
+            # its new level, and any process at a higher level preempts it
+            if active_process is not None and ready.size > 0 and \
+               (expired or ready.first_level < level):
+                ready.push(active_process, level, used)
+                active_process = None
+
+            while active_process is None and ready.size > 0:
+                active_process = ready.pop()
+                level, used = ready.allotment(active_process)
+                epoch = ready.epoch
+                charged = system_time
+
+                if active_process.fresh:
+                    active_process.start = system_time
+
+                if active_process.remaining == 0:
+                    self._level, self._used = level, used
+                    self._finish(active_process, system_time)
+                    active_process = None
+
+            next_arrival = self._next_arrival()
+            if active_process is None:
+                if next_arrival is None:
+                    break
+                next_time = next_arrival
             else:
-                if active_process.start + active_process.burst == system_time:
-                    # update ending process's timing info
-                    active_process.completion = system_time
-                    active_process.turn_around = system_time - active_process.arrival
-                    active_process.waiting = active_process.start - active_process.arrival
-
-                    # end the process by changing state and pushing
-                    # process into 'complete' queue
-                    active_process.state = 100
-                    self._complete.push_back(active_process)
-
-                    # set new active process
-                    if self._ready.size > 0:
-                        active_process = self._ready.first.value
-                        active_process.start = system_time
-                        self._ready.pop_front()
-
-            # print out an "execution trace"
-            # make sure that self.output() is not called simultaneously
-#            print system_time, repr(active_process)
-            
-            system_time += 1
+                next_time = charged + active_process.remaining
+                if ready.size > 0:
+                    next_time = min(next_time,
+                                    charged + quanta[level] - used)
+                    if boost is not None:
+                        next_time = min(next_time, (ready.epoch + 1) * boost)
+                if next_arrival is not None:
+                    next_time = min(next_time, next_arrival)
 
-if __name__ == '__main__':
+            if until is not None and next_time > until:
+                break
+            system_time = next_time
+
+        self._active = active_process
+        self._charged = charged
+        self._epoch = epoch
+        self._level = level
+        self._used = used
+        self.system_time = system_time if until is None else until
+
+    def _block(self, process, wake_time):
+        """ Hold a process until its I/O completes, parking its level. """
+        self._ready.park(process, self._level, self._used)
+        super(MLFQ, self)._block(process, wake_time)
+
+    def _ready_queue(self):
+        """ Return a new, empty set of feedback queues. """
+        return FeedbackQueues(self.levels)
+
+    def _wake(self, process, wake_time):
+        """ Return a process whose I/O has completed to the level it left. """
+        process.ready_since = wake_time
+        process.state = 001
+        self._ready.requeue(process)
+
+class RunQueues(object):
+    """ Class implementing the per-CPU ready queues of an SMP scheduler. """
+
+    def __init__(self, cpus, key):
+        """
+        Constructor
+
+            - creates new RunQueues object.
+            - every CPU has its own PriorityQueue ordered by `key`; an
+              admitted process goes to an idle CPU when there is one and
+              otherwise to the next CPU in turn, so placement is O(1).
+            - idle CPUs are kept on a stack, and a CPU that gets work is
+              only flagged as busy; its stale stack entry is skipped when
+              it comes up, so no search is ever made for it.
+            - ex. :
+                obj = RunQueues(4, key=lambda x: x.burst)
+
+        Parameters
+        ----------
+        cpus : int
+            - number of CPUs
+        key : function
+            - returns the value each ready queue is ordered by
+
+        """
+        super(RunQueues, self).__init__()
+        self._idle = range(cpus - 1, -1, -1)
+        self._is_idle = [True] * cpus
+        self._next = 0
+        self._queues = [PriorityQueue(key=key) for _ in xrange(cpus)]
+        self._size = 0
+        self.placed = []
+
+    def busy(self, cpu):
+        """ Note that a CPU has a process to run. """
+        self._is_idle[cpu] = False
+
+    def idle(self, cpu):
+        """ Note that a CPU has nothing to run, so it takes the next arrival. """
+        if not self._is_idle[cpu]:
+            self._is_idle[cpu] = True
+            self._idle.append(cpu)
+
+    def longest(self):
+        """ Return the CPU with the most ready processes. """
+        sizes = [queue.size for queue in self._queues]
+        return sizes.index(max(sizes))
+
+    def pop(self, cpu):
+        """ Remove and return the next process of a CPU, if any. """
+        process = self._queues[cpu].pop()
+        if process is not None:
+            self._size -= 1
+        return process
+
+    def push(self, process):
+        """ Place a process on the ready queue of some CPU. """
+        while self._idle:
+            cpu = self._idle.pop()
+            if self._is_idle[cpu]:
+                self._is_idle[cpu] = False
+                break
+        else:
+            cpu = self._next
+            self._next = (cpu + 1) % len(self._queues)
+
+        self._queues[cpu].push(process)
+        self._size += 1
+        self.placed.append(cpu)
+
+    def queued(self, cpu):
+        """ Return the number of ready processes of a CPU. """
+        return self._queues[cpu].size
+
+    @property
+    def size(self):
+        """ Return the number of ready processes over all CPUs. """
+        return self._size
+
+    def __repr__(self):
+        """ Return representation of RunQueues. """
+        return '<RunQueues %r>' % [queue.size for queue in self._queues]
+
+class SMP(Scheduler):
+    """ Class implementing non-preemptive scheduling on several CPUs. """
+
+    # processes run on several CPUs at once, so the dispatch order alone
+    # does not determine the schedule
+    batch = False
+
+    def __init__(self, processes=[], cpus=2, algorithm=None, steal=True,
+                 aging=None, **kwargs):
+        """
+        Constructor
+
+            - creates new SMP object.
+            - simulates `cpus` CPUs sharing one clock, each with its own
+              ready queue ordered as by `algorithm` (see RunQueues).
+            - with `steal` set, a CPU that runs out of work takes the next
+              process from the CPU with the most ready processes; each
+              such move is counted as a migration.
+            - `aging` ages the ready processes of NPP as it does on a
+              single CPU, with the same key on every CPU's ready queue.
+            - ex. :
+                obj = SMP(processes=processes, cpus=4, algorithm=SJF)
+
+        Parameters
+        ----------
+        processes : (list|iterable|PCBTable)
+            - PCBs to be scheduled, as for Scheduler
+        cpus : int
+            - number of CPUs
+        algorithm : class
+            - a non-preemptive scheduler class, e.g. SJF or NPP, whose
+              `key` orders every CPU's ready queue
+            - defaults to SJF
+        steal : bool
+            - let idle CPUs steal work from the others
+        aging : int
+            - with NPP, time units of waiting worth one priority level, or
+              None for no aging
+        **kwargs : dict
+            - any other options taken by Scheduler
+
+        """
+        if algorithm is None:
+            algorithm = SJF
+        if cpus < 1:
+            raise ValueError('Number of CPUs must be a positive integer.')
+        if not issubclass(algorithm, Scheduler) or \
+           issubclass(algorithm, (Preemptive, SMP)):
+            raise ValueError('SMP scheduling requires a non-preemptive algorithm.')
+        if aging is not None and not issubclass(algorithm, NPP):
+            raise ValueError('Aging requires the NPP algorithm.')
+
+        self.aging = aging
+        self.algorithm = algorithm
+        self.cpus = cpus
+        self.key = algorithm.key
+        self.name = algorithm.name
+        if aging is not None:
+            self.key = _aging_key(aging)
+            self.name = '%s aged every %s' % (self.name, aging)
+        self.name = '%s on %d CPUs' % (self.name, cpus)
+        self.steal = steal
+
+        # per-CPU counters, reported by output()
+        self.busy_time = array(COLUMN_TYPE, [0] * cpus)
+        self.dispatches = array(COLUMN_TYPE, [0] * cpus)
+        self.migrations_in = array(COLUMN_TYPE, [0] * cpus)
+        self.migrations_out = array(COLUMN_TYPE, [0] * cpus)
+
+        super(SMP, self).__init__(processes=processes, **kwargs)
+        self._active = [None] * cpus
+        self._completions = []
+
+    @property
+    def migrations(self):
+        """ Return the number of processes moved between CPUs. """
+        return sum(self.migrations_in)
+
+    def output(self):
+        """ Output information gathered from running scheduler. """
+        from tabulate import tabulate
+
+        super(SMP, self).output()
+
+        data = [[cpu, self.dispatches[cpu], self.busy_time[cpu],
+                 '%.2f' % (100.0 * self.utilization(cpu)),
+                 self.migrations_in[cpu], self.migrations_out[cpu]]
+                for cpu in xrange(self.cpus)]
+
+        print ''
+        print tabulate(data, headers=['CPU', 'Processes', 'Busy Time',
+                                      'Utilization (%)', 'Migrations In',
+                                      'Migrations Out'], tablefmt='orgtbl')
+        print 'Migrations: ', self.migrations
+
+    def _advance(self, until):
+        """
+        Handle every event up to `until`, or until none are left if None.
+
+            - the clock jumps from event to event as in Scheduler;
+              the completions of the running processes are kept in a heap
+              of (completion time, CPU), so the next event is found in
+              O(log cpus).
+            - only the CPUs freed or handed an arrival by an event are
+              looked at, so the cost of an event does not grow with the
+              number of CPUs, apart from the search for a CPU to steal
+              from when one runs out of work while others have a backlog.
+
+        """
+        active = self._active
+        completions = self._completions
+        ready = self._ready
+        system_time = self.system_time
+        timeline = self._timeline
+        while True:
+
+            ready.placed = []
+            while completions and completions[0][0] == system_time:
+                _, cpu = heappop(completions)
+                if timeline is not None:
+                    timeline.record(system_time - active[cpu].remaining,
+                                    system_time, active[cpu].pid, cpu)
+                self._finish(active[cpu], system_time)
+                active[cpu] = None
+
+                # a CPU with nothing queued can take an arrival right away
+                if ready.queued(cpu) == 0:
+                    ready.idle(cpu)
+                ready.placed.append(cpu)
+
+            self._admit(system_time)
+
+            for cpu in ready.placed:
+                while active[cpu] is None:
+                    process = ready.pop(cpu) if ready.queued(cpu) else None
+                    if process is None and self.steal and ready.size > 0:
+                        victim = ready.longest()
+                        process = ready.pop(victim)
+                        self.migrations_in[cpu] += 1
+                        self.migrations_out[victim] += 1
+                    if process is None:
+                        ready.idle(cpu)
+                        break
+
+                    ready.busy(cpu)
+                    if process.fresh:
+                        process.start = system_time
+                    self.busy_time[cpu] += process.remaining
+                    self.dispatches[cpu] += 1
+
+                    # a zero-length burst completes the moment it is
+                    # dispatched; otherwise it runs the whole of the CPU
+                    # burst `remaining`
+                    if process.remaining == 0:
+                        self._finish(process, system_time)
+                    else:
+                        active[cpu] = process
+                        heappush(completions,
+                                 (system_time + process.remaining, cpu))
+
+            next_arrival = self._next_arrival()
+            if not completions:
+                if next_arrival is None:
+                    break
+                next_time = next_arrival
+            elif next_arrival is None:
+                next_time = completions[0][0]
+            else:
+                next_time = min(next_arrival, completions[0][0])
+
+            if until is not None and next_time > until:
+                break
+            system_time = next_time
+
+        self.system_time = system_time if until is None else until
+
+    def utilization(self, cpu=None):
+        """ Return the fraction of the run a CPU, or all of them, spent busy. """
+        if self.system_time == 0:
+            return 0.0
+        if cpu is None:
+            return sum(self.busy_time) / (self.system_time * self.cpus * 1.0)
+        return self.busy_time[cpu] / (self.system_time * 1.0)
+
+    def _ready_queue(self):
+        """ Return a new, empty set of per-CPU ready queues. """
+        return RunQueues(self.cpus, self.key)
+
+def _aging_key(aging):
+    """ Return the ready queue key of NPP aged every `aging` time units. """
+    if aging <= 0:
+        raise ValueError('Aging interval must be positive.')
+    return lambda process: process.priority * aging + process.ready_since
+
+# scheduler classes by the name used to select them on the command line
+ALGORITHMS = {'mlfq': MLFQ, 'npp': NPP, 'pp': PP, 'rr': RR, 'sjf': SJF,
+              'srtf': SRTF}
+
+# results of a call to schedule()
+Results = namedtuple('Results', ['processes', 'avg_turn_around', 'avg_wait'])
+
+def schedule(processes, algorithm, **options):
+    """
+    Schedule processes with a given algorithm and return the results.
+
+        - the library entry point: importing this module has no side
+          effects, and neither argparse nor tabulate is loaded until the
+          command line or output() needs them.
+        - ex. :
+            results = schedule([PCB(dict(arrival=0, burst=16, pid=2760,
+                                         priority=1))], 'sjf')
+            print results.avg_wait
+
+    Parameters
+    ----------
+    processes : (list|PCBTable)
+        - PCBs to be scheduled, in any order
+    algorithm : str
+        - one of the keys of ALGORITHMS
+    **options : dict
+        - options taken by the chosen scheduler, e.g. `quantum` for RR
+        - `cpus` runs a non-preemptive algorithm on several CPUs with
+          SMP, which also takes `steal`, and `aging` for NPP
+
+    Returns
+    -------
+    Results
+        - the scheduled processes in order of completion, with their
+          timing information filled in, and the average turn around and
+          waiting times
+
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError('Invalid scheduling algorithm. Must be one of: %s.' %
+                         ', '.join(sorted(ALGORITHMS)))
+
+    if 'cpus' in options:
+        sched = SMP(processes=processes, algorithm=ALGORITHMS[algorithm],
+                    **options)
+    else:
+        sched = ALGORITHMS[algorithm](processes=processes, **options)
+    sched.run()
+
+    avg_turn_around, avg_wait = sched.averages()
+    return Results(list(sched._completed()),
+                   avg_turn_around, avg_wait)
+
+def _parser():
+    """ Build the command line argument parser. """
+    import argparse
+
+    parser = argparse.ArgumentParser('Simulate a CPU scheduler using either Shortest Job First (SJF) or Non-preemptive Priority Scheduling.')
+    parser.add_argument('-f', '--file',
+                        type=argparse.FileType('r'))
+    parser.add_argument('-p', '--processes',
+                        nargs=1)
+    parser.add_argument('-a', '--algorithm',
+                        nargs=1, metavar='(%s)' % '|'.join(sorted(ALGORITHMS)))
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help='stream an arrival-sorted file and write each '
+                             'process as soon as it completes')
+    parser.add_argument('-q', '--quantum', type=int, default=2,
+                        help='time slice used by round-robin scheduling, '
+                             'and by the top level of mlfq')
+    parser.add_argument('--levels', type=int, default=3,
+                        help='number of mlfq levels, the quantum doubling '
+                             'at each level down')
+    parser.add_argument('--boost', type=int, default=100,
+                        help='time between mlfq boosts to the top level, '
+                             'or 0 for none')
+    parser.add_argument('--aging', type=int, metavar='K',
+                        help='with npp, raise a waiting process one '
+                             'priority level every K time units and report '
+                             'the longest wait per priority')
+    parser.add_argument('-c', '--cpus', type=int, default=1,
+                        help='number of CPUs, each with its own ready queue')
+    parser.add_argument('--no-steal', action='store_true',
+                        help='keep idle CPUs from stealing work from busy ones')
+    parser.add_argument('-o', '--output', choices=sorted(SINKS),
+                        help='output format, defaulting to a table, or to '
+                             'csv when streaming')
+    parser.add_argument('-t', '--top', type=int, metavar='N',
+                        help='only show the N processes with the longest '
+                             'waiting times in the table')
+    parser.add_argument('-P', '--percentiles', action='store_true',
+                        help='print percentiles of waiting and turn around '
+                             'times, overall and per priority')
+    parser.add_argument('-g', '--gantt', metavar='FILE',
+                        help='write the execution timeline to FILE')
+    parser.add_argument('--gantt-format', choices=('binary', 'csv'),
+                        default='csv',
+                        help='format of the execution timeline')
+    parser.add_argument('-i', '--instrument', action='store_true',
+                        help='print event counts, timings and ready queue '
+                             'depths to stderr after running')
+
+    return parser
+
+def main(argv=None):
+    """ Run the scheduler from the command line. """
+    from Trace import is_trace, load, open_trace
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.file and args.processes:
+        parser.error('Must provide either file with process data or number of processes to be entered manually.')
+    if not args.file and not args.processes:
+        parser.error('Must provide either file with process data or number of processes to be entered manually.')
+    if not args.algorithm:
+        parser.error('Must provide type of scheduling algorithm to be used.')
+    if vars(args)['algorithm'][0] not in ALGORITHMS:
+        parser.error('Invalid scheduling algorithm. Must be one of: %s.' %
+                     ', '.join(sorted(ALGORITHMS)))
+    if args.stream and not args.file:
+        parser.error('Streaming requires a file with process data.')
+    if args.quantum < 1:
+        parser.error('Quantum must be a positive integer.')
+    if args.cpus < 1:
+        parser.error('Number of CPUs must be a positive integer.')
+    if args.levels < 1:
+        parser.error('Number of levels must be a positive integer.')
+    if args.boost < 0:
+        parser.error('Boost interval must not be negative.')
+    if args.aging is not None and args.aging < 1:
+        parser.error('Aging interval must be a positive integer.')
+    if args.aging is not None and vars(args)['algorithm'][0] != 'npp':
+        parser.error('Aging requires the npp algorithm.')
+    if args.top is not None and args.top < 1:
+        parser.error('Number of processes shown must be a positive integer.')
+
+    # a stream is written out as CSV unless told otherwise
+    output = args.output or ('csv' if args.stream else 'table')
+    if output == 'table' and args.stream and args.top is None:
+        parser.error('Streaming table output requires --top.')
+    if args.cpus > 1 and \
+       issubclass(ALGORITHMS[vars(args)['algorithm'][0]], Preemptive):
+        parser.error('Multiple CPUs require a non-preemptive algorithm.')
 
     processes = []
 
-    if __args__.processes:
+    if args.processes:
         try:
-            num_processes = int(vars(__args__)['processes'][0])
+            num_processes = int(vars(args)['processes'][0])
         except ValueError:
-            __parser__.error('Number of processes must be an integer.')
+            parser.error('Number of processes must be an integer.')
 
         if num_processes < 1:
             raise RuntimeError('Must have number of processes >= 1.')
@@ -233,32 +1587,111 @@ if __name__ == '__main__':
             count += 1
             num_processes -= 1
 
-    if __args__.file:
-        
-        filename = __args__.file.name 
-        PROCESS_REGEX = re.compile('[\d]+,[\d]+,[\d]+,[\d]+')
-        with open(filename, 'r') as f:
-            for line in f:
-                if PROCESS_REGEX.match(line):
-                    info = line.strip().split(',')
-                    processes.append(PCB(dict(pid=info[0], arrival=info[1],
-                                         burst=info[2], priority=info[3])))
+    if args.file and not args.stream:
+
+        # a binary trace, or the cached conversion of a large CSV file, is
+        # mapped rather than parsed
+        try:
+            processes = load(args.file.name)
+        except BurstsError:
+            # a PCBTable holds a single CPU burst per process, so a file
+            # with I/O bursts is read as PCBs instead
+            with open(args.file.name, 'r') as f:
+                processes = list(read_processes(f))
 
         if len(processes) < 1:
             raise RuntimeError('No processes created from given file.')
 
-    if __args__.algorithm:
-        algo = vars(__args__)['algorithm'][0]
+    if args.algorithm:
+        algorithm = ALGORITHMS[vars(args)['algorithm'][0]]
+        instrument = Instrument() if args.instrument else None
+        stats = Stats() if args.percentiles or args.aging else None
+        timeline = Timeline() if args.gantt else None
 
-        if algo == 'sjf':
-            sched = SJF(processes=processes)
-            sched.run()
+        options = {'stats': stats, 'timeline': timeline}
+        if issubclass(algorithm, RR):
+            options['quantum'] = args.quantum
+        if args.aging is not None:
+            options['aging'] = args.aging
+        if issubclass(algorithm, MLFQ):
+            options.update(boost=args.boost or None, levels=args.levels,
+                           quantum=args.quantum)
+        if args.cpus > 1:
+            options.update(algorithm=algorithm, cpus=args.cpus,
+                           steal=not args.no_steal)
+            algorithm = SMP
 
-            sched.output() 
+        if args.stream:
+            processes = open_trace(args.file.name).pcbs_by_arrival() \
+                        if is_trace(args.file.name) \
+                        else read_processes(args.file)
 
-        elif algo == 'npp':
-            sched = NPP(processes=processes)
+        # the full table is sorted and rendered after the run, while every
+        # other output is written as processes complete
+        if output == 'table' and args.top is None and not args.stream:
+            sched = algorithm(processes=processes, instrument=instrument,
+                              **options)
             sched.run()
-
             sched.output()
+        else:
+            if output == 'table':
+                sink = TableSink(sys.stdout, key=lambda x: x.waiting,
+                                 limit=args.top, reverse=True)
+            else:
+                sink = SINKS[output](sys.stdout)
+
+            sched = algorithm(processes=processes, stream=args.stream,
+                              on_complete=sink, instrument=instrument,
+                              **options)
+            if output == 'table':
+                print '%s (longest waiting times)' % sched.name
+            elif output == 'csv':
+                print '# %s' % sched.name
+            sched.run()
+            sink.close()
+
+            if sink.count < 1:
+                raise RuntimeError('No processes created from given file.')
 
+            # only CSV has room for the averages alongside the records
+            avg_turn_around, avg_wait = sink.averages()
+            utilization = '%.2f%%' % (100.0 * sched.utilization())
+            if output == 'csv':
+                print '# Avg. Turn Around Time: ', avg_turn_around
+                print '# Avg. Waiting Time: ', avg_wait
+                print '# CPU Utilization: ', utilization
+            elif output == 'table':
+                print 'CPU Utilization: ', utilization
+            else:
+                print >> sys.stderr, 'Avg. Turn Around Time: ', \
+                                     avg_turn_around
+                print >> sys.stderr, 'Avg. Waiting Time: ', avg_wait
+                print >> sys.stderr, 'CPU Utilization: ', utilization
+
+        # like the averages, percentiles only go with the records of a
+        # table or CSV
+        if stats is not None:
+            reports = []
+            if args.percentiles:
+                reports.append(stats.report())
+            if args.aging is not None:
+                reports.append(stats.starvation_report())
+            for report in reports:
+                if output in ('csv', 'table'):
+                    print ''
+                    print report
+                else:
+                    print >> sys.stderr, report
+
+        if timeline is not None:
+            with open(args.gantt, 'wb') as f:
+                if args.gantt_format == 'binary':
+                    timeline.write_binary(f)
+                else:
+                    timeline.write_csv(f)
+
+        if instrument is not None:
+            print >> sys.stderr, instrument.report()
+
+if __name__ == '__main__':
+    main()
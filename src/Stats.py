@@ -0,0 +1,209 @@
+from math import ceil, log
+
+# quantiles reported by Stats.report()
+QUANTILES = (0.5, 0.9, 0.99)
+
+class QuantileSketch(object):
+    """ Class implementing a streaming quantile sketch with log buckets. """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        """
+        Constructor
+
+            - creates new QuantileSketch object.
+            - a positive value v is counted in bucket i, where
+              gamma**(i-1) < v <= gamma**i and
+              gamma = (1 + relative_accuracy) / (1 - relative_accuracy),
+              and zeros are counted on their own; any quantile is then
+              estimated to within `relative_accuracy` of the true value,
+              with a few hundred buckets covering values up to 1e12.
+            - should `max_buckets` ever be exceeded, the lowest buckets
+              are merged, so memory stays bounded while the upper
+              quantiles, which alerts are set on, stay accurate.
+            - the count, sum, min and max are kept exactly.
+            - ex. :
+                obj = QuantileSketch()
+                obj.add(12)
+                print obj.quantile(0.99)
+
+        Parameters
+        ----------
+        relative_accuracy : float
+            - largest relative error of an estimated quantile
+        max_buckets : int
+            - number of buckets kept at most
+
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('Relative accuracy must be between 0 and 1.')
+
+        self._buckets = {}
+        self._gamma = (1 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = log(self._gamma)
+        self._max_buckets = max_buckets
+        self._zeros = 0
+        self.count = 0
+        self.max = None
+        self.min = None
+        self.total = 0
+
+    def add(self, value):
+        """ Count a non-negative value. """
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+        if value <= 0:
+            self._zeros += 1
+            return
+
+        index = int(ceil(log(value) / self._log_gamma))
+        buckets = self._buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self._max_buckets:
+            self._collapse()
+
+    @property
+    def mean(self):
+        """ Return the mean of the values added. """
+        return self.total / (self.count * 1.0) if self.count else 0.0
+
+    def quantile(self, q):
+        """ Return an estimate of quantile `q`, or None if nothing was added. """
+        if self.count == 0:
+            return None
+        if q >= 1:
+            return self.max
+
+        # nearest rank: the smallest value with at least q of all values
+        # at or below it
+        rank = max(int(ceil(q * self.count)), 1)
+        seen = self._zeros
+        if seen >= rank:
+            return 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # the midpoint of the bucket, in relative terms
+                estimate = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def _collapse(self):
+        """ Merge the lowest buckets until only `max_buckets` are left. """
+        indices = sorted(self._buckets)
+        excess = len(indices) - self._max_buckets
+        merged = sum(self._buckets.pop(index) for index in indices[:excess])
+        self._buckets[indices[excess]] += merged
+
+    def __repr__(self):
+        """ Return representation of QuantileSketch. """
+        return '<QuantileSketch count=%r p50=%r max=%r>' % \
+               (self.count, self.quantile(0.5), self.max)
+
+class Stats(object):
+    """ Class collecting tail statistics of completed processes. """
+
+    def __init__(self, relative_accuracy=0.01):
+        """
+        Constructor
+
+            - creates new Stats object.
+            - passed to a scheduler as `stats`, it is handed every process
+              as it completes, and keeps a QuantileSketch of waiting and of
+              turn around times over all processes and per priority.
+            - nothing is kept per process and nothing is sorted, so memory
+              stays bounded by the number of priorities and the report
+              costs the same however many processes ran.
+            - ex. :
+                stats = Stats()
+                SJF(processes=processes, stats=stats).run()
+                print stats.report()
+
+        Parameters
+        ----------
+        relative_accuracy : float
+            - largest relative error of a reported quantile
+
+        """
+        self._accuracy = relative_accuracy
+        self.by_priority = {}
+        self.turn_around = QuantileSketch(relative_accuracy)
+        self.waiting = QuantileSketch(relative_accuracy)
+
+    def add(self, process):
+        """ Count the timing information of a completed process. """
+        waiting = process.waiting
+        turn_around = process.turn_around
+        self.waiting.add(waiting)
+        self.turn_around.add(turn_around)
+
+        sketches = self.by_priority.get(process.priority)
+        if sketches is None:
+            sketches = self.by_priority[process.priority] = \
+                (QuantileSketch(self._accuracy),
+                 QuantileSketch(self._accuracy))
+        sketches[0].add(waiting)
+        sketches[1].add(turn_around)
+
+    __call__ = add
+
+    def rows(self):
+        """
+        Return the statistics as table rows.
+
+            - one row for all processes and one per priority, each with
+              the count, then the mean, QUANTILES and max of waiting and
+              of turn around times.
+            - times are integers, so the estimated quantiles are rounded
+              to the nearest one.
+
+        """
+        def summary(sketch):
+            return [round(sketch.mean, 2)] + \
+                   [int(round(sketch.quantile(q))) for q in QUANTILES] + \
+                   [sketch.max]
+
+        rows = []
+        if self.waiting.count:
+            rows.append(['all', self.waiting.count] +
+                        summary(self.waiting) + summary(self.turn_around))
+        for priority in sorted(self.by_priority):
+            waiting, turn_around = self.by_priority[priority]
+            rows.append([priority, waiting.count] + summary(waiting) +
+                        summary(turn_around))
+        return rows
+
+    def max_waiting(self):
+        """ Return the longest waiting time of each priority class. """
+        return dict((priority, sketches[0].max)
+                    for priority, sketches in self.by_priority.iteritems())
+
+    def report(self):
+        """ Return the statistics as a table. """
+        from tabulate import tabulate
+
+        headers = ['Priority', 'Count']
+        for name in ('Wait', 'TAT'):
+            headers += ['%s Mean' % name] + \
+                       ['%s p%g' % (name, q * 100) for q in QUANTILES] + \
+                       ['%s Max' % name]
+        return tabulate(self.rows(), headers=headers, tablefmt='orgtbl')
+
+    def starvation_report(self):
+        """ Return the longest waiting time of each priority class as a table. """
+        from tabulate import tabulate
+
+        rows = [[priority, self.by_priority[priority][0].count,
+                 self.by_priority[priority][0].max]
+                for priority in sorted(self.by_priority)]
+        return tabulate(rows, headers=['Priority', 'Count',
+                                       'Max Waiting Time'],
+                        tablefmt='orgtbl')
+
+    def __repr__(self):
+        """ Return representation of Stats. """
+        return '<Stats count=%r>' % self.waiting.count
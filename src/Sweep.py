@@ -0,0 +1,171 @@
+import argparse
+import multiprocessing
+import sys
+from Cache import Cache, DIRECTORY, MAX_BYTES, RESULTS, digest
+from itertools import product
+from Loader import ParseError
+from multiprocessing.sharedctypes import RawArray
+from PCB import COLUMN_TYPE, PCBTable
+from Scheduler import ALGORITHMS
+from Trace import load
+
+# headers of the table returned by sweep()
+HEADERS = ['Trace', 'Algorithm', 'Processes',
+           'Avg. Turn Around Time', 'Avg. Waiting Time']
+
+# shared input columns of every trace, set in each worker by _init_worker
+_traces = {}
+
+# cache the results of every job are put in, set by _init_worker
+_cache = None
+
+def share_trace(table):
+    """ Copy the input columns of a PCBTable into shared memory. """
+    return tuple(RawArray(COLUMN_TYPE, table.column(name))
+                 for name in ('pid', 'arrival', 'burst', 'priority'))
+
+def sweep(jobs, workers=None, cache=None):
+    """
+    Run many (trace, algorithm) jobs in parallel across a process pool.
+
+        - each distinct trace file is parsed once, in this process, and
+          its input columns are placed in shared memory; the workers
+          inherit them when the pool starts and build their PCBTables
+          directly on top of them, so no PCBs are ever pickled.
+        - only the job's (trace, algorithm) key goes to a worker and only
+          a row of averages comes back.
+        - with a `cache`, jobs whose results are cached are answered
+          from it without a worker, and workers cache the results of the
+          others; no pool is started if every job is a hit.
+        - ex. :
+            rows = sweep([('res/processes.txt', 'sjf'),
+                          ('res/processes.txt', 'npp')], workers=2)
+
+    Parameters
+    ----------
+    jobs : iterable
+        - (path to process file, algorithm name) pairs
+        - algorithm names are the keys of Scheduler.ALGORITHMS
+    workers : int
+        - number of worker processes, defaulting to one per CPU
+    cache : Cache
+        - cache the results of the jobs are read from and put in
+
+    Returns
+    -------
+    list
+        - one row per job, in job order, with the columns in HEADERS
+
+    """
+    jobs = list(jobs)
+    for _, algorithm in jobs:
+        if algorithm not in ALGORITHMS:
+            raise ValueError('Invalid scheduling algorithm: %s' % algorithm)
+
+    # each trace is hashed once, however many algorithms it is run with
+    digests = {}
+    traces = {}
+    for trace, _ in jobs:
+        if trace not in traces:
+            table = load(trace)
+            traces[trace] = share_trace(table)
+            if cache is not None:
+                digests[trace] = digest(table)
+
+    rows = [None] * len(jobs)
+    pending = []
+    for index, (trace, algorithm) in enumerate(jobs):
+        key = None
+        if cache is not None:
+            key = cache.key(digests[trace], algorithm)
+            columns = cache.get(key)
+            if columns is not None:
+                rows[index] = _row(trace, algorithm, columns)
+                continue
+        pending.append((index, (trace, algorithm, key)))
+
+    if not pending:
+        return rows
+
+    # workers open the same cache directory rather than unpickling one
+    location = (cache.directory, cache.max_bytes) \
+               if cache is not None else None
+    pool = multiprocessing.Pool(processes=workers, initializer=_init_worker,
+                                initargs=(traces, location))
+    try:
+        results = pool.map(_run_job, [job for _, job in pending], chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    for (index, _), row in zip(pending, results):
+        rows[index] = row
+    return rows
+
+def _init_worker(traces, cache):
+    """ Keep the shared trace columns and the cache around for the jobs. """
+    global _cache
+    _traces.update(traces)
+    if cache is not None:
+        _cache = Cache(*cache)
+
+def _row(trace, algorithm, columns):
+    """ Return the row of averages of a job from its result columns. """
+    _, turn_around, waiting = columns
+    count = len(turn_around)
+    return [trace, algorithm, count, sum(turn_around) / (count * 1.0),
+            sum(waiting) / (count * 1.0)]
+
+def _run_job(job):
+    """ Run a single (trace, algorithm) job and return its averages. """
+    trace, algorithm, key = job
+    table = PCBTable.from_columns(*_traces[trace])
+
+    sched = ALGORITHMS[algorithm](processes=table)
+    sched.run()
+
+    if key is not None:
+        _cache.put(key, tuple(table.column(name) for name in RESULTS))
+
+    avg_turn_around, avg_wait = sched.averages()
+    return [trace, algorithm, table.size, avg_turn_around, avg_wait]
+
+if __name__ == '__main__':
+
+    from tabulate import tabulate
+
+    __parser__ = argparse.ArgumentParser('Run every combination of the given process files and scheduling algorithms in parallel.')
+    __parser__.add_argument('-f', '--files', nargs='+', required=True,
+                            metavar='FILE')
+    __parser__.add_argument('-a', '--algorithms', nargs='+',
+                            default=sorted(ALGORITHMS),
+                            metavar='(%s)' % '|'.join(sorted(ALGORITHMS)))
+    __parser__.add_argument('-w', '--workers', type=int)
+    __parser__.add_argument('-C', '--cache', nargs='?', const=DIRECTORY,
+                            metavar='DIR',
+                            help='reuse results cached in DIR, defaulting '
+                                 'to %s' % DIRECTORY)
+    __parser__.add_argument('--cache-size', type=int, default=MAX_BYTES,
+                            metavar='BYTES',
+                            help='size the cache is kept under')
+    __args__ = __parser__.parse_args()
+
+    for algorithm in __args__.algorithms:
+        if algorithm not in ALGORITHMS:
+            __parser__.error('Invalid scheduling algorithm. Must be one of: %s.' %
+                             ', '.join(sorted(ALGORITHMS)))
+
+    __cache__ = Cache(__args__.cache, __args__.cache_size) \
+                if __args__.cache else None
+
+    try:
+        rows = sweep(product(__args__.files, __args__.algorithms),
+                     workers=__args__.workers, cache=__cache__)
+    except ParseError as e:
+        sys.exit(str(e))
+    print tabulate(rows, headers=HEADERS, tablefmt='orgtbl')
+
+    if __cache__ is not None:
+        print >> sys.stderr, 'Cache hits: %d, misses: %d, evictions: %d' % \
+                             (__cache__.hits, __cache__.misses,
+                              __cache__.evictions)
@@ -0,0 +1,154 @@
+import struct
+from array import array
+from bisect import bisect_right
+from PCB import COLUMN_TYPE, _int64_bytes, _int64_column
+
+# pid recorded for a stretch of time in which a CPU ran nothing
+IDLE = -1
+
+# fields written for every run, in order
+FIELDS = ('cpu', 'start', 'end', 'pid')
+
+# first bytes of a binary Gantt file, followed by the version and the number
+# of fields per run, each run being that many little-endian signed 64-bit
+# integers
+MAGIC = 'PCBGANTT'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+
+class Timeline(object):
+    """ Class recording which process ran on each CPU, and when. """
+
+    def __init__(self):
+        """
+        Constructor
+
+            - creates new Timeline object.
+            - passed to a scheduler as `timeline`, it is handed every
+              stretch of time a process runs for, as [start, end) runs.
+            - runs are run-length encoded: a run that carries straight on
+              from the last one of the same process extends it, and the
+              time between runs is kept as a single IDLE run, so memory
+              grows with the number of context switches and not with the
+              simulated time.
+            - the runs of each CPU are kept in typed `array` columns in
+              order of time, so at() is a binary search.
+            - ex. :
+                timeline = Timeline()
+                SJF(processes=processes, timeline=timeline).run()
+                print timeline.at(120)
+
+        """
+        self._end = []
+        self._pid = []
+        self._start = []
+
+    def at(self, time, cpu=0):
+        """ Return the pid running on a CPU at a given time, or None if idle. """
+        if cpu >= len(self._start):
+            return None
+
+        index = bisect_right(self._start[cpu], time) - 1
+        if index < 0 or time >= self._end[cpu][index]:
+            return None
+
+        pid = self._pid[cpu][index]
+        return pid if pid != IDLE else None
+
+    @property
+    def cpus(self):
+        """ Return the number of CPUs that have run anything. """
+        return len(self._start)
+
+    @classmethod
+    def read(cls, f):
+        """ Read a Timeline back from a binary Gantt file. """
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or not header.startswith(MAGIC):
+            raise RuntimeError('Not a binary Gantt file.')
+        _, version, fields = HEADER.unpack(header)
+        if version != VERSION or fields != len(FIELDS):
+            raise RuntimeError('Unsupported binary Gantt file version %d.' %
+                               version)
+
+        values = _int64_column(f.read())
+
+        timeline = cls()
+        for index in xrange(0, len(values), len(FIELDS)):
+            cpu, start, end, pid = values[index:index + len(FIELDS)]
+            timeline._add(cpu, start, end, pid)
+        return timeline
+
+    def record(self, start, end, pid, cpu=0):
+        """
+        Record that a process ran on a CPU from `start` until `end`.
+
+            - runs of a CPU must be recorded in order of time; an empty
+              run is ignored.
+
+        """
+        if end <= start:
+            return
+        if cpu >= len(self._start):
+            self._grow(cpu)
+
+        ends = self._end[cpu]
+        last = ends[-1] if ends else 0
+        if start < last:
+            raise ValueError('Runs must be recorded in order of time.')
+
+        if start > last:
+            self._add(cpu, last, start, IDLE)
+        elif ends and self._pid[cpu][-1] == pid:
+            ends[-1] = end
+            return
+        self._add(cpu, start, end, pid)
+
+    def runs(self):
+        """ Yield every run as (cpu, start, end, pid), CPU by CPU. """
+        for cpu in xrange(len(self._start)):
+            for start, end, pid in zip(self._start[cpu], self._end[cpu],
+                                       self._pid[cpu]):
+                yield cpu, start, end, pid
+
+    def write_binary(self, f):
+        """ Write every run to a binary Gantt file. """
+        f.write(HEADER.pack(MAGIC, VERSION, len(FIELDS)))
+        for cpu in xrange(len(self._start)):
+            values = array(COLUMN_TYPE)
+            for run in zip([cpu] * len(self._start[cpu]), self._start[cpu],
+                           self._end[cpu], self._pid[cpu]):
+                values.extend(run)
+            f.write(_int64_bytes(values))
+
+    def write_csv(self, f):
+        """ Write every run as a CSV line, after a line naming the fields. """
+        f.write('# %s\n' % ','.join(FIELDS))
+        for cpu in xrange(len(self._start)):
+            f.write(''.join(['%d,%d,%d,%d\n' % run for run in
+                             zip([cpu] * len(self._start[cpu]),
+                                 self._start[cpu], self._end[cpu],
+                                 self._pid[cpu])]))
+
+    def _add(self, cpu, start, end, pid):
+        """ Append a run to the columns of a CPU. """
+        if cpu >= len(self._start):
+            self._grow(cpu)
+        self._start[cpu].append(start)
+        self._end[cpu].append(end)
+        self._pid[cpu].append(pid)
+
+    def _grow(self, cpu):
+        """ Add empty columns for every CPU up to a given one. """
+        while cpu >= len(self._start):
+            self._start.append(array(COLUMN_TYPE))
+            self._end.append(array(COLUMN_TYPE))
+            self._pid.append(array(COLUMN_TYPE))
+
+    def __len__(self):
+        """ Return the number of runs, idle ones included. """
+        return sum(len(start) for start in self._start)
+
+    def __repr__(self):
+        """ Return representation of Timeline. """
+        return '<Timeline cpus=%r runs=%r>' % (self.cpus, len(self))
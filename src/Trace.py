@@ -0,0 +1,232 @@
+import ctypes
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from Loader import ParseError, read_columns, read_table
+from PCB import PCBTable, _int64_bytes, _is_sorted
+
+# first bytes of every binary trace
+MAGIC = 'PCBTRACE'
+
+# version of the layout below, bumped whenever it changes
+VERSION = 1
+
+# magic, version, flags, number of processes, and the size, mtime (in
+# microseconds) and sampled checksum of the CSV file it was converted from,
+# padded so the columns that follow are 8-byte aligned
+HEADER = struct.Struct('<8sIIqqq16s8x')
+
+# flag set when the arrival column is non-decreasing; traces written before
+# it was defined have no flags, and are checked when loaded instead
+SORTED = 1
+
+# input columns, in the order they are laid out after the header
+COLUMNS = ('pid', 'arrival', 'burst', 'priority')
+
+# every column value is a little-endian signed 64-bit integer
+INT64 = ctypes.c_int64.__ctype_le__
+
+# suffix of the binary trace cached next to a CSV file
+CACHE_SUFFIX = '.trace'
+
+# CSV files smaller than this are parsed faster than a cache pays for
+CACHE_THRESHOLD = 1 << 26
+
+# number and size of the blocks read to checksum a source file
+SAMPLE_COUNT = 64
+SAMPLE_SIZE = 1 << 16
+
+def checksum(path):
+    """
+    Return a checksum of a file, cheap to compute however large it is.
+
+        - files up to SAMPLE_COUNT * SAMPLE_SIZE bytes are hashed whole;
+          larger ones are hashed over SAMPLE_COUNT blocks spread evenly
+          from the first byte to the last, together with their size, so
+          the cost does not grow with the file.
+
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.md5(str(size))
+    with open(path, 'rb') as f:
+        if size <= SAMPLE_COUNT * SAMPLE_SIZE:
+            digest.update(f.read())
+        else:
+            step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+            for sample in xrange(SAMPLE_COUNT):
+                f.seek(sample * step)
+                digest.update(f.read(SAMPLE_SIZE))
+    return digest.digest()
+
+def convert(source, target):
+    """
+    Convert a CSV process file into a binary trace.
+
+        - the file is parsed a chunk at a time, each column going to its
+          own temporary file, so memory use does not grow with the file;
+          the columns are then joined behind the header.
+        - the trace is written to a temporary name and renamed into
+          place, so a reader never sees a partly written trace.
+        - whether the file is sorted by arrival time is recorded in the
+          header, so a scheduler can read the mapped rows in order
+          without checking or sorting them.
+        - ex. :
+            convert('res/processes.txt', 'res/processes.trace')
+
+    Parameters
+    ----------
+    source : str
+        - path to a process file, in the syntax described in the README
+    target : str
+        - path the binary trace is written to
+
+    """
+    stat = os.stat(source)
+    digest = checksum(source)
+    directory = os.path.dirname(os.path.abspath(target))
+
+    parts = [tempfile.TemporaryFile(dir=directory) for _ in COLUMNS]
+    try:
+        count = 0
+        last_arrival = None
+        ordered = True
+        with open(source, 'r') as f:
+            for columns in read_columns(f):
+                arrival = columns[1]
+                if ordered and len(arrival):
+                    ordered = (last_arrival is None or
+                               last_arrival <= arrival[0]) and \
+                              _is_sorted(arrival)
+                    last_arrival = arrival[-1]
+                count += len(columns[0])
+                for part, column in zip(parts, columns):
+                    part.write(_int64_bytes(column))
+
+        fd, temp = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, SORTED if ordered else 0,
+                                    count, stat.st_size, _mtime(stat),
+                                    digest))
+                for part in parts:
+                    part.seek(0)
+                    while True:
+                        block = part.read(1 << 20)
+                        if not block:
+                            break
+                        f.write(block)
+            os.rename(temp, target)
+        except:
+            os.remove(temp)
+            raise
+    finally:
+        for part in parts:
+            part.close()
+
+def is_trace(path):
+    """ Return whether a file is a binary trace. """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def load(path, cache=True):
+    """
+    Load a process file of either format into a PCBTable.
+
+        - a binary trace is mapped with open_trace().
+        - for a CSV file, a binary trace cached next to it is mapped when
+          its header still matches the size, mtime and checksum of the
+          file; otherwise the file is parsed, and converted first when it
+          is at least CACHE_THRESHOLD bytes, so the next load is instant.
+        - a cache that cannot be written, e.g. in a read-only directory,
+          just means the file is parsed every time.
+        - ex. :
+            table = load('res/processes.txt')
+
+    Parameters
+    ----------
+    path : str
+        - path to a binary trace or a CSV process file
+    cache : bool
+        - use and create cached binary traces of CSV files
+
+    """
+    if is_trace(path):
+        return open_trace(path)
+
+    cached = path + CACHE_SUFFIX
+    if cache and os.path.exists(cached) and _is_current(cached, path):
+        return open_trace(cached)
+
+    if cache and os.path.getsize(path) >= CACHE_THRESHOLD:
+        try:
+            convert(path, cached)
+            return open_trace(cached)
+        except (IOError, OSError):
+            pass
+
+    with open(path, 'r') as f:
+        return read_table(f)
+
+def open_trace(path):
+    """
+    Map a binary trace into a PCBTable, without copying its columns.
+
+        - the file is mapped copy-on-write and every input column of the
+          table is a ctypes array over its part of the mapping, so pages
+          are only read from disk as the scheduler reaches them.
+        - the mapping stays open for as long as the columns are in use.
+
+    """
+    with open(path, 'rb') as f:
+        magic, version, flags, count, _, _, _ = _read_header(f, path)
+        if os.fstat(f.fileno()).st_size != HEADER.size + \
+           len(COLUMNS) * count * ctypes.sizeof(INT64):
+            raise RuntimeError('Binary trace is truncated: %s' % path)
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    column_type = INT64 * count
+    return PCBTable.from_columns(*[column_type.from_buffer(
+        mapping, HEADER.size + index * ctypes.sizeof(column_type))
+        for index in xrange(len(COLUMNS))],
+        sorted_by_arrival=True if flags & SORTED else None)
+
+def _is_current(cached, source):
+    """ Return whether a cached trace was converted from `source` as it is. """
+    try:
+        with open(cached, 'rb') as f:
+            _, _, _, _, size, mtime, digest = _read_header(f, cached)
+    except RuntimeError:
+        return False
+
+    stat = os.stat(source)
+    return size == stat.st_size and mtime == _mtime(stat) and \
+           digest == checksum(source)
+
+def _mtime(stat):
+    """ Return the modification time of a stat result in microseconds. """
+    return int(round(stat.st_mtime * 1e6))
+
+def _read_header(f, path):
+    """ Read and check the header of a binary trace. """
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size or not data.startswith(MAGIC):
+        raise RuntimeError('Not a binary trace: %s' % path)
+
+    header = HEADER.unpack(data)
+    if header[1] != VERSION:
+        raise RuntimeError('Unsupported binary trace version %d: %s' %
+                           (header[1], path))
+    return header
+
+if __name__ == '__main__':
+
+    if len(sys.argv) not in (2, 3):
+        sys.exit('usage: python Trace.py SOURCE [TARGET]')
+    try:
+        convert(sys.argv[1], sys.argv[2] if len(sys.argv) == 3
+                             else sys.argv[1] + CACHE_SUFFIX)
+    except ParseError as e:
+        sys.exit(str(e))
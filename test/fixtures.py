@@ -0,0 +1,37 @@
+"""
+Random traces and PCBs shared by the tests.
+
+    - rows are (pid, arrival, burst, priority), as PCBTable.append takes
+      them; a list of bursts stands for CPU and I/O bursts in turn.
+
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from PCB import PCB
+
+def generate(seed, io, size=40):
+    """ Return the rows of a random trace of up to `size` processes. """
+    rand = random.Random(seed)
+    rows = []
+    arrival = 0
+    for pid in xrange(rand.randint(1, size)):
+        arrival += rand.choice([0, 0, 1, 2, 5, 30])
+        bursts = [rand.randint(0, 12)]
+        for _ in xrange(rand.choice([0, 0, 1, 2, 3]) if io else 0):
+            bursts += [rand.randint(1, 25), rand.randint(0, 10)]
+        rows.append((pid, arrival, bursts, rand.randint(0, 4)))
+    return rows
+
+def processes(rows):
+    """ Return a PCB for every row of a trace. """
+    made = []
+    for pid, arrival, burst, priority in rows:
+        options = dict(pid=pid, arrival=arrival, priority=priority)
+        options['bursts' if isinstance(burst, list) else 'burst'] = burst
+        made.append(PCB(options))
+    return made
@@ -0,0 +1,171 @@
+"""
+Check that checkpoints and forks carry on as the scheduler they came from.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import random
+import sys
+import unittest
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from Checkpoint import Checkpoint
+from PCB import PCB, PCBTable
+from Scheduler import NPP, SJF, SRTF
+from fixtures import processes
+
+def results(sched):
+    """ Return the times of every completed process, and the averages. """
+    return ([(process.pid, process.completion, process.turn_around,
+              process.waiting) for process in sched._completed()],
+            sched.averages(), tuple(map(list, sched.evaluate())))
+
+class CheckpointTest(unittest.TestCase):
+    """ Class checking Checkpoint round trips and forks. """
+
+    def make(self, mode, algorithm, options, rows):
+        """ Return a scheduler over a list, a PCBTable or a stream of rows. """
+        if mode == 'table':
+            table = PCBTable()
+            for row in rows:
+                table.append(*row)
+            return algorithm(processes=table, **options)
+        if mode == 'stream':
+            return algorithm(processes=iter(sorted(processes(rows),
+                                                   key=lambda p: p.arrival)),
+                             stream=True, **options)
+        return algorithm(processes=processes(rows), **options)
+
+    def test_round_trip(self):
+        """ Restored and forked schedulers match one never stopped. """
+        for seed in xrange(150):
+            rand = random.Random(seed)
+            rows = [(pid, rand.randint(0, 100), rand.randint(0, 12),
+                     rand.randint(0, 4))
+                    for pid in xrange(rand.randint(0, 60))]
+            pause = rand.randint(0, 150)
+            extra = [(1000 + pid, pause + rand.randint(0, 30),
+                      rand.randint(0, 12), rand.randint(0, 4))
+                     for pid in xrange(rand.randint(0, 10))]
+            algorithm, options = rand.choice([
+                (SJF, {}), (NPP, {}), (NPP, {'aging': rand.randint(1, 20)})])
+            mode = ('list', 'table', 'stream')[seed % 3]
+            message = '%s %r over a %s, trace %d' % (algorithm.__name__,
+                                                     options, mode, seed)
+
+            # submitted at the pause, and never stopped
+            reference = self.make(mode, algorithm, options, rows)
+            reference.advance_to(pause)
+            for process in processes(extra):
+                reference.submit(process)
+            reference.run()
+            expected = results(reference)
+
+            # checkpointed at the pause, through a file every other time
+            sched = self.make(mode, algorithm, options, rows)
+            sched.advance_to(pause)
+            checkpoint = sched.checkpoint()
+            if seed % 2:
+                f = StringIO()
+                checkpoint.write(f)
+                f.seek(0)
+                checkpoint = Checkpoint.read(f)
+
+            for branch in xrange(3):
+                restored = checkpoint.restore()
+                for process in processes(extra):
+                    restored.submit(process)
+                if branch == 2:
+                    # forked again half way through the branch
+                    restored.advance_to(pause + 20)
+                    restored = restored.fork()
+                restored.run()
+                self.assertEqual(results(restored), expected, message)
+
+            # the scheduler checkpointed carries on unaffected
+            for process in processes(extra):
+                sched.submit(process)
+            sched.run()
+            self.assertEqual(results(sched), expected, message)
+
+    def test_unsupported(self):
+        """ Preemptive schedulers and I/O bursts cannot be checkpointed. """
+        with self.assertRaises(ValueError):
+            SRTF(processes=processes([(1, 0, 5, 0)])).checkpoint()
+
+        sched = SJF(processes=[PCB(dict(pid=1, arrival=0, bursts=(2, 5, 2),
+                                        priority=0))])
+        sched.advance_to(3)
+        with self.assertRaises(ValueError):
+            sched.checkpoint()
+
+    def test_unread_rows_copied(self):
+        """ The rows a scheduler has yet to read are not read to capture. """
+        count = 20000
+        rows = [(pid, pid, 1, 0) for pid in xrange(count)]
+        for mode in ('table', 'stream'):
+            sched = self.make(mode, SJF, {}, rows)
+            sched.advance_to(10)
+            checkpoint = sched.checkpoint()
+
+            self.assertLessEqual(sched._waiting.size, sched.chunk_size)
+            self.assertEqual(len(checkpoint.waiting[0]) +
+                             len(checkpoint.ready[0]) +
+                             len(checkpoint.completed[0]) +
+                             (checkpoint.active is not None), count)
+            self.assertEqual(list(checkpoint.waiting[0][-3:]),
+                             [count - 3, count - 2, count - 1])
+
+            # both carry on to the same end
+            restored = checkpoint.restore()
+            sched.run()
+            restored.run()
+            self.assertEqual(results(restored), results(sched))
+            self.assertEqual(sched.system_time, count)
+
+    def test_io_in_stream(self):
+        """ A stream with I/O bursts ahead is refused, and left whole. """
+        processes = [PCB(dict(pid=pid, arrival=pid, burst=1, priority=0))
+                     for pid in xrange(10)]
+        processes[7] = PCB(dict(pid=7, arrival=7, bursts=(1, 2, 1),
+                                priority=0))
+        sched = SJF(processes=iter(processes), stream=True)
+        sched.chunk_size = 2
+        sched.advance_to(1)
+        with self.assertRaises(ValueError):
+            sched.checkpoint()
+        sched.run()
+        self.assertEqual(sorted(process.completion
+                                for process in sched._completed()),
+                         [1, 2, 3, 4, 5, 6, 7, 9, 10, 11])
+
+    def test_on_complete(self):
+        """ A restore handing PCBs off averages over the whole run. """
+        rows = [(pid, pid * 2, 3, 0) for pid in xrange(10)]
+        sched = SJF(processes=processes(rows))
+        sched.advance_to(12)
+        checkpoint = sched.checkpoint()
+        sched.run()
+
+        handed = []
+        restored = checkpoint.restore(on_complete=handed.append)
+        restored.run()
+        self.assertEqual(len(handed) + len(checkpoint.completed[0]), 10)
+        self.assertEqual(restored.averages(), sched.averages())
+
+    def test_not_a_checkpoint(self):
+        """ Reading anything but a whole checkpoint file is refused. """
+        sched = SJF(processes=processes([(1, 0, 5, 0), (2, 9, 1, 0)]))
+        f = StringIO()
+        sched.checkpoint().write(f)
+        for data in ('', 'not a checkpoint', f.getvalue()[:-1]):
+            with self.assertRaises(RuntimeError):
+                Checkpoint.read(StringIO(data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Check List positions against a plain Python list of the same values.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from List import List
+
+class ListTest(unittest.TestCase):
+    """ Class checking List positions through every kind of change. """
+
+    def test_positions(self):
+        """ Mixed changes leave every position where a list has it. """
+        for seed in xrange(60):
+            rand = random.Random(seed)
+            lst = List()
+            expected = []
+            nodes = {}
+            for value in xrange(rand.choice([50, 400, 3000])):
+                message = 'trace %d, step %d' % (seed, value)
+                choice = rand.random()
+                if choice < 0.15:
+                    nodes[value] = lst.push_back(value)
+                    expected.append(value)
+                elif choice < 0.25:
+                    nodes[value] = lst.push_front(value)
+                    expected.insert(0, value)
+                elif choice < 0.4:
+                    loc = rand.randint(0, len(expected))
+                    nodes[value] = lst.insert(value, loc)
+                    expected.insert(loc, value)
+                elif choice < 0.5 and expected:
+                    before = rand.choice(expected)
+                    nodes[value] = lst.insert_before(nodes[before], value)
+                    expected.insert(expected.index(before), value)
+                elif choice < 0.62 and expected:
+                    gone = rand.choice(expected)
+                    lst.remove(nodes.pop(gone))
+                    expected.remove(gone)
+                elif choice < 0.68 and expected:
+                    lst.pop_front()
+                    del nodes[expected.pop(0)]
+                elif choice < 0.74 and expected:
+                    lst.pop_back()
+                    del nodes[expected.pop()]
+                elif expected:
+                    loc = rand.randrange(len(expected))
+                    self.assertEqual(lst.at(loc).value, expected[loc],
+                                     message)
+                self.assertEqual(lst.size, len(expected), message)
+
+            self.assertEqual([node.value for node in lst], expected)
+            self.assertEqual([lst.at(loc).value
+                              for loc in xrange(len(expected))], expected)
+            self.assertIsNone(lst.at(len(expected)))
+
+    def test_sort_and_clear(self):
+        """ Sorting and clearing drop the index, which is built again. """
+        lst = List()
+        for value in (5, 3, 9, 1):
+            lst.push_back(value)
+        self.assertEqual(lst.at(2).value, 9)
+        lst.sort(lambda node: node.value)
+        self.assertEqual([lst.at(loc).value for loc in xrange(4)],
+                         [1, 3, 5, 9])
+        lst.clear()
+        self.assertIsNone(lst.at(0))
+        lst.push_front(7)
+        lst.insert(6, 0)
+        self.assertEqual([lst.at(loc).value for loc in xrange(2)], [6, 7])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Check the parsing of process files.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import sys
+import unittest
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from Batch import VECTOR_THRESHOLD
+from Loader import (BurstsError, COLUMN_MAX, ParseError, read_columns,
+                    read_processes, read_table)
+
+def lines(count):
+    """ Return `count` well-formed process lines. """
+    return ''.join('%d,%d,%d,%d\n' % (pid, pid, pid % 7 + 1, pid % 3)
+                   for pid in xrange(count))
+
+class ParseErrorTest(unittest.TestCase):
+    """ Class checking that malformed lines are reported with their number. """
+
+    # sizes of the chunk ahead of a malformed line, either side of the
+    # number of rows parsed by NumPy
+    sizes = (0, 1, VECTOR_THRESHOLD + 1)
+
+    def assertMalformed(self, text, number, line, read=read_table):
+        with self.assertRaises(ParseError) as context:
+            read(StringIO(text))
+        self.assertEqual(context.exception.errors[0], (number, line))
+
+    def test_malformed(self):
+        """ Every kind of malformed line is reported, whatever the chunk. """
+        for bad in ('1,2,3', '1,2,3,4,5', '1,2,three,4', '1,-2,3,4',
+                    '1,,3,4', '1;2;3;4', '999,0,5,1e2', '1,2,3,', '0x5,1,2,3',
+                    '4.0,1,2,3', '1, ,2,3', '1,2,3 4,5'):
+            for size in self.sizes:
+                self.assertMalformed(lines(size) + bad + '\n', size + 1, bad)
+
+    def test_out_of_range(self):
+        """ A value beyond a column is malformed, whatever the chunk. """
+        for bad in ('70,99999999999999999999999,5,1',
+                    '70,%d,5,1' % (COLUMN_MAX + 1)):
+            for size in self.sizes:
+                self.assertMalformed(lines(size) + bad + '\n', size + 1, bad)
+                self.assertMalformed(lines(size) + bad + '\n', size + 1, bad,
+                                     read=lambda f: list(read_processes(f)))
+
+    def test_largest_value(self):
+        """ The largest value a column holds is read back exactly. """
+        for size in self.sizes:
+            table = read_table(StringIO(lines(size) +
+                                        '70,%d,5,1\n' % COLUMN_MAX))
+            self.assertEqual(table[size].arrival, COLUMN_MAX)
+
+    def test_line_numbers_across_chunks(self):
+        """ Line numbers count every line of every chunk before. """
+        text = '# comment\n\n' + lines(500) + '1,2,3\n'
+        with self.assertRaises(ParseError) as context:
+            list(read_processes(StringIO(text), chunk_size=256))
+        self.assertEqual(context.exception.errors, [(503, '1,2,3')])
+
+    def test_comments_and_blanks(self):
+        """ Comment and blank lines are skipped, and spaces allowed. """
+        table = read_table(StringIO('# pid,arrival,burst,priority\n\n'
+                                    ' 1, 0, 5 ,2\n   \n2,1,3,1'))
+        self.assertEqual([(view.pid, view.burst) for view in table],
+                         [(1, 5), (2, 3)])
+
+    def test_sample_files(self):
+        """ The process files shipped in res/ are well formed. """
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 '..', 'res')
+        for name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, name)) as f:
+                self.assertTrue(list(read_processes(f)), name)
+
+class BurstsTest(unittest.TestCase):
+    """ Class checking lines with I/O bursts. """
+
+    text = '1,0,5,2,3,4\n2,1,3,1\n3,2,2,3,10,1,2,2\n'
+
+    def test_read_processes(self):
+        """ PCBs are read with every CPU and I/O burst. """
+        processes = list(read_processes(StringIO(self.text)))
+        self.assertEqual([process.bursts for process in processes],
+                         [(5, 3, 4), (3,), (2, 10, 1, 2, 2)])
+        self.assertEqual([process.io for process in processes], [3, 0, 12])
+
+    def test_columns(self):
+        """ Columns hold one CPU burst, and name the lines with more. """
+        for read in (read_table, lambda f: list(read_columns(f))):
+            with self.assertRaises(BurstsError) as context:
+                read(StringIO(self.text))
+            self.assertEqual(context.exception.errors,
+                             [(1, '1,0,5,2,3,4'), (3, '3,2,2,3,10,1,2,2')])
+
+    def test_malformed_first(self):
+        """ A chunk with malformed lines is malformed, bursts or not. """
+        for read in (read_table, lambda f: list(read_processes(f))):
+            with self.assertRaises(ParseError) as context:
+                read(StringIO(self.text + '4,5,6,7,8\n'))
+            self.assertNotIsInstance(context.exception, BurstsError)
+            self.assertEqual(context.exception.errors, [(4, '4,5,6,7,8')])
+
+if __name__ == '__main__':
+    unittest.main()
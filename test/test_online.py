@@ -0,0 +1,92 @@
+"""
+Check that running a scheduler online gives the same results as offline.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from PCB import PCB
+from Scheduler import ALGORITHMS, NPP, SMP
+from fixtures import generate, processes
+
+def times(processes):
+    """ Return (pid, start, completion) of every process, in order of pid. """
+    return sorted((process.pid, process.start, process.completion)
+                  for process in processes)
+
+class OnlineTest(unittest.TestCase):
+    """ Class checking submit, advance_to and coroutine against run. """
+
+    def check(self, make, seed, io):
+        """ Run a random trace offline and online, and compare them. """
+        rows = generate(seed, io, size=150)
+        offline = make(processes(rows))
+        offline.run()
+
+        # each process is submitted before the clock gets to its arrival,
+        # which is stopped at random times in between; those arriving
+        # together are submitted together, as a process submitted once the
+        # clock is at its arrival goes after the decisions made then
+        rand = random.Random(seed)
+        online = make([])
+        completed = []
+        clock = 0
+        batch = processes(rows)
+        for index, process in enumerate(batch):
+            while clock < process.arrival - 1 and rand.random() < 0.5:
+                clock = rand.randint(clock, process.arrival - 1)
+                completed += online.advance_to(clock)
+            online.submit(process)
+            last = index + 1 == len(batch) or \
+                batch[index + 1].arrival > process.arrival
+            if last and rand.random() < 0.5:
+                clock = process.arrival
+                completed += online.advance_to(clock)
+
+        # the rest is split between the coroutine and run()
+        driver = online.coroutine()
+        next(driver)
+        completed += driver.send((clock + rand.randint(0, 200), []))
+        before = len(completed)
+        online.run()
+        completed += list(online._completed())[before:]
+
+        message = '%s on trace %d' % (offline.name, seed)
+        self.assertEqual(times(completed), times(offline._completed()),
+                         message)
+        self.assertEqual(online.averages(), offline.averages(), message)
+
+    def test_algorithms(self):
+        """ Every algorithm gives the same results online, I/O or not. """
+        for name, algorithm in sorted(ALGORITHMS.items()):
+            for seed in xrange(10):
+                for io in (False, True):
+                    self.check(lambda batch: algorithm(processes=batch),
+                               seed, io)
+
+    def test_smp(self):
+        """ Several CPUs give the same results online. """
+        for seed in xrange(10):
+            self.check(lambda batch: SMP(processes=batch, cpus=3,
+                                         algorithm=NPP),
+                       seed, io=False)
+
+    def test_earlier_than_clock(self):
+        """ Neither the clock nor an arrival may go back in time. """
+        sched = NPP()
+        sched.advance_to(10)
+        with self.assertRaises(ValueError):
+            sched.advance_to(9)
+        with self.assertRaises(ValueError):
+            sched.submit(PCB(dict(pid=1, arrival=9, burst=1, priority=0)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Check the output sinks.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import sys
+import unittest
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from Output import TableSink
+from PCB import PCB
+from Scheduler import SJF
+
+class TableSinkTest(unittest.TestCase):
+    """ Class checking TableSink. """
+
+    def processes(self):
+        """ Return a few processes, scheduled with SJF. """
+        processes = [PCB(dict(pid=pid, arrival=pid, burst=3, priority=1))
+                     for pid in xrange(5)]
+        SJF(processes=processes).run()
+        return processes
+
+    def test_sums_rows(self):
+        """ Without averages, the rows written are averaged. """
+        sink = TableSink(StringIO())
+        for process in self.processes():
+            sink.write(process)
+        self.assertEqual(sink.averages(), (7.0, 4.0))
+
+    def test_given_averages(self):
+        """ Given averages are printed, and the rows are not summed. """
+        f = StringIO()
+        sink = TableSink(f, averages=(1.5, 0.5))
+        for process in self.processes():
+            sink.write(process)
+        sink.close()
+
+        self.assertEqual(sink.count, 5)
+        self.assertEqual(sink.total_turn_around, 0)
+        self.assertIn('Avg. Turn Around Time:  1.5\n', f.getvalue())
+        self.assertIn('Avg. Waiting Time:  0.5\n', f.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
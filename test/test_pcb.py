@@ -0,0 +1,141 @@
+"""
+Check PCB, PCBTable and the order tables are scheduled in.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import ctypes
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+import Trace
+from PCB import COLUMN_TYPE, PCBTable, _int64_bytes, _int64_column
+from Scheduler import SJF
+
+def rows(table):
+    """ Return (pid, arrival) of every row of a table, in order of arrival. """
+    return [(view.pid, view.arrival) for view in table.by_arrival()]
+
+class ByArrivalTest(unittest.TestCase):
+    """ Class checking PCBTable.by_arrival. """
+
+    def test_sorted(self):
+        """ Sorted rows are yielded as they are, and remembered as sorted. """
+        table = PCBTable()
+        for pid in xrange(100):
+            table.append(pid=pid, arrival=pid // 3, burst=1, priority=0)
+        self.assertEqual(rows(table), [(pid, pid // 3) for pid in xrange(100)])
+        self.assertTrue(table.sorted_by_arrival)
+
+    def test_unsorted(self):
+        """ Unsorted rows are sorted, keeping equal arrivals in row order. """
+        for count in (5, 100):
+            table = PCBTable()
+            for pid in xrange(count):
+                table.append(pid=pid, arrival=(count - pid) // 2, burst=1,
+                             priority=0)
+            expected = sorted([(pid, (count - pid) // 2)
+                               for pid in xrange(count)],
+                              key=lambda row: row[1])
+            self.assertEqual(rows(table), expected)
+            self.assertFalse(table.sorted_by_arrival)
+
+    def test_narrow_columns(self):
+        """ Columns of 4-byte integers are ordered by value, not bytes. """
+        count = 200
+        arrival = array('i', [(count - pid) // 2 for pid in xrange(count)])
+        table = PCBTable.from_columns(array('i', xrange(count)), arrival,
+                                      array('i', [1]) * count,
+                                      array('i', [0]) * count)
+        self.assertEqual(rows(table), sorted(zip(xrange(count), arrival),
+                                             key=lambda row: row[1]))
+        self.assertFalse(table.sorted_by_arrival)
+
+    def test_append_forgets_order(self):
+        """ Appending a row means the order has to be checked again. """
+        table = PCBTable()
+        table.append(pid=1, arrival=5, burst=1, priority=0)
+        rows(table)
+        table.append(pid=2, arrival=0, burst=1, priority=0)
+        self.assertEqual(rows(table), [(2, 0), (1, 5)])
+
+class FromColumnsTest(unittest.TestCase):
+    """ Class checking tables built around input columns. """
+
+    def table(self):
+        """ Return a table around four input columns of 10 rows. """
+        return PCBTable.from_columns(*[array(COLUMN_TYPE, range(10))
+                                       for _ in xrange(4)])
+
+    def test_timings_allocated_when_used(self):
+        """ The timing columns are allocated once a row is scheduled. """
+        table = self.table()
+        inputs = 4 * 10 * array(COLUMN_TYPE).itemsize
+        self.assertEqual(table.nbytes, inputs)
+
+        SJF(processes=table).run()
+        self.assertGreater(table.nbytes, inputs)
+        self.assertEqual(table[9].completion, 46)
+
+    def test_pcbs_by_arrival(self):
+        """ Scheduling PCBs of the rows leaves the timing columns unused. """
+        table = self.table()
+        processes = list(table.pcbs_by_arrival())
+        SJF(processes=processes).run()
+        self.assertEqual(processes[9].completion, 46)
+        self.assertEqual(table.nbytes, 4 * 10 * array(COLUMN_TYPE).itemsize)
+
+class Int64Test(unittest.TestCase):
+    """ Class checking the 64-bit layout columns are written to files in. """
+
+    def test_round_trip(self):
+        """ Every kind of column is written the same way and read back. """
+        values = [0, 1, -1, 2 ** 40, 2 ** 63 - 1]
+        data = struct.pack('<5q', *values)
+        for column in (array(COLUMN_TYPE, values),
+                       (ctypes.c_int64 * 5)(*values), array('i', values[:3]),
+                       values):
+            self.assertEqual(str(_int64_bytes(column)),
+                             data[:8 * len(column)])
+        self.assertEqual(list(_int64_column(data)), values)
+
+class TraceOrderTest(unittest.TestCase):
+    """ Class checking the order flag of binary traces. """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def convert(self, lines):
+        """ Convert process lines to a trace and map it. """
+        source = os.path.join(self.directory, 'processes.txt')
+        with open(source, 'w') as f:
+            f.write(''.join(lines))
+        Trace.convert(source, source + Trace.CACHE_SUFFIX)
+        return Trace.open_trace(source + Trace.CACHE_SUFFIX)
+
+    def test_sorted_flag(self):
+        """ A sorted file gives a trace known to be sorted. """
+        table = self.convert(['%d,%d,1,0\n' % (pid, pid) for pid in xrange(9)])
+        self.assertTrue(table.sorted_by_arrival)
+        self.assertEqual(rows(table), [(pid, pid) for pid in xrange(9)])
+
+    def test_unsorted_flag(self):
+        """ An unsorted file gives a trace that is sorted when scheduled. """
+        table = self.convert(['1,4,1,0\n', '2,0,1,0\n', '3,4,1,0\n'])
+        self.assertIsNone(table.sorted_by_arrival)
+        self.assertEqual(rows(table), [(2, 0), (1, 4), (3, 4)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,290 @@
+"""
+Check every scheduler against a brute-force reference simulation.
+
+    - the reference steps the clock one time unit at a time, as the
+      original schedulers did, and applies the rules of each algorithm
+      directly, with none of the event engine's shortcuts.
+    - random traces are run with single CPU bursts and with I/O bursts,
+      and every process must get the same start, completion, turn around
+      and waiting times, with the same CPU busy time and end of run.
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import random
+import sys
+import unittest
+from itertools import count
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from Scheduler import ALGORITHMS, MLFQ
+from fixtures import generate, processes
+
+# number of random traces run per algorithm and kind of trace
+TRACES = 40
+
+def simulate(rows, algorithm, quantum=None, aging=None):
+    """
+    Run a trace one time unit at a time, and return what the schedulers do.
+
+        - at every time unit, the active process ends its CPU burst if it
+          has none left, then processes back from I/O and new arrivals are
+          queued, in that order, then the active process may be preempted,
+          then the CPU is given to the best queued process.
+        - ties between queued processes go to the one queued first.
+        - returns (pid, start, completion, turn around, waiting) of every
+          process in order of pid, the CPU busy time and the end of run.
+
+    """
+    aged = lambda process: process['priority'] * aging + \
+                           process['ready_since']
+    key = {'sjf': lambda process: process['remaining'],
+           'srtf': lambda process: process['remaining'],
+           'npp': aged if aging else lambda process: process['priority'],
+           'pp': lambda process: process['priority'],
+           'rr': lambda process: 0}[algorithm]
+    preemptive = algorithm in ('srtf', 'pp')
+
+    pending = sorted([dict(pid=pid, arrival=arrival, priority=priority,
+                           bursts=bursts, next=0, remaining=bursts[0],
+                           ready_since=arrival, start=None)
+                      for pid, arrival, bursts, priority in rows],
+                     key=lambda process: process['arrival'])
+    sequence = count()
+    blocked = []
+    completion = {}
+    ready = []
+    state = dict(active=None, busy=0, used=0)
+
+    def end_burst(process, time):
+        bursts = process['bursts']
+        if process['next'] + 1 < len(bursts):
+            blocked.append((time + bursts[process['next'] + 1],
+                            next(sequence), process))
+            process['next'] += 2
+            process['remaining'] = bursts[process['next']]
+        else:
+            completion[process['pid']] = time
+
+    def best():
+        return min(ready, key=lambda entry: (key(entry[1]), entry[0]))
+
+    time = 0
+    arrived = 0
+    while len(completion) < len(pending):
+        active = state['active']
+        if active is not None and active['remaining'] == 0:
+            end_burst(active, time)
+            active = None
+
+        for entry in sorted(entry for entry in blocked if entry[0] <= time):
+            blocked.remove(entry)
+            entry[2]['ready_since'] = time
+            ready.append((next(sequence), entry[2]))
+        while arrived < len(pending) and \
+              pending[arrived]['arrival'] <= time:
+            ready.append((next(sequence), pending[arrived]))
+            arrived += 1
+
+        if preemptive and active is not None and ready and \
+           key(best()[1]) < key(active):
+            ready.append((next(sequence), active))
+            active = None
+        if algorithm == 'rr' and active is not None and \
+           state['used'] == quantum:
+            if ready:
+                ready.append((next(sequence), active))
+                active = None
+            else:
+                state['used'] = 0
+
+        while active is None and ready:
+            entry = best()
+            ready.remove(entry)
+            active = entry[1]
+            state['used'] = 0
+            if active['start'] is None:
+                active['start'] = time
+            if active['remaining'] == 0:
+                end_burst(active, time)
+                active = None
+
+        if active is not None:
+            active['remaining'] -= 1
+            state['busy'] += 1
+            state['used'] += 1
+        state['active'] = active
+        time += 1
+
+    results = []
+    for process in pending:
+        end = completion[process['pid']]
+        bursts = process['bursts']
+        turn_around = end - process['arrival']
+        results.append((process['pid'], process['start'], end, turn_around,
+                        turn_around - sum(bursts[0::2]) - sum(bursts[1::2])))
+    return sorted(results), state['busy'], max(completion.values())
+
+def simulate_mlfq(rows, quanta, boost):
+    """
+    Run a trace under MLFQ one time unit at a time.
+
+        - a process starts at the level given by its priority, runs
+          before any process at a lower level, and drops a level once it
+          has used up the quantum of its level, over one or more turns.
+        - a process keeps its level and used quantum while blocked.
+        - every `boost` time units, every process, queued, running or
+          blocked, goes back to the top level with a fresh quantum.
+        - returns the completion time of every process by pid and the
+          CPU busy time.
+
+    """
+    lowest = len(quanta) - 1
+    pending = sorted(rows, key=lambda row: row[1])
+    bursts = dict((row[0], list(row[2])) for row in rows)
+    remaining = dict((row[0], row[2][0]) for row in rows)
+    queues = [[] for _ in quanta]
+    blocked = []
+    completion = {}
+    sequence = count()
+    busy = 0
+
+    # every process is held as [pid, level, used]
+    def end_burst(process, time):
+        left = bursts[process[0]]
+        if len(left) > 1:
+            blocked.append([time + left[1], next(sequence), process])
+            del left[:2]
+            remaining[process[0]] = left[0]
+        else:
+            completion[process[0]] = time
+
+    active = None
+    time = 0
+    arrived = 0
+    while True:
+        if active is not None:
+            remaining[active[0]] -= 1
+            active[2] += 1
+            busy += 1
+            if remaining[active[0]] == 0:
+                if active[2] >= quanta[active[1]]:
+                    active[1] = min(active[1] + 1, lowest)
+                    active[2] = 0
+                end_burst(active, time)
+                active = None
+
+        if boost and time > 0 and time % boost == 0:
+            queued = sum(queues, [])
+            queues = [[] for _ in quanta]
+            queues[0] = [[process[0], 0, 0] for process in queued]
+            for process in [active] + [entry[2] for entry in blocked]:
+                if process is not None:
+                    process[1] = process[2] = 0
+
+        for entry in sorted(entry for entry in blocked if entry[0] <= time):
+            blocked.remove(entry)
+            queues[entry[2][1]].append(entry[2])
+        while arrived < len(pending) and pending[arrived][1] <= time:
+            level = min(pending[arrived][3], lowest)
+            queues[level].append([pending[arrived][0], level, 0])
+            arrived += 1
+
+        if active is not None and active[2] >= quanta[active[1]]:
+            active[1] = min(active[1] + 1, lowest)
+            active[2] = 0
+            if any(queues):
+                queues[active[1]].append(active)
+                active = None
+        if active is not None and \
+           any(queues[level] for level in xrange(active[1])):
+            queues[active[1]].append(active)
+            active = None
+
+        while active is None and any(queues):
+            active = next(queue for queue in queues if queue).pop(0)
+            if remaining[active[0]] == 0:
+                end_burst(active, time)
+                active = None
+
+        if active is None and arrived == len(pending) and \
+           not any(queues) and not blocked:
+            return completion, busy
+        time += 1
+
+class ReferenceTest(unittest.TestCase):
+    """ Class checking the schedulers against the reference simulations. """
+
+    def check(self, algorithm, io, **options):
+        """ Run random traces under an algorithm and the reference. """
+        for seed in xrange(TRACES):
+            rows = generate(seed, io)
+            if 'quantum' in options:
+                options['quantum'] = seed % 4 + 1
+            batch = processes(rows)
+            sched = ALGORITHMS[algorithm](processes=batch, **options)
+            sched.run()
+
+            got = sorted((process.pid, process.start, process.completion,
+                          process.turn_around, process.waiting)
+                         for process in batch)
+            self.assertEqual((got, sched._busy, sched.system_time),
+                             simulate(rows, algorithm, **options),
+                             '%s on trace %d' % (algorithm, seed))
+
+    def test_sjf(self):
+        """ SJF matches the reference, with and without I/O. """
+        self.check('sjf', io=False)
+        self.check('sjf', io=True)
+
+    def test_npp(self):
+        """ NPP matches the reference, with and without I/O. """
+        self.check('npp', io=False)
+        self.check('npp', io=True)
+
+    def test_npp_aging(self):
+        """ Aged NPP matches the reference, with and without I/O. """
+        self.check('npp', io=False, aging=7)
+        self.check('npp', io=True, aging=7)
+
+    def test_srtf(self):
+        """ SRTF matches the reference, with and without I/O. """
+        self.check('srtf', io=False)
+        self.check('srtf', io=True)
+
+    def test_pp(self):
+        """ PP matches the reference, with and without I/O. """
+        self.check('pp', io=False)
+        self.check('pp', io=True)
+
+    def test_rr(self):
+        """ RR matches the reference, with quanta from 1 to 4. """
+        self.check('rr', io=False, quantum=None)
+        self.check('rr', io=True, quantum=None)
+
+    def test_mlfq(self):
+        """ MLFQ matches the reference, with random levels and boosts. """
+        for io in (False, True):
+            for seed in xrange(4 * TRACES):
+                rand = random.Random(seed)
+                rows = generate(seed, io)
+                quanta = [rand.randint(1, 4)
+                          for _ in xrange(rand.randint(1, 4))]
+                boost = rand.choice([None, 3, 7, 15])
+
+                batch = processes(rows)
+                sched = MLFQ(processes=batch, levels=len(quanta),
+                             quanta=quanta, boost=boost)
+                sched.run()
+
+                got = dict((process.pid, process.completion)
+                           for process in batch)
+                self.assertEqual((got, sched._busy),
+                                 simulate_mlfq(rows, quanta, boost),
+                                 'mlfq on trace %d' % seed)
+
+if __name__ == '__main__':
+    unittest.main()
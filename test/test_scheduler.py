@@ -0,0 +1,107 @@
+"""
+Check the schedulers against the timing information they should produce.
+
+    - usage:
+        python -m unittest discover -s test
+
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from PCB import PCB
+from Scheduler import NPP, SJF, SMP, schedule
+
+def completions(processes):
+    """ Return (pid, completion time) of every process, in order of pid. """
+    return sorted((process.pid, process.completion) for process in processes)
+
+class AgingTest(unittest.TestCase):
+    """ Class checking NPP aging. """
+
+    def test_io_does_not_count_as_waiting(self):
+        """ A process back from I/O ages from its return, not its arrival. """
+        processes = [PCB(dict(pid=1, arrival=0, bursts=(1, 100, 5),
+                              priority=5)),
+                     PCB(dict(pid=3, arrival=99, burst=3, priority=1)),
+                     PCB(dict(pid=2, arrival=100, burst=5, priority=1))]
+        NPP(processes=processes, aging=10).run()
+
+        # pid 1 is only ready again at 101, after pid 2 at 100
+        self.assertEqual(completions(processes), [(1, 112), (2, 107),
+                                                  (3, 102)])
+
+    def test_ages_from_arrival(self):
+        """ A waiting process overtakes higher priority ones as it ages. """
+        processes = [PCB(dict(pid=1, arrival=0, burst=10, priority=1)),
+                     PCB(dict(pid=2, arrival=1, burst=5, priority=3)),
+                     PCB(dict(pid=3, arrival=9, burst=5, priority=1))]
+        NPP(processes=processes, aging=4).run()
+
+        # at 10, pid 2 has aged to 3 - 9/4 and pid 3 to 1 - 1/4
+        self.assertEqual(completions(processes), [(1, 10), (2, 15), (3, 20)])
+
+    def test_smp(self):
+        """ NPP is aged on several CPUs, and other algorithms refuse it. """
+        processes = [PCB(dict(pid=pid, arrival=pid, burst=4,
+                              priority=4 - pid % 5))
+                     for pid in xrange(20)]
+        single = schedule([PCB(dict(pid=p.pid, arrival=p.arrival, burst=4,
+                                    priority=p.priority))
+                           for p in processes], 'npp', aging=3)
+        one = SMP(processes=processes, algorithm=NPP, cpus=1, aging=3)
+        one.run()
+        self.assertEqual(completions(processes),
+                         completions(single.processes))
+
+        results = schedule(processes, 'npp', cpus=2, aging=3)
+        self.assertEqual(len(results.processes), 20)
+        with self.assertRaises(ValueError):
+            schedule(processes, 'sjf', cpus=2, aging=3)
+
+class BatchTest(unittest.TestCase):
+    """ Class checking when the dispatch order is kept for Batch. """
+
+    def test_single_bursts(self):
+        """ The dispatch order of single CPU bursts is kept. """
+        sched = SJF(processes=[PCB(dict(pid=pid, arrival=0, burst=pid + 1,
+                                        priority=0)) for pid in xrange(3)])
+        sched.run()
+        self.assertTrue(sched.batch)
+        self.assertEqual(list(sched._order_burst), [1, 2, 3])
+        self.assertEqual(sched.averages(), (10 / 3.0, 4 / 3.0))
+
+    def test_io_bursts(self):
+        """ The dispatch order is dropped once a process blocks. """
+        processes = [PCB(dict(pid=1, arrival=0, bursts=(2, 5, 2),
+                              priority=0)),
+                     PCB(dict(pid=2, arrival=0, burst=3, priority=0))]
+        sched = SJF(processes=processes)
+        sched.run()
+        self.assertFalse(sched.batch)
+        self.assertIsNone(sched._order_arrival)
+        self.assertEqual(completions(processes), [(1, 9), (2, 5)])
+        self.assertEqual(sched.averages(), (7.0, 1.0))
+
+    def test_on_complete(self):
+        """ Handed off PCBs still count towards the averages. """
+        for bursts in ((1,), (2, 5, 2)):
+            make = lambda: [PCB(dict(pid=1, arrival=0, bursts=bursts,
+                                     priority=0)),
+                            PCB(dict(pid=2, arrival=0, burst=3,
+                                     priority=0))]
+            handed = []
+            sched = SJF(processes=make(), on_complete=handed.append)
+            sched.run()
+            kept = SJF(processes=make())
+            kept.run()
+            self.assertEqual(len(handed), 2)
+            self.assertEqual(sched.averages(), kept.averages())
+            with self.assertRaises(ValueError):
+                sched.evaluate()
+
+if __name__ == '__main__':
+    unittest.main()